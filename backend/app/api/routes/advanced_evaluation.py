@@ -56,6 +56,9 @@ async def evaluate_with_semantic_understanding(
         question_types = json.loads(test.question_types) if test.question_types else {}
         marks_distribution = json.loads(test.marks_distribution) if test.marks_distribution else {}
         
+        # Compile the answer key once so per-question work only analyzes the student's text
+        answer_profiles = semantic_evaluator.compile_answer_key(model_answers)
+        
         # Extract text using simple OCR service
         ocr_results = await ocr_service.extract_content(file_path)
         
@@ -86,7 +89,8 @@ async def evaluate_with_semantic_understanding(
                 model_answer=model_answer,
                 question_type=question_type,
                 max_marks=max_marks,
-                ocr_confidence=ocr_confidence
+                ocr_confidence=ocr_confidence,
+                answer_profile=answer_profiles.get(question_key)
             )
             
             # Store detailed results
@@ -13,6 +13,10 @@ import os
 import logging
 from datetime import datetime
 
+from app.core.executor import cpu_executor
+from app.core.uploads import spool_upload, remove_upload
+from app.services.llm_cache_service import llm_cache_stats
+
 router = APIRouter()
 
 # Initialize logging
@@ -23,11 +27,13 @@ async def evaluate_semantic(
     student_answers: str = Form(...),
     answer_key: str = Form(...),
     question_marks: str = Form(...),
-    answer_sheet_pdf: Optional[UploadFile] = File(None)
+    answer_sheet_pdf: Optional[UploadFile] = File(None),
+    no_cache: bool = Form(False)
 ):
     """
     AI-Powered LangGraph evaluation with intelligent text extraction and evaluation
     Complete rebuild with AI models for accurate assessment
+    Set no_cache=true to force fresh OCR instead of reusing cached page text.
     """
     try:
         # Clear any cached data first
@@ -44,13 +50,13 @@ async def evaluate_semantic(
         # Import the new AI-powered workflow
         from app.langgraph.ai_powered_evaluation_workflow import ai_workflow_manager
         
-        # Prepare PDF content and manual answers
-        pdf_content = None
+        # Prepare PDF path and manual answers
+        pdf_path = None
         manual_answers = {}
         
         if answer_sheet_pdf and answer_sheet_pdf.content_type == "application/pdf":
-            pdf_content = await answer_sheet_pdf.read()
-            logger.info(f"📄 PDF uploaded for AI processing: {len(pdf_content)} bytes")
+            pdf_path = await spool_upload(answer_sheet_pdf)
+            logger.info(f"📄 PDF uploaded for AI processing: {os.path.getsize(pdf_path)} bytes")
         else:
             # Use manual input if no PDF
             manual_answers = student_answers_dict
@@ -60,12 +66,17 @@ async def evaluate_semantic(
         logger.info("🤖 Starting AI-powered LangGraph evaluation workflow")
         start_time = datetime.now()
         
-        result = ai_workflow_manager.evaluate(
-            pdf_file=pdf_content,
-            answer_key=answer_key_dict,
-            question_marks=question_marks_dict,
-            manual_answers=manual_answers
-        )
+        try:
+            result = await cpu_executor.run(
+                ai_workflow_manager.evaluate,
+                pdf_file=pdf_path,
+                answer_key=answer_key_dict,
+                question_marks=question_marks_dict,
+                manual_answers=manual_answers,
+                use_ocr_cache=not no_cache
+            )
+        finally:
+            remove_upload(pdf_path)
         
         end_time = datetime.now()
         processing_time = (end_time - start_time).total_seconds()
@@ -89,6 +100,13 @@ async def evaluate_semantic(
         logger.error(f"❌ AI semantic evaluation error: {e}")
         raise HTTPException(status_code=500, detail=f"AI evaluation failed: {str(e)}")
 
+@router.get("/llm-cache")
+async def get_llm_cache_stats():
+    """
+    Get LLM response cache hit/miss counters per prompt family
+    """
+    return llm_cache_stats()
+
 @router.get("/evaluation-results/{evaluation_id}")
 async def get_evaluation_results(evaluation_id: str):
     """Get detailed evaluation results by ID"""
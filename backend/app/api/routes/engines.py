@@ -0,0 +1,46 @@
+"""
+Engine API Routes
+Load state of the lazily initialized OCR/NLP engines, and an optional warm-up
+"""
+
+from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.engines import engine_registry
+from app.core.executor import cpu_executor
+
+# Imported for their engine registrations; none of them loads a model on import
+import app.services.advanced_pdf_ocr_service  # noqa: F401
+import app.services.tesseract_evaluation_service  # noqa: F401
+import app.services.question_detection_service  # noqa: F401
+
+router = APIRouter()
+
+def warm_up_configured_engines():
+    """Load the engines named in ENGINE_WARMUP ("all" loads every registered engine)"""
+    configured = settings.ENGINE_WARMUP.strip()
+    if not configured:
+        return
+    names = None if configured == "all" else [name.strip() for name in configured.split(",") if name.strip()]
+    engine_registry.warm_up(names)
+
+@router.get("/")
+async def get_engines():
+    """
+    Registered engines and whether each one has been loaded in this worker
+    """
+    return engine_registry.status()
+
+@router.post("/warm-up")
+async def warm_up_engines(engines: Optional[List[str]] = None):
+    """
+    Load engines now instead of on the first request that needs them
+
+    With no body every registered engine is loaded. Loading runs off the
+    event loop; engines that fail are reported with their error.
+    """
+    unknown = [name for name in engines or [] if name not in engine_registry.names()]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown engines: {', '.join(unknown)}")
+    return await cpu_executor.run(engine_registry.warm_up, engines)
@@ -0,0 +1,114 @@
+"""
+Evaluation Job API Routes
+Submit evaluations to the background job queue and poll for their results
+"""
+
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+import json
+import logging
+
+from app.core.uploads import spool_upload, remove_upload
+from app.services.evaluation_job_service import evaluation_job_queue, EVALUATION_RUNNERS, JOB_COMPLETED, JOB_FAILED
+from app.schemas.evaluation import EvaluationJobResponse
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.post("/submit", response_model=EvaluationJobResponse, status_code=202)
+async def submit_evaluation_job(
+    answer_key: str = Form(...),
+    question_marks: str = Form(...),
+    evaluation_type: str = Form("tesseract"),
+    question_texts: Optional[str] = Form(None),
+    student_answers: Optional[str] = Form(None),
+    answer_sheet: Optional[UploadFile] = File(None),
+    no_cache: bool = Form(False)
+):
+    """
+    Queue an evaluation and return immediately with a job id
+
+    evaluation_type is "tesseract" (OCR + custom parser) or "semantic"
+    (AI-powered workflow). Poll /{job_id}/status, then fetch /{job_id}/result.
+    """
+    if evaluation_type not in EVALUATION_RUNNERS:
+        raise HTTPException(status_code=400, detail=f"evaluation_type must be one of: {', '.join(EVALUATION_RUNNERS)}")
+
+    try:
+        answer_key_dict = json.loads(answer_key)
+        question_marks_dict = {k: int(v) for k, v in json.loads(question_marks).items()}
+        question_texts_dict = json.loads(question_texts) if question_texts else None
+        student_answers_dict = json.loads(student_answers) if student_answers else None
+    except (json.JSONDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON format: {str(e)}")
+
+    if not answer_key_dict or not question_marks_dict:
+        raise HTTPException(status_code=400, detail="Answer key and question marks are required")
+
+    if not answer_sheet and not student_answers_dict:
+        raise HTTPException(status_code=400, detail="Provide an answer sheet PDF or student answers")
+
+    pdf_path = None
+    if answer_sheet:
+        if answer_sheet.content_type != "application/pdf":
+            raise HTTPException(status_code=400, detail="Only PDF files are supported")
+        pdf_path = await spool_upload(answer_sheet)
+
+    try:
+        # Moving the upload and the DB insert are blocking I/O
+        job_id = await run_in_threadpool(
+            evaluation_job_queue.submit,
+            evaluation_type,
+            {
+                "answer_key": answer_key_dict,
+                "question_marks": question_marks_dict,
+                "question_texts": question_texts_dict,
+                "manual_answers": student_answers_dict,
+                "use_ocr_cache": not no_cache
+            },
+            pdf_path
+        )
+    except Exception:
+        # The spooled file is only moved into the job queue on success
+        remove_upload(pdf_path)
+        raise
+
+    return _job_response(evaluation_job_queue.get_job(job_id))
+
+@router.get("/{job_id}/status", response_model=EvaluationJobResponse)
+async def get_evaluation_job_status(job_id: str):
+    """
+    Get the lifecycle status of an evaluation job (pending, processing, completed, failed)
+    """
+    return _job_response(_get_job_or_404(job_id))
+
+@router.get("/{job_id}/result")
+async def get_evaluation_job_result(job_id: str):
+    """
+    Get the result of a finished evaluation job
+    """
+    job = _get_job_or_404(job_id)
+
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(status_code=500, detail=job["error"] or "Evaluation failed")
+    if job["status"] != JOB_COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Evaluation job is still {job['status']}")
+
+    return {
+        "success": True,
+        "job_id": job["job_id"],
+        "evaluation_type": job["evaluation_type"],
+        "data": job["result"]
+    }
+
+def _get_job_or_404(job_id: str):
+    """Load a job or raise 404"""
+    job = evaluation_job_queue.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Evaluation job not found")
+    return job
+
+def _job_response(job) -> EvaluationJobResponse:
+    """Status view of a job without its result payload"""
+    return EvaluationJobResponse(**{k: v for k, v in job.items() if k != "result"})
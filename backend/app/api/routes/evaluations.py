@@ -5,7 +5,7 @@ from app.db.database import get_db
 from app.db.models import Evaluation, Test, Student, AnswerSheetUpload
 from app.core.security import get_current_user
 from app.schemas.evaluation import EvaluationResponse, EvaluationCreate
-import aiofiles
+from app.core.uploads import save_upload
 import os
 import json
 import random
@@ -44,9 +44,7 @@ async def simple_evaluate(
         filename = f"student_{student_id}_{timestamp}_{answer_sheet.filename}"
         file_path = os.path.join(upload_dir, filename)
         
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await answer_sheet.read()
-            await f.write(content)
+        await save_upload(answer_sheet, file_path)
         
         # Create or update evaluation record
         existing_evaluation = db.query(Evaluation).filter(
@@ -113,6 +111,8 @@ async def simple_evaluate(
             "status": "completed"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Evaluation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Evaluation failed: {str(e)}")
@@ -190,9 +190,7 @@ async def evaluate_answer_sheet(
     filename = f"student_{student_id}_{timestamp}_{answer_sheet.filename}"
     file_path = os.path.join(upload_dir, filename)
     
-    async with aiofiles.open(file_path, 'wb') as f:
-        content = await answer_sheet.read()
-        await f.write(content)
+    file_size = await save_upload(answer_sheet, file_path)
     
     # Create upload record
     upload_record = AnswerSheetUpload(
@@ -200,7 +198,7 @@ async def evaluate_answer_sheet(
         student_id=student_id,
         file_path=file_path,
         file_name=answer_sheet.filename,
-        file_size=len(content)
+        file_size=file_size
     )
     db.add(upload_record)
     db.commit()
@@ -278,9 +276,7 @@ async def upload_answer_sheet(
     filename = f"student_{student_id}_{timestamp}_{answer_sheet.filename}"
     file_path = os.path.join(upload_dir, filename)
     
-    async with aiofiles.open(file_path, 'wb') as f:
-        content = await answer_sheet.read()
-        await f.write(content)
+    file_size = await save_upload(answer_sheet, file_path)
     
     # Create upload record
     upload_record = AnswerSheetUpload(
@@ -288,7 +284,7 @@ async def upload_answer_sheet(
         student_id=student_id,
         file_path=file_path,
         file_name=answer_sheet.filename,
-        file_size=len(content)
+        file_size=file_size
     )
     db.add(upload_record)
     db.commit()
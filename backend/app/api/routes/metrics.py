@@ -0,0 +1,110 @@
+"""
+Metrics API Route
+Prometheus scrape endpoint for request latency, OCR throughput, queue depth, caches and the DB pool
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from typing import Dict
+
+from app.core.metrics import metrics_registry, LabelValues
+from app.core.tracing import trace_metrics
+from app.db.database import engine
+from app.services.ocr_cache_service import ocr_result_cache
+from app.services.llm_cache_service import answer_evaluation_cache, answer_extraction_cache, feedback_cache
+
+router = APIRouter()
+
+EXPOSITION_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _evaluation_queue_depth() -> Dict[LabelValues, float]:
+    # Imported on scrape so serving metrics does not start the job queue
+    from app.services.evaluation_job_service import evaluation_job_queue
+    return {(status,): count for status, count in evaluation_job_queue.depth().items()}
+
+def _cache_stats():
+    stats = [ocr_result_cache.stats()] + [
+        cache.stats() for cache in (answer_evaluation_cache, answer_extraction_cache, feedback_cache)
+    ]
+    return [cache for cache in stats if cache.get("enabled")]
+
+def _cache_values(field: str) -> Dict[LabelValues, float]:
+    return {(cache["name"],): cache[field] for cache in _cache_stats()}
+
+def _db_pool_connections() -> Dict[LabelValues, float]:
+    """Connections per state for pools that report them (QueuePool; SQLite may use a pool that does not)"""
+    pool = engine.pool
+    states = {}
+    for state, method in (("size", "size"), ("checked_out", "checkedout"),
+                          ("checked_in", "checkedin"), ("overflow", "overflow")):
+        if hasattr(pool, method):
+            states[(state,)] = getattr(pool, method)()
+    return states
+
+def _workflow_spans(field: str) -> Dict[LabelValues, float]:
+    spans = trace_metrics.snapshot()["spans"]
+    if field == "total_ms":
+        return {(name,): stats["total_ms"] / 1000 for name, stats in spans.items()}
+    return {(name,): stats[field] for name, stats in spans.items()}
+
+metrics_registry.gauge(
+    "evalmate_evaluation_queue_depth",
+    "Evaluation jobs waiting for a worker (pending) or running (processing)",
+    ("status",),
+    collect=_evaluation_queue_depth
+)
+metrics_registry.counter(
+    "evalmate_cache_hits_total",
+    "Cache lookups served from the cache",
+    ("cache",),
+    collect=lambda: _cache_values("hits")
+)
+metrics_registry.counter(
+    "evalmate_cache_misses_total",
+    "Cache lookups that missed",
+    ("cache",),
+    collect=lambda: _cache_values("misses")
+)
+metrics_registry.gauge(
+    "evalmate_cache_hit_ratio",
+    "Hits / lookups since start",
+    ("cache",),
+    collect=lambda: _cache_values("hit_ratio")
+)
+metrics_registry.gauge(
+    "evalmate_cache_size_bytes",
+    "Bytes stored in the cache",
+    ("cache",),
+    collect=lambda: _cache_values("size_bytes")
+)
+metrics_registry.gauge(
+    "evalmate_db_pool_connections",
+    "Database connection pool usage by state",
+    ("state",),
+    collect=_db_pool_connections
+)
+metrics_registry.counter(
+    "evalmate_workflow_span_seconds_total",
+    "Time spent in each LangGraph workflow span",
+    ("span",),
+    collect=lambda: _workflow_spans("total_ms")
+)
+metrics_registry.counter(
+    "evalmate_workflow_span_count_total",
+    "Completed LangGraph workflow spans",
+    ("span",),
+    collect=lambda: _workflow_spans("count")
+)
+metrics_registry.counter(
+    "evalmate_workflow_items_total",
+    "Pages, lines and questions processed by the LangGraph workflow",
+    ("item",),
+    collect=lambda: {(name,): value for name, value in trace_metrics.snapshot()["counters"].items()}
+)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Operational metrics in the Prometheus text exposition format
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type=EXPOSITION_CONTENT_TYPE)
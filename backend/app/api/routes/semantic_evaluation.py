@@ -13,7 +13,13 @@ import logging
 from datetime import datetime
 
 from app.langgraph.advanced_evaluation_workflow import LangGraphEvaluationWorkflow
+from app.langgraph.semantic_evaluation_workflow import LangGraphSemanticEvaluator
+from app.services.advanced_pdf_ocr_service import get_ocr_service
 from app.services.evaluation_validator import EvaluationValidator
+from app.core.uploads import save_upload, spool_upload, remove_upload
+from app.core.executor import cpu_executor
+from app.core.tracing import trace_metrics
+from app.core.engines import engine_registry
 
 router = APIRouter()
 
@@ -21,7 +27,8 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # Initialize services
-langgraph_workflow = LangGraphEvaluationWorkflow()
+langgraph_workflow = engine_registry.lazy("langgraph_workflow", LangGraphEvaluationWorkflow, "LangGraph evaluation workflow")
+semantic_evaluator = engine_registry.lazy("semantic_evaluator", LangGraphSemanticEvaluator, "Semantic answer scorer")
 evaluation_validator = EvaluationValidator()
 
 @router.post("/evaluate-semantic")
@@ -146,12 +153,10 @@ async def evaluate_semantic(
         temp_path = os.path.join(temp_dir, f"upload_{datetime.now().strftime('%H%M%S')}_{answer_sheet_pdf.filename}")
         
         try:
-            # Save PDF content
-            content = await answer_sheet_pdf.read()
-            with open(temp_path, "wb") as f:
-                f.write(content)
+            # Stream PDF content to disk
+            file_size = await save_upload(answer_sheet_pdf, temp_path)
             
-            logger.info(f"💾 PDF saved for LangGraph processing: {temp_path}")
+            logger.info(f"💾 PDF saved for LangGraph processing: {temp_path} ({file_size} bytes)")
             
             # Run LangGraph workflow
             workflow_start = datetime.now()
@@ -191,6 +196,8 @@ async def evaluate_semantic(
         
     except json.JSONDecodeError as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON format: {str(e)}")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ LangGraph evaluation failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Evaluation failed: {str(e)}")
@@ -216,9 +223,8 @@ async def evaluate_semantic(
                 logger.info(f"🔍 Starting real-time OCR extraction...")
                 ocr_start_time = datetime.now()
                 
-                # Create fresh OCR service instance to avoid any caching
-                fresh_ocr_service = get_ocr_service()
-                ocr_results = await fresh_ocr_service.extract_content(temp_path)
+                # Shared OCR service; state is per call and use_cache=False skips the page cache
+                ocr_results = await get_ocr_service().extract_content(temp_path, use_cache=False)
                 
                 ocr_end_time = datetime.now()
                 ocr_duration = (ocr_end_time - ocr_start_time).total_seconds()
@@ -458,6 +464,112 @@ async def evaluate_semantic(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Evaluation failed: {str(e)}")
 
+@router.post("/evaluate-semantic-class")
+async def evaluate_semantic_class(
+    answer_key: str = Form(..., description="JSON string of answer key"),
+    question_marks: str = Form(..., description="JSON string of question marks"),
+    question_types: Optional[str] = Form(None, description="JSON string of question types"),
+    student_answers: Optional[str] = Form(None, description="JSON {student_id: {question_id: answer}} of typed answers"),
+    answer_sheets: Optional[List[UploadFile]] = File(None, description="Answer sheet PDFs, one per student")
+) -> JSONResponse:
+    """
+    Semantic evaluation of a whole class against one answer key
+    
+    Answers come from the uploaded PDFs (each student named by the file name
+    without .pdf) and/or typed answers. Each question is scored for every
+    student at once, with similarity computed as matrix operations over a
+    vocabulary shared by the whole test.
+    """
+    try:
+        answer_key_dict = json.loads(answer_key)
+        question_marks_dict = {q_id: int(marks) for q_id, marks in json.loads(question_marks).items()}
+        question_types_dict = json.loads(question_types) if question_types else {}
+        typed_answers = json.loads(student_answers) if student_answers else {}
+    except (json.JSONDecodeError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON format: {str(e)}")
+    
+    if not answer_key_dict or not question_marks_dict:
+        raise HTTPException(status_code=400, detail="Answer key and question marks are required")
+    
+    student_ids: List[str] = []
+    class_answers: List[Dict[str, str]] = []
+    class_confidences: List[Dict[str, float]] = []
+    
+    for student_id, answers in typed_answers.items():
+        student_ids.append(str(student_id))
+        class_answers.append({str(q_id): answer or "" for q_id, answer in answers.items()})
+        class_confidences.append({})
+    
+    # OCR one sheet at a time; scoring waits until the whole class is read
+    for answer_sheet in answer_sheets or []:
+        if answer_sheet.content_type != "application/pdf":
+            raise HTTPException(status_code=400, detail=f"Only PDF files are supported: {answer_sheet.filename}")
+        pdf_path = await spool_upload(answer_sheet)
+        try:
+            ocr_results = await get_ocr_service().extract_content(pdf_path)
+        finally:
+            remove_upload(pdf_path)
+        
+        student_id = os.path.splitext(os.path.basename(answer_sheet.filename or "sheet"))[0]
+        if student_id in student_ids:
+            student_id = f"{student_id}_{len(student_ids) + 1}"
+        student_ids.append(student_id)
+        class_answers.append(ocr_results.get("extracted_text", {}))
+        class_confidences.append(ocr_results.get("confidence_scores", {}))
+    
+    if not student_ids:
+        raise HTTPException(status_code=400, detail="Answer sheet PDFs or typed student answers are required")
+    
+    start_time = datetime.now()
+    try:
+        class_results = await cpu_executor.run(
+            semantic_evaluator.score_test_class,
+            class_answers, answer_key_dict, question_marks_dict, question_types_dict, class_confidences
+        )
+    except Exception as e:
+        logger.error(f"❌ Class semantic evaluation failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Evaluation failed: {str(e)}")
+    
+    total_marks = sum(question_marks_dict.get(q_id, 0) for q_id in answer_key_dict)
+    students = []
+    for student_id, answers, confidences, results in zip(student_ids, class_answers, class_confidences, class_results):
+        obtained_marks = sum(result.marks_obtained for result in results.values())
+        students.append({
+            "student_id": student_id,
+            "total_marks": total_marks,
+            "obtained_marks": obtained_marks,
+            "percentage": round(obtained_marks / total_marks * 100, 2) if total_marks else 0.0,
+            "detailed_results": [
+                {
+                    "question_id": q_id,
+                    "student_answer": answers.get(q_id, ""),
+                    "marks_allocated": question_marks_dict.get(q_id, 0),
+                    "marks_obtained": result.marks_obtained,
+                    "semantic_similarity": round(result.semantic_similarity, 3),
+                    "conceptual_understanding": round(result.conceptual_understanding, 3),
+                    "factual_accuracy": round(result.factual_accuracy, 3),
+                    "final_score": round(result.final_score, 3),
+                    "feedback": result.detailed_feedback,
+                    "ocr_confidence": confidences.get(q_id, 1.0),
+                    "status": "evaluated" if answers.get(q_id, "").strip() else "skipped"
+                }
+                for q_id, result in results.items()
+            ]
+        })
+    
+    return JSONResponse(content={
+        "students": students,
+        "class_summary": {
+            "student_count": len(students),
+            "average_percentage": round(sum(student["percentage"] for student in students) / len(students), 2)
+        },
+        "processing_info": {
+            "evaluation_method": "Vectorized class semantic scoring",
+            "scoring_seconds": round((datetime.now() - start_time).total_seconds(), 3),
+            "processed_at": datetime.now().isoformat()
+        }
+    })
+
 @router.get("/evaluation-results/{evaluation_id}")
 async def get_evaluation_results(evaluation_id: str):
     """Get detailed evaluation results by ID"""
@@ -559,6 +671,13 @@ async def compare_evaluations(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Comparison failed: {str(e)}")
 
+@router.get("/workflow-metrics")
+async def get_workflow_metrics():
+    """
+    Get LangGraph workflow stage latencies (per agent and per question) and page/line/question counters
+    """
+    return trace_metrics.snapshot()
+
 @router.get("/health")
 async def health_check():
     """Health check for semantic evaluation service"""
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.db.models import Evaluation, Test, Student
 from app.core.security import get_current_user
-import aiofiles
+from app.core.uploads import save_upload
 import os
 import random
 from datetime import datetime
@@ -40,9 +40,7 @@ async def simple_evaluate(
         filename = f"student_{student_id}_{timestamp}_{answer_sheet.filename}"
         file_path = os.path.join(upload_dir, filename)
         
-        async with aiofiles.open(file_path, 'wb') as f:
-            content = await answer_sheet.read()
-            await f.write(content)
+        await save_upload(answer_sheet, file_path)
         
         # Create or update evaluation record
         existing_evaluation = db.query(Evaluation).filter(
@@ -108,6 +106,8 @@ async def simple_evaluate(
             "status": "completed"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Evaluation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Evaluation failed: {str(e)}")
\ No newline at end of file
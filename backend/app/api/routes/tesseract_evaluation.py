@@ -4,11 +4,19 @@ Alternative to GPT-4 using open-source tools
 """
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from typing import Optional, Dict, Any
+from fastapi.responses import StreamingResponse
+from typing import Optional, Dict, Any, List, Tuple
+import os
 import json
 import logging
+import tempfile
+import zipfile
 
 from app.services.tesseract_evaluation_service import tesseract_evaluation_service
+from app.services.ocr_cache_service import ocr_result_cache
+from app.core.executor import cpu_executor
+from app.core.config import settings
+from app.core.uploads import spool_upload, remove_upload, UPLOAD_CHUNK_SIZE
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -19,13 +27,15 @@ async def evaluate_with_tesseract(
     question_marks: str = Form(...),
     question_texts: Optional[str] = Form(None),
     student_answers: Optional[str] = Form(None),
-    answer_sheet: Optional[UploadFile] = File(None)
+    answer_sheet: Optional[UploadFile] = File(None),
+    no_cache: bool = Form(False)
 ):
     """
     Evaluate answers using Tesseract OCR and custom parser
     
     This endpoint provides a free, open-source alternative to GPT-4
     using Tesseract for OCR and intelligent custom parsing for evaluation.
+    Set no_cache=true to force fresh OCR instead of reusing cached page text.
     """
     try:
         # Parse JSON inputs
@@ -41,23 +51,28 @@ async def evaluate_with_tesseract(
         if not answer_key_dict or not question_marks_dict:
             raise HTTPException(status_code=400, detail="Answer key and question marks are required")
         
-        # Read PDF file if provided
-        pdf_content = None
+        # Stream the PDF to a temporary file if provided
+        pdf_path = None
         if answer_sheet:
             if answer_sheet.content_type != "application/pdf":
                 raise HTTPException(status_code=400, detail="Only PDF files are supported")
             
-            pdf_content = await answer_sheet.read()
-            logger.info(f"Processing PDF file: {answer_sheet.filename} ({len(pdf_content)} bytes)")
+            pdf_path = await spool_upload(answer_sheet)
+            logger.info(f"Processing PDF file: {answer_sheet.filename} ({os.path.getsize(pdf_path)} bytes)")
         
-        # Run Tesseract evaluation
-        result = tesseract_evaluation_service.evaluate(
-            pdf_file=pdf_content,
-            answer_key=answer_key_dict,
-            question_marks=question_marks_dict,
-            question_texts=question_texts_dict,
-            manual_answers=student_answers_dict
-        )
+        # Run Tesseract evaluation off the event loop
+        try:
+            result = await cpu_executor.run(
+                tesseract_evaluation_service.evaluate,
+                pdf_file=pdf_path,
+                answer_key=answer_key_dict,
+                question_marks=question_marks_dict,
+                question_texts=question_texts_dict,
+                manual_answers=student_answers_dict,
+                use_ocr_cache=not no_cache
+            )
+        finally:
+            remove_upload(pdf_path)
         
         if "error" in result:
             logger.error(f"Tesseract evaluation failed: {result['error']}")
@@ -78,6 +93,152 @@ async def evaluate_with_tesseract(
         logger.error(f"Tesseract evaluation endpoint error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Evaluation failed: {str(e)}")
 
+def _collect_answer_sheets(pdf_files: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Key each sheet by its file name (without extension), keeping duplicates distinct"""
+    sheets = []
+    seen = {}
+    for filename, pdf_path in pdf_files:
+        student_id = os.path.splitext(os.path.basename(filename or "sheet"))[0]
+        seen[student_id] = seen.get(student_id, 0) + 1
+        if seen[student_id] > 1:
+            student_id = f"{student_id}_{seen[student_id]}"
+        sheets.append((student_id, pdf_path))
+    return sheets
+
+def _copy_zip_entry(source, target, limit: int, filename: str) -> int:
+    """Copy one archive entry in chunks, stopping once it passes limit (declared sizes can lie)"""
+    copied = 0
+    while True:
+        chunk = source.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return copied
+        copied += len(chunk)
+        if copied > limit:
+            raise HTTPException(status_code=413, detail=f"{filename} is too large once extracted")
+        target.write(chunk)
+
+def _extract_zip_sheets(zip_path: str) -> List[Tuple[str, str]]:
+    """
+    Copy each PDF in the archive to its own temporary file without loading it into memory
+    
+    Each PDF is held to MAX_FILE_SIZE, like a direct upload, and all of them
+    together to MAX_BATCH_ZIP_EXTRACTED_SIZE, so a zip bomb cannot fill the disk.
+    """
+    pdf_files = []
+    extracted = 0
+    try:
+        with zipfile.ZipFile(zip_path) as archive:
+            entries = [
+                entry for entry in archive.infolist()
+                if not entry.is_dir() and entry.filename.lower().endswith(".pdf")
+            ]
+            for entry in entries:
+                if entry.file_size > settings.MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"{entry.filename} exceeds the maximum file size of {settings.MAX_FILE_SIZE} bytes"
+                    )
+            if sum(entry.file_size for entry in entries) > settings.MAX_BATCH_ZIP_EXTRACTED_SIZE:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"answer_sheets_zip exceeds {settings.MAX_BATCH_ZIP_EXTRACTED_SIZE} bytes once extracted"
+                )
+            
+            for entry in entries:
+                fd, pdf_path = tempfile.mkstemp(prefix="evalmate_upload_", suffix=".pdf")
+                pdf_files.append((entry.filename, pdf_path))
+                limit = min(settings.MAX_FILE_SIZE, settings.MAX_BATCH_ZIP_EXTRACTED_SIZE - extracted)
+                with os.fdopen(fd, "wb") as target, archive.open(entry) as source:
+                    extracted += _copy_zip_entry(source, target, limit, entry.filename)
+    except BaseException:
+        for _, pdf_path in pdf_files:
+            remove_upload(pdf_path)
+        raise
+    return pdf_files
+
+@router.post("/evaluate-tesseract-batch")
+async def evaluate_batch_with_tesseract(
+    answer_key: str = Form(...),
+    question_marks: str = Form(...),
+    question_texts: Optional[str] = Form(None),
+    answer_sheets: Optional[List[UploadFile]] = File(None),
+    answer_sheets_zip: Optional[UploadFile] = File(None),
+    no_cache: bool = Form(False)
+):
+    """
+    Evaluate a whole class against one answer key
+    
+    Accepts many answer-sheet PDFs and/or a zip of PDFs. The answer key is
+    parsed and analyzed once, sheets are graded in parallel, and results are
+    streamed back as newline-delimited JSON in completion order. Each sheet
+    is identified by its file name without the .pdf extension.
+    """
+    # Parse JSON inputs once for the whole batch
+    try:
+        answer_key_dict = json.loads(answer_key)
+        question_marks_dict = json.loads(question_marks)
+        question_texts_dict = json.loads(question_texts) if question_texts else None
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON format: {str(e)}")
+    
+    if not answer_key_dict or not question_marks_dict:
+        raise HTTPException(status_code=400, detail="Answer key and question marks are required")
+    
+    # Gather PDFs from direct uploads and the optional zip archive into temporary files
+    pdf_files = []
+    try:
+        for answer_sheet in answer_sheets or []:
+            if answer_sheet.content_type != "application/pdf":
+                raise HTTPException(status_code=400, detail=f"Only PDF files are supported: {answer_sheet.filename}")
+            pdf_files.append((answer_sheet.filename, await spool_upload(answer_sheet)))
+        
+        if answer_sheets_zip:
+            zip_path = await spool_upload(answer_sheets_zip, suffix=".zip", max_size=settings.MAX_BATCH_ZIP_SIZE)
+            try:
+                pdf_files.extend(_extract_zip_sheets(zip_path))
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail="answer_sheets_zip is not a valid zip archive")
+            finally:
+                remove_upload(zip_path)
+        
+        if not pdf_files:
+            raise HTTPException(status_code=400, detail="At least one answer-sheet PDF is required")
+    except BaseException:
+        for _, pdf_path in pdf_files:
+            remove_upload(pdf_path)
+        raise
+    
+    sheets = _collect_answer_sheets(pdf_files)
+    logger.info(f"Batch Tesseract evaluation started for {len(sheets)} answer sheets")
+    
+    def stream_results():
+        completed = 0
+        results = tesseract_evaluation_service.evaluate_batch(
+            answer_sheets=sheets,
+            answer_key=answer_key_dict,
+            question_marks=question_marks_dict,
+            question_texts=question_texts_dict,
+            use_ocr_cache=not no_cache
+        )
+        try:
+            for student_id, result in results:
+                completed += 1
+                yield json.dumps({
+                    "student_id": student_id,
+                    "success": "error" not in result,
+                    "completed": completed,
+                    "total": len(sheets),
+                    "data": result
+                }) + "\n"
+            logger.info(f"Batch Tesseract evaluation completed for {completed} answer sheets")
+        finally:
+            # Stop the worker pool before its input files go away
+            results.close()
+            for _, pdf_path in sheets:
+                remove_upload(pdf_path)
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 @router.post("/demo-tesseract")
 async def demo_tesseract_evaluation():
     """
@@ -111,7 +272,8 @@ async def demo_tesseract_evaluation():
         }
         
         # Run evaluation
-        result = tesseract_evaluation_service.evaluate(
+        result = await cpu_executor.run(
+            tesseract_evaluation_service.evaluate,
             pdf_file=None,
             answer_key=demo_answer_key,
             question_marks=demo_question_marks,
@@ -138,6 +300,13 @@ async def demo_tesseract_evaluation():
         logger.error(f"Demo Tesseract evaluation error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Demo evaluation failed: {str(e)}")
 
+@router.get("/ocr-cache")
+async def get_ocr_cache_stats():
+    """
+    Get OCR result cache hit/miss counters and size
+    """
+    return ocr_result_cache.stats()
+
 @router.get("/tesseract-info")
 async def get_tesseract_info():
     """
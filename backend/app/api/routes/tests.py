@@ -6,7 +6,8 @@ from app.db.models import Test, Examiner
 from app.core.security import get_current_user
 from app.schemas.test import TestCreate, TestResponse, TestUpdate
 from app.services.question_detection_service import question_detection_service
-import aiofiles
+from app.core.executor import cpu_executor
+from app.core.uploads import save_upload, remove_upload
 import os
 import json
 from datetime import datetime
@@ -45,27 +46,26 @@ async def create_test(
             filename = f"{file_type}_{timestamp}_{file.filename}"
             file_path = os.path.join(upload_dir, filename)
             
-            async with aiofiles.open(file_path, 'wb') as f:
-                content = await file.read()
-                await f.write(content)
+            await save_upload(file, file_path)
             
             return file_path
         return None
     
-    file_paths["question_paper_path"] = await save_file(question_paper, "question_paper")
-    file_paths["answer_key_path"] = await save_file(answer_key, "answer_key")
-    file_paths["reference_book_path"] = await save_file(reference_book, "reference_book")
+    try:
+        file_paths["question_paper_path"] = await save_file(question_paper, "question_paper")
+        file_paths["answer_key_path"] = await save_file(answer_key, "answer_key")
+        file_paths["reference_book_path"] = await save_file(reference_book, "reference_book")
+    except BaseException:
+        # e.g. 413 on a later file: don't leave the earlier ones behind
+        for path in file_paths.values():
+            remove_upload(path)
+        raise
     
     # Analyze question paper to detect questions and structure
     if question_paper:
         try:
-            # Read the PDF content for analysis
-            question_paper_content = await question_paper.read()
-            # Reset file pointer for saving
-            await question_paper.seek(0)
-            
-            # Analyze question paper
-            question_analysis = question_detection_service.analyze_question_paper(question_paper_content)
+            # Analyze the saved question paper from disk
+            question_analysis = await cpu_executor.run(question_detection_service.analyze_question_paper, file_paths["question_paper_path"])
             
             print(f"✅ Question analysis completed: {question_analysis.get('total_questions_detected', 0)} questions detected")
             
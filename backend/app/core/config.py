@@ -26,6 +26,15 @@ class Settings:
     
     # OpenAI Configuration (Alternative option)
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")  # Empty = api.openai.com; point at a stub server for offline testing
+    
+    # LLM Request Handling
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "5"))  # In-flight requests across the whole process
+    LLM_RATE_LIMIT_RPS: float = float(os.getenv("LLM_RATE_LIMIT_RPS", "3"))  # 0 disables rate limiting
+    LLM_RATE_LIMIT_BURST: int = int(os.getenv("LLM_RATE_LIMIT_BURST", "5"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    LLM_RETRY_BASE_DELAY: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+    LLM_BATCH_SIZE: int = int(os.getenv("LLM_BATCH_SIZE", "1"))  # Questions packed into one evaluation prompt
     
     # Google Cloud Vision
     GOOGLE_APPLICATION_CREDENTIALS: str = None
@@ -33,6 +42,56 @@ class Settings:
     # File Storage
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    # Batch grading zip: the upload itself, and the total of its PDFs once extracted (each PDF is capped at MAX_FILE_SIZE)
+    MAX_BATCH_ZIP_SIZE: int = int(os.getenv("MAX_BATCH_ZIP_SIZE", str(200 * 1024 * 1024)))  # 200MB
+    MAX_BATCH_ZIP_EXTRACTED_SIZE: int = int(os.getenv("MAX_BATCH_ZIP_EXTRACTED_SIZE", str(500 * 1024 * 1024)))  # 500MB
+    
+    # OCR Processing
+    OCR_PARALLEL_PAGES: bool = os.getenv("OCR_PARALLEL_PAGES", "true").lower() == "true"
+    OCR_MAX_WORKERS: int = int(os.getenv("OCR_MAX_WORKERS", str(os.cpu_count() or 1)))
+    
+    # Tesseract Backend (auto uses the in-process tesserocr API when installed, else the pytesseract CLI)
+    TESSERACT_BACKEND: str = os.getenv("TESSERACT_BACKEND", "auto")
+    
+    # OCR Engine Mode (cascade: cheapest engine first, heavier engines only on low-confidence lines; all: every engine on every page)
+    OCR_ENGINE_MODE: str = os.getenv("OCR_ENGINE_MODE", "cascade")
+    OCR_CASCADE_MIN_CONFIDENCE: float = float(os.getenv("OCR_CASCADE_MIN_CONFIDENCE", "0.6"))
+    
+    # OCR Result Cache (set OCR_CACHE_ENABLED=false to restore fresh-OCR-only behaviour)
+    OCR_CACHE_ENABLED: bool = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+    OCR_CACHE_PATH: str = os.getenv("OCR_CACHE_PATH", "cache/ocr_cache.db")
+    OCR_CACHE_MAX_BYTES: int = int(os.getenv("OCR_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # 256MB
+    
+    # Engines to load at startup instead of on first use (comma separated names, or "all")
+    ENGINE_WARMUP: str = os.getenv("ENGINE_WARMUP", "")
+    
+    # Batch Evaluation
+    EVALUATION_BATCH_WORKERS: int = int(os.getenv("EVALUATION_BATCH_WORKERS", str(os.cpu_count() or 1)))
+    
+    # CPU-bound Work Executor (thread pool)
+    CPU_EXECUTOR_WORKERS: int = int(os.getenv("CPU_EXECUTOR_WORKERS", str(os.cpu_count() or 1)))
+    CPU_EXECUTOR_MAX_CONCURRENCY: int = int(os.getenv("CPU_EXECUTOR_MAX_CONCURRENCY", str(os.cpu_count() or 1)))
+    
+    # LLM Response Cache (set LLM_CACHE_ENABLED=false to always call the model)
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_DIR: str = os.getenv("LLM_CACHE_DIR", "cache")
+    LLM_CACHE_MAX_BYTES: int = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 64MB per cache
+    LLM_CACHE_TTL_SECONDS: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))  # 7 days
+    
+    # Answer Similarity (exact is the difflib reference the grading thresholds are calibrated against;
+    # token_lcs is bounded-cost but scores answers over SIMILARITY_EXACT_MAX_CHARS higher, so it is opt-in
+    # until the thresholds are recalibrated - compare with python -m benchmarks.similarity_drift)
+    SIMILARITY_KERNEL: str = os.getenv("SIMILARITY_KERNEL", "exact")
+    SIMILARITY_EXACT_MAX_CHARS: int = int(os.getenv("SIMILARITY_EXACT_MAX_CHARS", "200"))
+    
+    # Per-question Semantic Evaluation (concurrent scoring runs on the thread-only cpu_executor, so it only
+    # lowers latency when scoring releases the GIL; the pure-Python scorer gains nothing and takes shared slots)
+    SEMANTIC_EVAL_CONCURRENT: bool = os.getenv("SEMANTIC_EVAL_CONCURRENT", "false").lower() == "true"
+    SEMANTIC_EVAL_MAX_CONCURRENCY: int = int(os.getenv("SEMANTIC_EVAL_MAX_CONCURRENCY", "8"))
+    
+    # Evaluation Job Queue
+    EVALUATION_JOB_WORKERS: int = int(os.getenv("EVALUATION_JOB_WORKERS", "2"))
+    EVALUATION_JOB_UPLOAD_DIR: str = os.getenv("EVALUATION_JOB_UPLOAD_DIR", "uploads/jobs")
     
     # LangGraph
     LANGGRAPH_API_KEY: str = None
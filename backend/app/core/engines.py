@@ -0,0 +1,149 @@
+"""
+Lazy Engine Registry
+Loads OCR and NLP backends on first use and shares one instance per process
+"""
+
+import time
+import threading
+import logging
+from typing import Dict, List, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class EngineUnavailable(RuntimeError):
+    """Raised when an engine is unknown or its loader failed"""
+
+class _EngineSlot:
+    """Loader, loaded instance and load outcome of one engine"""
+
+    def __init__(self, name: str, factory: Callable[[], Any], description: str):
+        self.name = name
+        self.factory = factory
+        self.description = description
+        self.instance: Any = None
+        self.loaded = False
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.lock = threading.Lock()
+
+class EngineRegistry:
+    """
+    Named engines built by their factory the first time they are needed
+
+    Loading is guarded per engine, so concurrent first requests build it once
+    and other engines stay usable meanwhile. A failed load is remembered so a
+    missing model is not retried on every page; `reset` clears it.
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, _EngineSlot] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any], description: str = ""):
+        """Declare an engine; nothing is loaded until `get`"""
+        with self._lock:
+            if name not in self._slots:
+                self._slots[name] = _EngineSlot(name, factory, description)
+
+    def lazy(self, name: str, factory: Callable[[], Any], description: str = "") -> "LazyEngine":
+        """Register an engine and return a proxy that loads it on first attribute access"""
+        self.register(name, factory, description)
+        return LazyEngine(self, name)
+
+    def _slot(self, name: str) -> _EngineSlot:
+        slot = self._slots.get(name)
+        if slot is None:
+            raise EngineUnavailable(f"Unknown engine: {name}")
+        return slot
+
+    def get(self, name: str) -> Any:
+        """The shared instance of an engine, loading it if needed"""
+        slot = self._slot(name)
+        if slot.loaded:
+            return slot.instance
+
+        with slot.lock:
+            if slot.loaded:
+                return slot.instance
+            if slot.error is not None:
+                raise EngineUnavailable(f"{name} failed to load: {slot.error}")
+
+            start = time.perf_counter()
+            try:
+                instance = slot.factory()
+            except Exception as e:
+                slot.error = f"{type(e).__name__}: {e}"
+                logger.warning(f"⚠️ Engine {name} failed to load: {slot.error}")
+                raise EngineUnavailable(f"{name} failed to load: {slot.error}") from e
+
+            slot.load_seconds = time.perf_counter() - start
+            slot.instance = instance
+            slot.loaded = True
+            logger.info(f"✅ Engine {name} loaded in {slot.load_seconds:.2f}s")
+            return instance
+
+    def is_loaded(self, name: str) -> bool:
+        slot = self._slots.get(name)
+        return slot is not None and slot.loaded
+
+    def failed(self, name: str) -> bool:
+        slot = self._slots.get(name)
+        return slot is not None and slot.error is not None
+
+    def warm_up(self, names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Load the given engines (all registered ones by default) and report each outcome"""
+        outcome = {}
+        for name in names or self.names():
+            try:
+                self.get(name)
+            except EngineUnavailable:
+                pass
+            outcome[name] = self.status().get(name, {"loaded": False, "error": "Unknown engine"})
+        return outcome
+
+    def reset(self, name: str):
+        """Drop a loaded instance or a remembered failure so the next `get` loads again"""
+        slot = self._slot(name)
+        with slot.lock:
+            slot.instance = None
+            slot.loaded = False
+            slot.error = None
+            slot.load_seconds = None
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._slots)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Load state of every registered engine"""
+        with self._lock:
+            slots = list(self._slots.values())
+        return {
+            slot.name: {
+                "description": slot.description,
+                "loaded": slot.loaded,
+                "load_seconds": round(slot.load_seconds, 3) if slot.load_seconds is not None else None,
+                "error": slot.error,
+            }
+            for slot in sorted(slots, key=lambda slot: slot.name)
+        }
+
+class LazyEngine:
+    """Stand-in for a module-level instance that is built on first use"""
+
+    def __init__(self, registry: EngineRegistry, name: str):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self._registry.get(self._name), attribute)
+
+    def __setattr__(self, attribute: str, value: Any):
+        setattr(self._registry.get(self._name), attribute, value)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._registry.is_loaded(self._name) else "not loaded"
+        return f"<LazyEngine {self._name} ({state})>"
+
+# Global registry instance
+engine_registry = EngineRegistry()
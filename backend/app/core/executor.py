@@ -0,0 +1,104 @@
+"""
+Shared executor for CPU-bound work
+Keeps OCR and scoring off the asyncio event loop with a bounded worker pool
+"""
+
+import asyncio
+import weakref
+import multiprocessing
+import functools
+import threading
+import logging
+from typing import Dict, Any, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class CPUBoundExecutor:
+    """Runs blocking callables in a thread pool with a concurrency limit per event loop"""
+
+    def __init__(self, max_workers: Optional[int] = None, max_concurrency: Optional[int] = None):
+        self.max_workers = max(1, max_workers or settings.CPU_EXECUTOR_WORKERS)
+        self.max_concurrency = max(1, max_concurrency or settings.CPU_EXECUTOR_MAX_CONCURRENCY)
+
+        self._thread_pool = None
+        # asyncio semaphores belong to one event loop, so keep one per loop
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cpu-bound")
+        return self._thread_pool
+
+    def _get_semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+            return semaphore
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) in the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore(loop)
+
+        with self._lock:
+            self.queued += 1
+        acquired = False
+        try:
+            async with semaphore:
+                acquired = True
+                with self._lock:
+                    self.queued -= 1
+                    self.running += 1
+                try:
+                    result = await loop.run_in_executor(self._get_thread_pool(), functools.partial(func, *args, **kwargs))
+                except Exception:
+                    with self._lock:
+                        self.failed += 1
+                    raise
+                finally:
+                    with self._lock:
+                        self.running -= 1
+        finally:
+            if not acquired:
+                # Cancelled while waiting for a slot
+                with self._lock:
+                    self.queued -= 1
+
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and throughput counters"""
+        return {
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._thread_pool:
+            self._thread_pool.shutdown(wait=False)
+
+def worker_process_context():
+    """Start method for worker process pools: the server is threaded, so never fork it"""
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+# Global executor instance
+cpu_executor = CPUBoundExecutor()
@@ -0,0 +1,251 @@
+"""
+Operational Metrics
+Counters, gauges and histograms rendered in the Prometheus text exposition format
+"""
+
+import time
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Request latency buckets in seconds; OCR-heavy uploads run well past a second
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Routers reported separately; any other path is labelled "other"
+ROUTER_PREFIXES = (
+    "/api/advanced",
+    "/api/tesseract",
+    "/api/evaluations",
+    "/api/question-detection",
+    "/api/jobs",
+    "/api/engines",
+    "/api/tests",
+    "/api/auth",
+    "/api/students",
+    "/api/examiners",
+)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    """
+    A named metric family with a fixed set of label names
+
+    Values are either recorded as they happen, or computed at scrape time by
+    `collect`, which returns {label values tuple: value} (for totals another
+    component already keeps, such as cache hit counts).
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 collect: Optional[Callable[[], Dict[LabelValues, float]]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.collect = collect
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def items(self) -> List[Tuple[LabelValues, float]]:
+        """Current (label values, value) pairs"""
+        if self.collect is not None:
+            return sorted((tuple(str(v) for v in key), value) for key, value in self.collect().items())
+        with self._lock:
+            return sorted(self._values.items())
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                for key, value in self.items()]
+
+    def render(self) -> List[str]:
+        return self.header() + self.samples()
+
+class Counter(Metric):
+    """Monotonically increasing total"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    """Current value that can go up and down"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, Dict[str, Any]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            # Per-bucket counts; made cumulative when rendered
+            series["counts"][bisect_left(self.buckets, value)] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series_items = sorted((key, dict(series, counts=list(series["counts"])))
+                                  for key, series in self._series.items())
+        lines = []
+        for key, series in series_items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series["counts"]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {series['count']}")
+        return lines
+
+class MetricsRegistry:
+    """Named metrics rendered together for a /metrics scrape"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric, or return the one already registered under its name"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                collect: Optional[Callable[[], Dict[LabelValues, float]]] = None) -> Counter:
+        return self.register(Counter(name, documentation, labels, collect))
+
+    def gauge(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+              collect: Optional[Callable[[], Dict[LabelValues, float]]] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, labels, collect))
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        """All metrics in the text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # A failing collector must not take the whole scrape down
+                lines.append(f"# {metric.name} unavailable: {_escape(str(e))}")
+        return "\n".join(lines) + "\n"
+
+# Global registry
+metrics_registry = MetricsRegistry()
+
+http_request_duration = metrics_registry.histogram(
+    "evalmate_http_request_duration_seconds",
+    "HTTP request latency by router, method and status code",
+    ("router", "method", "status")
+)
+http_requests_in_progress = metrics_registry.gauge(
+    "evalmate_http_requests_in_progress",
+    "HTTP requests currently being served, by router",
+    ("router",)
+)
+ocr_pages = metrics_registry.counter(
+    "evalmate_ocr_pages_total",
+    "Pages run through an OCR engine (cache hits excluded)",
+    ("engine",)
+)
+ocr_seconds = metrics_registry.counter(
+    "evalmate_ocr_seconds_total",
+    "Wall-clock seconds spent in OCR engines",
+    ("engine",)
+)
+
+def _ocr_throughput() -> Dict[LabelValues, float]:
+    seconds = dict(ocr_seconds.items())
+    return {key: pages / seconds[key] for key, pages in ocr_pages.items() if seconds.get(key)}
+
+metrics_registry.gauge(
+    "evalmate_ocr_pages_per_second",
+    "OCR throughput while OCR is running (pages / OCR seconds, since start)",
+    ("engine",),
+    collect=_ocr_throughput
+)
+
+def router_label(path: str) -> str:
+    """Router prefix a request path belongs to"""
+    for prefix in ROUTER_PREFIXES:
+        if path == prefix or path.startswith(prefix + "/"):
+            return prefix
+    return "other"
+
+def record_ocr_pages(engine: str, pages: int, seconds: float):
+    """Count pages an OCR engine processed and the time it took"""
+    if pages:
+        ocr_pages.inc(pages, engine=engine)
+        ocr_seconds.inc(seconds, engine=engine)
+
+async def track_request_metrics(request, call_next):
+    """HTTP middleware recording per-router request latency"""
+    router = router_label(request.url.path)
+    method = request.method
+    status = "500"
+    http_requests_in_progress.inc(router=router)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        http_request_duration.observe(time.perf_counter() - start, router=router, method=method, status=status)
+        http_requests_in_progress.dec(router=router)
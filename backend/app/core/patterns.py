@@ -0,0 +1,150 @@
+"""
+Compiled Regex Registry
+Patterns used by the text analyzer, answer parser and question detectors, compiled once
+"""
+
+import re
+from typing import Dict, List, Optional
+
+# Text analysis (AdvancedTextAnalyzer)
+SENTENCE_SPLIT = re.compile(r'[.!?]+')
+WORD = re.compile(r'\b\w+\b')
+
+FORMULA_PATTERNS = [
+    re.compile(r'[A-Za-z]+\s*=\s*[A-Za-z0-9\+\-\*/\(\)\s]+'),  # Basic equations
+    re.compile(r'\d+\s*[+\-*/]\s*\d+\s*=\s*\d+'),  # Arithmetic
+    re.compile(r'[A-Z]+\d*\s*[+\-]\s*[A-Z]+\d*'),  # Chemical formulas
+    re.compile(r'\d+\s*×\s*\d+|\d+\s*÷\s*\d+'),  # Multiplication/division
+    re.compile(r'½|¼|¾|\d+/\d+'),  # Fractions
+]
+
+# Each causal pattern found adds to the score, so they stay separate
+CAUSAL_PATTERNS = [
+    re.compile(r'because\s+\w+'),
+    re.compile(r'due\s+to\s+\w+'),
+    re.compile(r'results?\s+in\s+\w+'),
+    re.compile(r'leads?\s+to\s+\w+'),
+    re.compile(r'causes?\s+\w+'),
+    re.compile(r'therefore\s+\w+'),
+]
+
+MEASUREMENT = re.compile(r'\d+\.?\d*\s*(?:km|m|cm|mm|kg|g|mg|l|ml|hours?|minutes?|seconds?|%)')
+YEAR = re.compile(r'\b(?:19|20)\d{2}\b')
+PROPER_NOUN = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+SCIENTIFIC_NOTATION = re.compile(r'\d+\.?\d*\s*[×x]\s*10\^?\d+')
+
+# Only presence matters for these, so each is a single alternation
+DEFINITION = re.compile(
+    r'\w+\s+is\s+(?:a|an|the)\s+\w+'
+    r'|\w+\s+refers\s+to\s+\w+'
+    r'|\w+\s+means\s+\w+'
+    r'|\w+\s+is\s+defined\s+as\s+\w+'
+)
+MATHEMATICAL = re.compile(r'=|\+|-|\*|/|\^|²|³|formula|equation|calculate|solve')
+
+# Answer parsing (CustomAnswerParser)
+WHITESPACE_RUN = re.compile(r'\s+')
+SPACE_BEFORE_PUNCTUATION = re.compile(r'\s+([.!?])')
+SENTENCE_START = re.compile(r'([.!?])\s*([A-Z])')
+ANSWER_LEADING_NOISE = re.compile(r'^[\s\.\-\:\)]+')
+ANSWER_TRAILING_NOISE = re.compile(r'[\s\.\-\:]+$')
+ANSWER_LEADING_NUMBER = re.compile(r'^\d+[\.\)\:\s]+')
+NON_WORD = re.compile(r'[^\w\s]')
+
+# Question markers in OCR text ("1.", "Q2)", "Question 3:", OCR'd "O4."): anywhere at a
+# line start, or mid-line when tagged with Q/Question or followed by . ) or : (the parser
+# only trusts mid-line markers for the next expected question)
+ANSWER_MARKER = re.compile(
+    r'^[^\S\n]*[^\w\n]*(?:(?:Question|Qn|Q)[\s\.]?)?[O0]?(?P<line_number>\d+)(?!\w|[\.,]\d)[\.\)\:]*'
+    r'|(?<=\s)(?:Question|Qn|Q)[\s\.]?(?P<tagged_number>\d+)\b[\.\)\:]*'
+    r'|(?<=\s)(?P<inline_number>\d+)[\.\)\:]+(?=\s|$)',
+    re.MULTILINE | re.IGNORECASE
+)
+
+# Line-level question starts (QuestionDetectorAgent), tried in this order
+QUESTION_LINE = re.compile(
+    # Standard patterns: "1.", "Q1.", "Question 1:"
+    r'^(?:Q\.?|Question\.?\s*|Qn\.?\s*)?(?P<n0>\d+)\.?\s*[:.]?\s*(?P<t0>.*?)$'
+    # Bracketed patterns: "(1)", "[1]"
+    r'|^[\(\[](?P<n1>\d+)[\)\]]\s*\.?\s*(?P<t1>.*?)$'
+    # Simple number patterns: "1 ", "1)"
+    r'|^(?P<n2>\d+)[\)\.]\s+(?P<t2>.*?)$'
+    # Complex patterns with words
+    r'|^(?:Question|Q|Qn)[\s\.]?(?P<n3>\d+)[\.\:\-\s]+(?P<t3>.*?)$',
+    re.IGNORECASE
+)
+
+def match_question_line(line: str) -> Optional[Dict[str, str]]:
+    """Number and text of a line that starts a question, or None"""
+    match = QUESTION_LINE.match(line)
+    if not match:
+        return None
+    for i in range(4):
+        if match.group(f"n{i}") is not None:
+            return {"number": match.group(f"n{i}"), "text": match.group(f"t{i}")}
+    return None
+
+# Question paper numbering styles (QuestionDetectionService)
+ROMAN_NUMERALS = ['i', 'ii', 'iii', 'iv', 'v', 'vi', 'vii', 'viii', 'ix', 'x',
+                  'xi', 'xii', 'xiii', 'xiv', 'xv', 'xvi', 'xvii', 'xviii', 'xix', 'xx']
+
+QUESTION_STYLES = ["numbered_dots", "q_prefix", "brackets", "question_word", "roman_numerals"]
+
+_BOUNDARY_FLAGS = re.MULTILINE | re.DOTALL | re.IGNORECASE
+
+# Marker and question text for each numbering style (each follows a line start)
+_STYLE_FRAGMENTS = {
+    "numbered_dots": r'(?P<numbered_dots>\d+)\.\s*(?P<numbered_dots_text>[^0-9\n]*?)(?=\n\s*\d+\.|$)',
+    "q_prefix": r'Q\s*(?P<q_prefix>\d+)[\.\:\s]*(?P<q_prefix_text>[^Q\n]*?)(?=\n\s*Q\s*\d+|$)',
+    "brackets": r'\((?P<brackets>\d+)\)\s*(?P<brackets_text>[^\(\n]*?)(?=\n\s*\(\d+\)|$)',
+    "question_word": r'Question\s*(?P<question_word>\d+)[\.\:\s]*(?P<question_word_text>[^Q\n]*?)(?=\n\s*Question\s*\d+|$)',
+    "roman_numerals": (
+        r'(?P<roman_numerals>' + '|'.join(sorted(ROMAN_NUMERALS, key=len, reverse=True)) + r')\.\s*'
+        r'(?P<roman_numerals_text>[^ivx\n]*?)(?=\n\s*(?:i{1,3}|iv|v|vi{1,3}|ix|x)\.|$)'
+    )
+}
+
+# All styles as one alternation; their markers start with different tokens, so at
+# most one style can match at any position
+QUESTION_BOUNDARY = re.compile(
+    r'(?:^|\n)\s*(?:' + '|'.join(_STYLE_FRAGMENTS.values()) + r')',
+    _BOUNDARY_FLAGS
+)
+
+# Marks allocation: (5 marks), [5 marks], 5 marks, (5m), ... (each counted separately)
+MARKS_PATTERNS = [
+    re.compile(r'\((\d+)\s*marks?\)', re.IGNORECASE),
+    re.compile(r'\[(\d+)\s*marks?\]', re.IGNORECASE),
+    re.compile(r'(\d+)\s*marks?', re.IGNORECASE),
+    re.compile(r'\((\d+)m\)', re.IGNORECASE),
+    re.compile(r'\[(\d+)m\]', re.IGNORECASE),
+    re.compile(r'(\d+)m\b', re.IGNORECASE)
+]
+
+def scan_question_boundaries(text: str) -> Dict[str, List["re.Match"]]:
+    """
+    Group every question boundary in text by numbering style in one pass
+
+    Gives the same matches as running each style's pattern over the whole text
+    on its own (each roman numeral on its own, as they used to be scanned): the
+    scan resumes just after each match start, since a marker like "Q\n2" can
+    span the start of another style's boundary, and a match is only kept if it
+    does not overlap the previous match of its own style (or numeral).
+    """
+    boundaries = {style: [] for style in QUESTION_STYLES}
+    last_end = {}
+    position = 0
+
+    while True:
+        match = QUESTION_BOUNDARY.search(text, position)
+        if not match:
+            break
+        position = match.start() + 1
+        style = match.lastgroup[:-len("_text")]
+        key = (style, match.group(style).lower()) if style == "roman_numerals" else style
+
+        if match.start() >= last_end.get(key, 0):
+            boundaries[style].append(match)
+            last_end[key] = match.end()
+
+    return boundaries
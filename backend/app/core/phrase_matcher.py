@@ -0,0 +1,127 @@
+"""
+Multi-Phrase Matcher
+Aho-Corasick automaton that finds every phrase of many word lists in one pass over a text
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Iterable, Iterator, Tuple, Union
+
+try:
+    import ahocorasick  # pyahocorasick (C implementation)
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+class PhraseMatches:
+    """Occurrences of a matcher's phrases in one text"""
+
+    def __init__(self, positions: Dict[str, List[int]], groups: Dict[str, List[str]]):
+        self.positions = positions
+        self._groups = groups
+
+    def __contains__(self, phrase: str) -> bool:
+        return phrase in self.positions
+
+    def count(self, phrase: str) -> int:
+        """Number of (possibly overlapping) occurrences of a phrase"""
+        return len(self.positions.get(phrase, ()))
+
+    def present(self, group: str) -> List[str]:
+        """Phrases of a group found in the text, in the group's order"""
+        return [phrase for phrase in self._groups[group] if phrase in self.positions]
+
+    def any(self, group: str) -> bool:
+        """Whether any phrase of a group was found"""
+        return any(phrase in self.positions for phrase in self._groups[group])
+
+    def counts(self) -> Dict[str, int]:
+        """Occurrence count for every phrase found"""
+        return {phrase: len(starts) for phrase, starts in self.positions.items()}
+
+class PhraseMatcher:
+    """
+    Finds all occurrences of a fixed set of phrases with one scan per text
+
+    Matching is case-insensitive substring matching, the same as
+    `phrase in text.lower()`. Phrases can be organised in named groups
+    (e.g. causal words, process indicators) that are all matched together.
+    Positions are start offsets into text.lower().
+    """
+
+    def __init__(self, phrases: Union[Dict[str, Iterable[str]], Iterable[str]]):
+        if not isinstance(phrases, dict):
+            phrases = {"default": phrases}
+        self.groups: Dict[str, List[str]] = {
+            group: list(dict.fromkeys(phrase.lower() for phrase in group_phrases if phrase))
+            for group, group_phrases in phrases.items()
+        }
+        self.phrases = list(dict.fromkeys(phrase for group in self.groups.values() for phrase in group))
+
+        if HAS_AHOCORASICK:
+            self._automaton = ahocorasick.Automaton()
+            for phrase in self.phrases:
+                self._automaton.add_word(phrase, phrase)
+            if self.phrases:
+                self._automaton.make_automaton()
+        else:
+            self._build_automaton()
+
+    def _build_automaton(self):
+        """Pure-Python goto/fail/output tables, used when pyahocorasick is not installed"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[List[str]] = [[]]
+        for phrase in self.phrases:
+            state = 0
+            for char in phrase:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].append(phrase)
+
+        # Breadth-first failure links, merging outputs of each state's suffixes
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, target in self._goto[state].items():
+                queue.append(target)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[target] = self._goto[fallback].get(char, 0)
+                self._output[target] = self._output[target] + self._output[self._fail[target]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (start, phrase) for every occurrence, in order of where each ends"""
+        text = text.lower()
+        if not self.phrases:
+            return
+
+        if HAS_AHOCORASICK:
+            for end, phrase in self._automaton.iter(text):
+                yield end - len(phrase) + 1, phrase
+            return
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for phrase in output[state]:
+                yield index - len(phrase) + 1, phrase
+
+    def scan(self, text: str) -> PhraseMatches:
+        """Find every phrase in text in a single pass"""
+        positions: Dict[str, List[int]] = {}
+        for start, phrase in self.finditer(text):
+            positions.setdefault(phrase, []).append(start)
+        return PhraseMatches(positions, self.groups)
+
+@lru_cache(maxsize=256)
+def phrase_matcher_for(phrases: Tuple[str, ...]) -> PhraseMatcher:
+    """Matcher for a per-question phrase list (e.g. model-answer keywords), built once and reused"""
+    return PhraseMatcher(phrases)
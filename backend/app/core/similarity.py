@@ -0,0 +1,108 @@
+"""
+Text Similarity Kernels
+Interchangeable answer-to-model-answer similarity measures with bounded cost
+"""
+
+import difflib
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+class SimilarityKernel(ABC):
+    """Scores how similar two normalized texts are, from 0.0 to 1.0"""
+
+    name = "base"
+
+    @abstractmethod
+    def similarity(self, text1: str, text2: str) -> float:
+        """Similarity of text1 and text2, from 0.0 to 1.0"""
+
+class ExactSimilarityKernel(SimilarityKernel):
+    """
+    difflib.SequenceMatcher ratio over characters
+
+    The reference scores that grading thresholds are calibrated against (the
+    default); quadratic in the worst case on long answers.
+    """
+
+    name = "exact"
+
+    def similarity(self, text1: str, text2: str) -> float:
+        return difflib.SequenceMatcher(None, text1, text2).ratio()
+
+def token_lcs_length(tokens1: List[str], tokens2: List[str]) -> int:
+    """
+    Length of the longest common subsequence of two token lists
+
+    Bit-parallel LCS (Allison-Dix): the shorter list is a bit vector held in one
+    Python int, and each token of the longer list costs a few big-integer
+    operations on it, i.e. O(n * m / 64) machine words instead of n * m steps.
+    """
+    if len(tokens1) < len(tokens2):
+        tokens1, tokens2 = tokens2, tokens1
+
+    # Bit j of a token's mask is set where the token occurs in the shorter list
+    masks: Dict[str, int] = {}
+    for position, token in enumerate(tokens2):
+        masks[token] = masks.get(token, 0) | (1 << position)
+
+    full = (1 << len(tokens2)) - 1
+    row = full
+    for token in tokens1:
+        mask = masks.get(token)
+        if mask:
+            matched = row & mask
+            row = ((row + matched) | (row - matched)) & full
+
+    # Zero bits mark the positions that ended up in the subsequence
+    return len(tokens2) - row.bit_count()
+
+class TokenLCSSimilarityKernel(SimilarityKernel):
+    """
+    2 * LCS / total tokens over word tokens, the token-level analogue of difflib's ratio
+
+    Cost is bounded by token_lcs_length, so long essays score in milliseconds.
+    Opt-in: long answers score noticeably higher than with the exact kernel
+    (see benchmarks/similarity_drift.py), so thresholds need recalibrating first.
+    Pairs where both texts are at most exact_max_chars long are scored with the
+    exact kernel instead, as difflib is cheap there and short answers keep
+    their character-level partial credit.
+    """
+
+    name = "token_lcs"
+
+    def __init__(self, exact_max_chars: Optional[int] = None):
+        self.exact_max_chars = settings.SIMILARITY_EXACT_MAX_CHARS if exact_max_chars is None else exact_max_chars
+        self.exact = ExactSimilarityKernel()
+
+    def similarity(self, text1: str, text2: str) -> float:
+        if text1 == text2:
+            return 1.0
+        if len(text1) <= self.exact_max_chars and len(text2) <= self.exact_max_chars:
+            return self.exact.similarity(text1, text2)
+
+        tokens1, tokens2 = text1.split(), text2.split()
+        if not tokens1 or not tokens2:
+            return 0.0 if tokens1 or tokens2 else 1.0
+
+        # No shared token means an empty LCS
+        if set(tokens1).isdisjoint(tokens2):
+            return 0.0
+        return 2.0 * token_lcs_length(tokens1, tokens2) / (len(tokens1) + len(tokens2))
+
+# Kernel factories by name; register another kernel by adding it here
+SIMILARITY_KERNELS: Dict[str, Callable[[], SimilarityKernel]] = {
+    ExactSimilarityKernel.name: ExactSimilarityKernel,
+    TokenLCSSimilarityKernel.name: TokenLCSSimilarityKernel,
+}
+
+def get_similarity_kernel(name: Optional[str] = None) -> SimilarityKernel:
+    """Kernel configured by SIMILARITY_KERNEL (or the one named)"""
+    name = (name or settings.SIMILARITY_KERNEL).lower()
+    if name not in SIMILARITY_KERNELS:
+        raise ValueError(f"Similarity kernel must be one of {', '.join(SIMILARITY_KERNELS)}, got {name}")
+    return SIMILARITY_KERNELS[name]()
+
+# Global kernel instance
+similarity_kernel = get_similarity_kernel()
@@ -0,0 +1,136 @@
+"""
+Persistent SQLite-backed LRU cache
+Shared storage layer for result caches that must survive restarts
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class SQLiteLRUCache:
+    """Size-bounded key/value store with least-recently-used eviction"""
+
+    def __init__(self, db_path: str, max_bytes: int, ttl_seconds: Optional[float] = None, name: str = "cache"):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._initialize_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a short-lived connection (safe to call from any thread)"""
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _initialize_schema(self):
+        """Create the cache table if it does not exist yet"""
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache_entries (last_access)")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value and refresh its recency, or None on a miss"""
+        now = time.time()
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM cache_entries WHERE key = ?", (key,)
+                ).fetchone()
+
+                if row and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                    conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                    self.evictions += 1
+                    row = None
+
+                if row is None:
+                    self.misses += 1
+                    return None
+
+                conn.execute("UPDATE cache_entries SET last_access = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return row[0]
+        except sqlite3.Error as e:
+            logger.warning(f"{self.name} lookup failed: {e}")
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str):
+        """Store a value, evicting least-recently-used entries beyond max_bytes"""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, value, size, now, now)
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"{self.name} write failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop the oldest entries until the cache fits in max_bytes"""
+        total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+        if total_bytes <= self.max_bytes:
+            return
+
+        for key, size in conn.execute("SELECT key, size FROM cache_entries ORDER BY last_access ASC").fetchall():
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            self.evictions += 1
+            total_bytes -= size
+            if total_bytes <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Remove every entry from the cache"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM cache_entries")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size"""
+        try:
+            with self._connect() as conn:
+                entries, total_bytes = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+                ).fetchone()
+        except sqlite3.Error:
+            entries, total_bytes = 0, 0
+
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": total_bytes,
+            "max_bytes": self.max_bytes
+        }
@@ -0,0 +1,183 @@
+"""
+Workflow Tracing
+Timed spans and counters for evaluation workflows, plus process-wide aggregates
+"""
+
+import time
+import uuid
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Any, Optional, Iterator
+
+class Span:
+    """One timed step of a workflow, with nested sub-spans"""
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attributes = attributes or {}
+        self.children: List["Span"] = []
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        span = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration_ms, 3),
+        }
+        if self.attributes:
+            span["attributes"] = self.attributes
+        if self.error:
+            span["error"] = self.error
+        if self.children:
+            span["children"] = [child.to_dict(origin) for child in self.children]
+        return span
+
+class WorkflowTrace:
+    """Span tree and counters for one workflow run"""
+
+    def __init__(self, workflow: str):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.root = Span(workflow)
+        self.counters: Dict[str, float] = {}
+
+    def count(self, name: str, value: float = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self):
+        if self.root.end is None:
+            self.root.end = time.perf_counter()
+
+    def stage_timings(self) -> Dict[str, float]:
+        """Duration of each top-level span in milliseconds"""
+        timings: Dict[str, float] = {}
+        for span in self.root.children:
+            timings[span.name] = round(timings.get(span.name, 0.0) + span.duration_ms, 3)
+        return timings
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "workflow": self.root.name,
+            "total_ms": round(self.root.duration_ms, 3),
+            "stage_timings_ms": self.stage_timings(),
+            "counters": dict(self.counters),
+            "spans": [child.to_dict(self.root.start) for child in self.root.children],
+        }
+
+# Active trace and innermost open span; asyncio tasks inherit both from the code that created them
+_current_trace: ContextVar[Optional[WorkflowTrace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+@contextmanager
+def start_trace(workflow: str) -> Iterator[WorkflowTrace]:
+    """Make a new trace current for the enclosed workflow run"""
+    trace = WorkflowTrace(workflow)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(trace.root)
+    try:
+        yield trace
+    finally:
+        trace.finish()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+@contextmanager
+def trace_span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """Time the enclosed block as a child of the current span (no-op outside a trace)"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    span = Span(name, attributes)
+    parent.children.append(span)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.end = time.perf_counter()
+        _current_span.reset(token)
+
+def trace_count(name: str, value: float = 1):
+    """Add to a counter of the current trace (no-op outside a trace)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.count(name, value)
+
+class TraceMetrics:
+    """Process-wide span latency and counter totals across finished traces"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._workflows: Dict[str, int] = {}
+        self._spans: Dict[str, Dict[str, Any]] = {}
+        self._counters: Dict[str, float] = {}
+
+    def record(self, trace: WorkflowTrace):
+        """Add a finished trace's spans (by name, at any depth) and counters"""
+        with self._lock:
+            workflow = trace.root.name
+            self._workflows[workflow] = self._workflows.get(workflow, 0) + 1
+            self._record_span(f"{workflow}.total", trace.root.duration_ms)
+
+            pending = list(trace.root.children)
+            while pending:
+                span = pending.pop()
+                self._record_span(span.name, span.duration_ms)
+                pending.extend(span.children)
+
+            for name, value in trace.counters.items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def _record_span(self, name: str, duration_ms: float):
+        stats = self._spans.get(name)
+        if stats is None:
+            stats = self._spans[name] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                         "recent": deque(maxlen=self.window)}
+        stats["count"] += 1
+        stats["total_ms"] += duration_ms
+        stats["max_ms"] = max(stats["max_ms"], duration_ms)
+        stats["recent"].append(duration_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counts, totals and recent p50/p95 for every span name, plus counter totals"""
+        with self._lock:
+            spans = {}
+            for name, stats in sorted(self._spans.items()):
+                recent = sorted(stats["recent"])
+                spans[name] = {
+                    "count": stats["count"],
+                    "total_ms": round(stats["total_ms"], 3),
+                    "mean_ms": round(stats["total_ms"] / stats["count"], 3),
+                    "p50_ms": round(recent[(len(recent) - 1) // 2], 3),
+                    "p95_ms": round(recent[int((len(recent) - 1) * 0.95)], 3),
+                    "max_ms": round(stats["max_ms"], 3),
+                }
+            return {
+                "workflows": dict(self._workflows),
+                "spans": spans,
+                "counters": dict(self._counters),
+                "window": self.window,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._workflows.clear()
+            self._spans.clear()
+            self._counters.clear()
+
+# Global metrics instance
+trace_metrics = TraceMetrics()
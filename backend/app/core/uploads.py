@@ -0,0 +1,60 @@
+"""
+Streaming upload helpers
+Write uploads to disk in chunks instead of reading whole files into memory
+"""
+
+import os
+import tempfile
+from typing import Optional, Union
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import settings
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+async def save_upload(upload: UploadFile, destination: str, max_size: Optional[int] = None) -> int:
+    """Stream an upload to destination, rejecting it as soon as it exceeds max_size; returns bytes written"""
+    max_size = settings.MAX_FILE_SIZE if max_size is None else max_size
+    size = 0
+
+    try:
+        async with aiofiles.open(destination, 'wb') as f:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"{upload.filename or 'Upload'} exceeds the maximum file size of {max_size} bytes"
+                    )
+                await f.write(chunk)
+    except BaseException:
+        # Never leave a partial file behind
+        if os.path.exists(destination):
+            os.remove(destination)
+        raise
+
+    return size
+
+async def spool_upload(upload: UploadFile, suffix: str = ".pdf", max_size: Optional[int] = None) -> str:
+    """Stream an upload into a new temporary file and return its path (the caller removes it)"""
+    fd, path = tempfile.mkstemp(prefix="evalmate_upload_", suffix=suffix)
+    os.close(fd)
+    await save_upload(upload, path, max_size)
+    return path
+
+def remove_upload(path: Optional[str]):
+    """Delete a spooled upload if it still exists"""
+    if path and os.path.exists(path):
+        os.remove(path)
+
+def open_pdf(pdf_source: Union[bytes, str]):
+    """Open a PDF given as a file path (read lazily from disk) or as bytes"""
+    import fitz  # PyMuPDF
+    if isinstance(pdf_source, (bytes, bytearray)):
+        return fitz.open(stream=pdf_source, filetype="pdf")
+    return fitz.open(pdf_source)
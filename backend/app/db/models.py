@@ -103,4 +103,25 @@ class AnswerSheetUpload(Base):
     file_size = Column(Integer)
     upload_status = Column(String, default="uploaded")  # uploaded, processing, processed, failed
     uploaded_at = Column(DateTime, default=datetime.utcnow)
-    processed_at = Column(DateTime)
\ No newline at end of file
+    processed_at = Column(DateTime)
+
+class EvaluationJob(Base):
+    __tablename__ = "evaluation_jobs"
+    
+    id = Column(String, primary_key=True, index=True)
+    evaluation_type = Column(String, nullable=False)  # tesseract, semantic
+    
+    # Inputs
+    upload_path = Column(String)  # Stored answer sheet PDF (None for manual answers)
+    parameters = Column(Text, nullable=False)  # JSON string with answer key, marks, etc.
+    
+    # Outputs
+    result = Column(Text)  # JSON string with the evaluation result
+    error = Column(Text)
+    
+    # Status (same lifecycle as Evaluation.status)
+    status = Column(String, default="pending", index=True)  # pending, processing, completed, failed
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
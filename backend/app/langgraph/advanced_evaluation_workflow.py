@@ -3,7 +3,6 @@ Advanced LangGraph PDF Scanning and Evaluation Workflow
 Multi-agent system for line-by-line PDF analysis and semantic evaluation
 """
 
-import re
 import json
 import logging
 from typing import Dict, List, Any, Optional, Tuple, TypedDict
@@ -15,6 +14,9 @@ import asyncio
 from typing import Annotated
 from operator import add
 
+from app.core.patterns import QUESTION_LINE, match_question_line
+from app.core.tracing import start_trace, trace_span, trace_count, trace_metrics
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -24,13 +26,14 @@ class WorkflowState(TypedDict):
     pdf_path: str
     raw_content: str
     lines: List[str]
+    line_confidences: List[Optional[float]]  # OCR word confidence of each line (None when unknown)
     detected_questions: Dict[str, Dict[str, Any]]
     answer_key: Dict[str, str]
     question_marks: Dict[str, int]
     evaluations: Dict[str, Dict[str, Any]]
     errors: List[str]
     processing_stage: str
-    confidence_scores: Dict[str, float]
+    confidence_scores: Dict[str, float]  # OCR confidence of each answer (detection confidence when unknown)
 
 @dataclass
 class QuestionDetection:
@@ -70,15 +73,25 @@ class PDFScannerAgent:
             # Import OCR service here to avoid circular imports
             from app.services.advanced_pdf_ocr_service import get_ocr_service
             
-            ocr_service = get_ocr_service()
-            ocr_results = await ocr_service.extract_content(state["pdf_path"])
+            ocr_service = get_ocr_service()  # Shared per process; extraction state is per call
+            with trace_span("OCRService.extract_content"):
+                ocr_results = await ocr_service.extract_content(state["pdf_path"])
             
             raw_content = ocr_results.get("raw_text", "")
             state["raw_content"] = raw_content
             
-            # Split into lines for line-by-line analysis
-            lines = [line.strip() for line in raw_content.split('\n') if line.strip()]
+            # Split into lines for line-by-line analysis, keeping each line's OCR confidence alongside
+            raw_lines = raw_content.split('\n')
+            line_confidences = ocr_results.get("line_confidences") or []
+            if len(line_confidences) != len(raw_lines):
+                line_confidences = [None] * len(raw_lines)
+            kept = [(line.strip(), confidence) for line, confidence in zip(raw_lines, line_confidences) if line.strip()]
+            lines = [line for line, _ in kept]
             state["lines"] = lines
+            state["line_confidences"] = [confidence for _, confidence in kept]
+            
+            trace_count("pages", ocr_results.get("processing_info", {}).get("page_count", 0))
+            trace_count("lines", len(lines))
             
             logger.info(f"✅ PDFScannerAgent: Extracted {len(lines)} lines from PDF")
             
@@ -94,17 +107,8 @@ class QuestionDetectorAgent:
     """Agent responsible for detecting questions and answers line by line"""
     
     def __init__(self):
-        # Enhanced question patterns
-        self.question_patterns = [
-            # Standard patterns: "1.", "Q1.", "Question 1:"
-            r'^(?:Q\.?|Question\.?\s*|Qn\.?\s*)?(\d+)\.?\s*[:.]?\s*(.*?)$',
-            # Bracketed patterns: "(1)", "[1]"
-            r'^[\(\[](\d+)[\)\]]\s*\.?\s*(.*?)$',
-            # Simple number patterns: "1 ", "1)"
-            r'^(\d+)[\)\.]\s+(.*?)$',
-            # Complex patterns with words
-            r'^(?:Question|Q|Qn)[\s\.]?(\d+)[\.\:\-\s]+(.*?)$'
-        ]
+        # Enhanced question patterns, combined into one alternation (see app.core.patterns)
+        self.question_pattern = QUESTION_LINE
         
         # Answer continuation indicators
         self.answer_indicators = [
@@ -120,9 +124,11 @@ class QuestionDetectorAgent:
             state["processing_stage"] = "question_detection"
             
             lines = state["lines"]
+            line_confidences = state.get("line_confidences") or [None] * len(lines)
             detected_questions = {}
             current_question = None
             current_answer_lines = []
+            current_answer_confidences = []
             confidence_scores = {}
             
             i = 0
@@ -144,7 +150,8 @@ class QuestionDetectorAgent:
                             detected_questions, 
                             current_question, 
                             current_answer_lines,
-                            confidence_scores
+                            confidence_scores,
+                            current_answer_confidences
                         )
                     
                     # Start new question
@@ -156,6 +163,7 @@ class QuestionDetectorAgent:
                         "line_start": i
                     }
                     current_answer_lines = []
+                    current_answer_confidences = []
                     
                     logger.info(f"📝 Found Question {question_number}: {question_text[:50]}...")
                     
@@ -163,6 +171,7 @@ class QuestionDetectorAgent:
                     # This line is part of an answer
                     if current_question:
                         current_answer_lines.append(line)
+                        current_answer_confidences.append(line_confidences[i])
                 
                 i += 1
             
@@ -172,11 +181,13 @@ class QuestionDetectorAgent:
                     detected_questions, 
                     current_question, 
                     current_answer_lines,
-                    confidence_scores
+                    confidence_scores,
+                    current_answer_confidences
                 )
             
             state["detected_questions"] = detected_questions
             state["confidence_scores"] = confidence_scores
+            trace_count("questions_detected", len(detected_questions))
             
             logger.info(f"✅ QuestionDetectorAgent: Detected {len(detected_questions)} questions")
             
@@ -190,21 +201,15 @@ class QuestionDetectorAgent:
     
     def _detect_question_start(self, line: str) -> Optional[Dict[str, str]]:
         """Detect if a line starts a new question"""
-        for pattern in self.question_patterns:
-            match = re.match(pattern, line, re.IGNORECASE)
-            if match:
-                return {
-                    "number": match.group(1),
-                    "text": match.group(2) if len(match.groups()) > 1 else ""
-                }
-        return None
+        return match_question_line(line)
     
     def _save_detected_question(
         self, 
         detected_questions: Dict, 
         question_info: Dict, 
         answer_lines: List[str],
-        confidence_scores: Dict
+        confidence_scores: Dict,
+        answer_line_confidences: Optional[List[Optional[float]]] = None
     ):
         """Save a detected question and its answer"""
         question_number = question_info["number"]
@@ -215,7 +220,8 @@ class QuestionDetectorAgent:
         is_skipped = not student_answer or len(student_answer) < 3
         
         # Calculate confidence based on detection quality
-        confidence = self._calculate_detection_confidence(question_text, student_answer)
+        detection_confidence = self._calculate_detection_confidence(question_text, student_answer)
+        ocr_confidence = self._answer_ocr_confidence(answer_lines, answer_line_confidences or [])
         
         detected_questions[question_number] = {
             "question_text": question_text,
@@ -223,16 +229,29 @@ class QuestionDetectorAgent:
             "is_skipped": is_skipped,
             "line_start": question_info["line_start"],
             "line_end": question_info["line_start"] + len(answer_lines),
-            "answer_lines": answer_lines
+            "answer_lines": answer_lines,
+            "detection_confidence": detection_confidence,
+            "ocr_confidence": ocr_confidence
         }
         
-        confidence_scores[question_number] = confidence
+        # What the answer was read with, when the OCR layer knows it
+        confidence_scores[question_number] = ocr_confidence if ocr_confidence is not None else detection_confidence
         
         if is_skipped:
             logger.info(f"⚠️ Question {question_number}: Detected as SKIPPED")
         else:
             logger.info(f"✅ Question {question_number}: Answer detected ({len(student_answer)} chars)")
     
+    def _answer_ocr_confidence(self, answer_lines: List[str],
+                               line_confidences: List[Optional[float]]) -> Optional[float]:
+        """OCR confidence of an answer: its lines' confidences weighted by length"""
+        known = [(len(line), confidence) for line, confidence in zip(answer_lines, line_confidences)
+                 if confidence is not None]
+        total = sum(length for length, _ in known)
+        if not total:
+            return None
+        return round(sum(length * confidence for length, confidence in known) / total, 4)
+    
     def _calculate_detection_confidence(self, question_text: str, student_answer: str) -> float:
         """Calculate confidence in question detection"""
         confidence = 0.8  # Base confidence
@@ -310,9 +329,12 @@ class AnswerValidatorAgent:
 class SemanticEvaluatorAgent:
     """Agent responsible for semantic evaluation of answers"""
     
-    def __init__(self):
+    def __init__(self, concurrent: Optional[bool] = None, max_concurrency: Optional[int] = None):
         from app.langgraph.semantic_evaluation_workflow import LangGraphSemanticEvaluator
+        from app.core.config import settings
         self.semantic_evaluator = LangGraphSemanticEvaluator()
+        self.concurrent = settings.SEMANTIC_EVAL_CONCURRENT if concurrent is None else concurrent
+        self.max_concurrency = max(1, max_concurrency or settings.SEMANTIC_EVAL_MAX_CONCURRENCY)
     
     async def evaluate_answers(self, state: WorkflowState) -> WorkflowState:
         """Perform semantic evaluation of each answer"""
@@ -321,62 +343,37 @@ class SemanticEvaluatorAgent:
             state["processing_stage"] = "semantic_evaluation"
             
             detected_questions = state["detected_questions"]
-            evaluations = {}
             
-            for question_id, question_data in detected_questions.items():
-                logger.info(f"🧠 Evaluating Question {question_id}")
+            # Compile the answer key once so per-question work only analyzes the student's text
+            answer_profiles = self.semantic_evaluator.compile_answer_key({
+                question_id: question_data["model_answer"]
+                for question_id, question_data in detected_questions.items()
+            })
+            
+            if self.concurrent and len(detected_questions) > 1:
+                # Questions are independent - overlap them, bounded by a semaphore (opt-in, see SEMANTIC_EVAL_CONCURRENT)
+                semaphore = asyncio.Semaphore(self.max_concurrency)
                 
-                student_answer = question_data["student_answer"]
-                model_answer = question_data["model_answer"]
-                max_marks = question_data["max_marks"]
+                async def evaluate_bounded(question_id: str, question_data: Dict[str, Any]) -> Dict[str, Any]:
+                    async with semaphore:
+                        return await self._evaluate_question(
+                            question_id, question_data, answer_profiles[question_id], state["confidence_scores"]
+                        )
                 
-                if question_data["is_skipped"]:
-                    # Handle skipped questions
-                    evaluation = {
-                        "question_id": question_id,
-                        "question_text": question_data["question_text"],
-                        "student_answer": "",
-                        "model_answer": model_answer,
-                        "marks_allocated": max_marks,
-                        "marks_obtained": 0,
-                        "semantic_similarity": 0.0,
-                        "conceptual_understanding": 0.0,
-                        "factual_accuracy": 0.0,
-                        "overall_score": 0.0,
-                        "feedback": "Question not attempted - correctly identified as skipped",
-                        "status": "skipped",
-                        "strengths": [],
-                        "weaknesses": ["Question not answered"]
-                    }
-                else:
-                    # Perform semantic evaluation
-                    semantic_result = await self.semantic_evaluator.evaluate_answer_semantically(
-                        student_answer=student_answer,
-                        model_answer=model_answer,
-                        question_type="academic",
-                        max_marks=max_marks,
-                        ocr_confidence=state["confidence_scores"].get(question_id, 1.0)
+                results = await asyncio.gather(*[
+                    evaluate_bounded(question_id, question_data)
+                    for question_id, question_data in detected_questions.items()
+                ])
+            else:
+                results = [
+                    await self._evaluate_question(
+                        question_id, question_data, answer_profiles[question_id], state["confidence_scores"]
                     )
-                    
-                    evaluation = {
-                        "question_id": question_id,
-                        "question_text": question_data["question_text"],
-                        "student_answer": student_answer,
-                        "model_answer": model_answer,
-                        "marks_allocated": max_marks,
-                        "marks_obtained": semantic_result.marks_obtained,
-                        "semantic_similarity": semantic_result.semantic_similarity,
-                        "conceptual_understanding": semantic_result.conceptual_understanding,
-                        "factual_accuracy": semantic_result.factual_accuracy,
-                        "overall_score": semantic_result.final_score,
-                        "feedback": semantic_result.detailed_feedback,
-                        "status": "evaluated",
-                        "strengths": semantic_result.strengths,
-                        "weaknesses": semantic_result.error_analysis
-                    }
-                
-                evaluations[question_id] = evaluation
-                logger.info(f"✅ Question {question_id}: {evaluation['marks_obtained']}/{max_marks} marks")
+                    for question_id, question_data in detected_questions.items()
+                ]
+            
+            # Merge in detected-question order regardless of completion order
+            evaluations = {evaluation["question_id"]: evaluation for evaluation in results}
             
             state["evaluations"] = evaluations
             
@@ -389,6 +386,74 @@ class SemanticEvaluatorAgent:
             logger.error(f"❌ {error_msg}")
             state["errors"].append(error_msg)
             return state
+    
+    async def _evaluate_question(self, question_id: str, question_data: Dict[str, Any],
+                                 answer_profile, confidence_scores: Dict[str, float]) -> Dict[str, Any]:
+        """Evaluate a single detected question"""
+        with trace_span("SemanticEvaluatorAgent.evaluate_question", question_id=question_id) as span:
+            evaluation = await self._score_question(question_id, question_data, answer_profile, confidence_scores)
+            if span is not None:
+                span.attributes["status"] = evaluation["status"]
+            trace_count(f"questions_{evaluation['status']}")
+            return evaluation
+    
+    async def _score_question(self, question_id: str, question_data: Dict[str, Any],
+                              answer_profile, confidence_scores: Dict[str, float]) -> Dict[str, Any]:
+        """Score one question, or record it as skipped"""
+        logger.info(f"🧠 Evaluating Question {question_id}")
+        
+        student_answer = question_data["student_answer"]
+        model_answer = question_data["model_answer"]
+        max_marks = question_data["max_marks"]
+        
+        if question_data["is_skipped"]:
+            # Handle skipped questions
+            evaluation = {
+                "question_id": question_id,
+                "question_text": question_data["question_text"],
+                "student_answer": "",
+                "model_answer": model_answer,
+                "marks_allocated": max_marks,
+                "marks_obtained": 0,
+                "semantic_similarity": 0.0,
+                "conceptual_understanding": 0.0,
+                "factual_accuracy": 0.0,
+                "overall_score": 0.0,
+                "feedback": "Question not attempted - correctly identified as skipped",
+                "status": "skipped",
+                "strengths": [],
+                "weaknesses": ["Question not answered"]
+            }
+        else:
+            # Perform semantic evaluation
+            semantic_result = await self.semantic_evaluator.evaluate_answer_semantically(
+                student_answer=student_answer,
+                model_answer=model_answer,
+                question_type="academic",
+                max_marks=max_marks,
+                ocr_confidence=confidence_scores.get(question_id, 1.0),
+                answer_profile=answer_profile
+            )
+            
+            evaluation = {
+                "question_id": question_id,
+                "question_text": question_data["question_text"],
+                "student_answer": student_answer,
+                "model_answer": model_answer,
+                "marks_allocated": max_marks,
+                "marks_obtained": semantic_result.marks_obtained,
+                "semantic_similarity": semantic_result.semantic_similarity,
+                "conceptual_understanding": semantic_result.conceptual_understanding,
+                "factual_accuracy": semantic_result.factual_accuracy,
+                "overall_score": semantic_result.final_score,
+                "feedback": semantic_result.detailed_feedback,
+                "status": "evaluated",
+                "strengths": semantic_result.strengths,
+                "weaknesses": semantic_result.error_analysis
+            }
+        
+        logger.info(f"✅ Question {question_id}: {evaluation['marks_obtained']}/{max_marks} marks")
+        return evaluation
 
 class ResultAggregatorAgent:
     """Agent responsible for aggregating and formatting final results"""
@@ -490,6 +555,22 @@ class LangGraphEvaluationWorkflow:
         question_marks: Dict[str, int]
     ) -> Dict[str, Any]:
         """Run the complete evaluation workflow"""
+        with start_trace("langgraph_evaluation") as trace:
+            results = await self._run_steps(pdf_path, answer_key, question_marks)
+        
+        # Spans per agent and per question, plus page/line/question counters
+        trace_metrics.record(trace)
+        results.setdefault("processing_info", {})["trace"] = trace.to_dict()
+        logger.info(f"⏱️ Stage timings (ms): {trace.stage_timings()}")
+        return results
+    
+    async def _run_steps(
+        self,
+        pdf_path: str,
+        answer_key: Dict[str, str],
+        question_marks: Dict[str, int]
+    ) -> Dict[str, Any]:
+        """Run the five agents in order"""
         try:
             logger.info("🚀 Starting LangGraph Evaluation Workflow")
             
@@ -498,6 +579,7 @@ class LangGraphEvaluationWorkflow:
                 "pdf_path": pdf_path,
                 "raw_content": "",
                 "lines": [],
+                "line_confidences": [],
                 "detected_questions": {},
                 "answer_key": answer_key,
                 "question_marks": question_marks,
@@ -509,19 +591,24 @@ class LangGraphEvaluationWorkflow:
             
             # Execute workflow steps
             logger.info("📄 Step 1: PDF Scanning")
-            state = await self.pdf_scanner.scan_pdf(state)
+            with trace_span("PDFScannerAgent.scan_pdf"):
+                state = await self.pdf_scanner.scan_pdf(state)
             
             logger.info("🔍 Step 2: Question Detection")
-            state = await self.question_detector.detect_questions(state)
+            with trace_span("QuestionDetectorAgent.detect_questions"):
+                state = await self.question_detector.detect_questions(state)
             
             logger.info("✅ Step 3: Answer Validation")
-            state = await self.answer_validator.validate_answers(state)
+            with trace_span("AnswerValidatorAgent.validate_answers"):
+                state = await self.answer_validator.validate_answers(state)
             
             logger.info("🧠 Step 4: Semantic Evaluation")
-            state = await self.semantic_evaluator.evaluate_answers(state)
+            with trace_span("SemanticEvaluatorAgent.evaluate_answers"):
+                state = await self.semantic_evaluator.evaluate_answers(state)
             
             logger.info("📊 Step 5: Result Aggregation")
-            state = await self.result_aggregator.aggregate_results(state)
+            with trace_span("ResultAggregatorAgent.aggregate_results"):
+                state = await self.result_aggregator.aggregate_results(state)
             
             logger.info("🎉 LangGraph Workflow Completed Successfully!")
             
@@ -4,8 +4,10 @@ Complete rebuild with AI models for text extraction and intelligent evaluation
 """
 
 import json
+import time
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 import uuid
 import re
@@ -15,29 +17,26 @@ from pathlib import Path
 from langgraph.graph import StateGraph, END
 from typing_extensions import TypedDict
 
-# AI Model imports
-import openai
-from openai import OpenAI
-
 # OCR and PDF processing
 import fitz  # PyMuPDF
-import pytesseract
+from app.services.tesseract_backend import tesseract_backend
 from PIL import Image
-import io
 
 # Configuration
 from app.core.config import settings
+from app.core.uploads import open_pdf
+from app.core.metrics import record_ocr_pages
+from app.services.ocr_cache_service import ocr_result_cache, page_fingerprint
+from app.services.llm_client import AsyncLLMClient, run_sync
+from app.services.llm_cache_service import answer_evaluation_cache, answer_extraction_cache
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client with API key
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
 class EvaluationState(TypedDict):
     """State passed between AI agents in the workflow"""
-    pdf_file: Optional[bytes]
+    pdf_file: Optional[Union[bytes, str]]  # PDF path or bytes
     raw_text: str
     extracted_answers: Dict[str, str]
     answer_key: Dict[str, str]
@@ -50,6 +49,7 @@ class EvaluationState(TypedDict):
     evaluation_id: str
     start_time: datetime
     current_stage: str
+    use_ocr_cache: bool
 
 class AITextExtractionAgent:
     """AI Agent for intelligent text extraction and question identification"""
@@ -58,15 +58,15 @@ class AITextExtractionAgent:
         self.name = "AI_Text_Extractor"
         self.model = "gpt-4"
     
-    def extract_text_from_pdf(self, pdf_bytes: bytes) -> str:
-        """Extract text from PDF using multiple methods"""
+    def extract_text_from_pdf(self, pdf_source: Union[bytes, str], use_cache: bool = True) -> str:
+        """Extract text from a PDF path or bytes using multiple methods"""
         try:
             # Method 1: PyMuPDF for digital text
-            pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+            pdf_document = open_pdf(pdf_source)
             text = ""
             
             for page_num in range(pdf_document.page_count):
-                page = pdf_document.get_page(page_num)
+                page = pdf_document.load_page(page_num)
                 page_text = page.get_text()
                 text += f"\n--- Page {page_num + 1} ---\n{page_text}"
             
@@ -75,37 +75,44 @@ class AITextExtractionAgent:
             # If no text found, use OCR
             if not text.strip():
                 logger.info("No digital text found, using OCR")
-                text = self._ocr_extraction(pdf_bytes)
+                text = self._ocr_extraction(pdf_source, use_cache)
             
             return text
         except Exception as e:
             logger.error(f"PDF text extraction failed: {e}")
             return ""
     
-    def _ocr_extraction(self, pdf_bytes: bytes) -> str:
+    def _ocr_extraction(self, pdf_source: Union[bytes, str], use_cache: bool = True) -> str:
         """OCR extraction for scanned PDFs - fallback to basic text extraction if Tesseract unavailable"""
         try:
             # Try basic text extraction first
-            pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+            pdf_document = open_pdf(pdf_source)
             text = ""
             
             for page_num in range(pdf_document.page_count):
-                page = pdf_document.get_page(page_num)
+                page = pdf_document.load_page(page_num)
                 page_text = page.get_text()
                 if page_text.strip():
                     text += f"\n--- Page {page_num + 1} ---\n{page_text}"
                 else:
+                    # Reuse OCR text for pages seen before
+                    fingerprint = page_fingerprint(page) if use_cache and ocr_result_cache.enabled else None
+                    cached_text = ocr_result_cache.get(fingerprint, "tesseract", "default") if fingerprint else None
+                    if cached_text is not None:
+                        text += f"\n--- Page {page_num + 1} (OCR) ---\n{cached_text}"
+                        continue
+                    
                     # If no digital text, try basic image extraction
                     try:
-                        import pytesseract
-                        pix = page.get_pixmap()
-                        img_data = pix.tobytes("png")
-                        
-                        # Convert to PIL Image
-                        image = Image.open(io.BytesIO(img_data))
+                        pix = page.get_pixmap(alpha=False)
+                        image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
                         
                         # OCR with Tesseract
-                        page_text = pytesseract.image_to_string(image)
+                        ocr_start = time.perf_counter()
+                        page_text = tesseract_backend.image_to_string(image)
+                        record_ocr_pages("tesseract", 1, time.perf_counter() - ocr_start)
+                        if fingerprint:
+                            ocr_result_cache.put(fingerprint, "tesseract", "default", page_text)
                         text += f"\n--- Page {page_num + 1} (OCR) ---\n{page_text}"
                     except Exception as ocr_error:
                         logger.warning(f"OCR failed for page {page_num + 1}: {ocr_error}")
@@ -140,21 +147,23 @@ Example: {{"1": "answer text here", "2": "another answer", "3": ""}}
 IMPORTANT: Extract the FULL answer text, including all sentences and explanations.
 """
 
+        messages = [
+            {"role": "system", "content": "You are an expert at extracting student answers from exam papers. Be thorough and accurate."},
+            {"role": "user", "content": prompt}
+        ]
+        
         try:
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert at extracting student answers from exam papers. Be thorough and accurate."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1
-            )
-            
-            result = response.choices[0].message.content.strip()
+            # Re-uploaded sheets produce the same prompt - reuse the earlier response
+            cached_result = answer_extraction_cache.get(self.model, 0.1, messages)
+            result = cached_result
+            if result is None:
+                result = run_sync(self._chat_async(messages))
             
             # Parse JSON response
             try:
                 answers = json.loads(result)
+                if cached_result is None:
+                    answer_extraction_cache.put(self.model, 0.1, messages, result)
                 logger.info(f"AI extracted {len(answers)} answers")
                 return answers
             except json.JSONDecodeError:
@@ -166,6 +175,11 @@ IMPORTANT: Extract the FULL answer text, including all sentences and explanation
             logger.error(f"AI extraction failed: {e}")
             return self._fallback_extraction(text, question_marks)
     
+    async def _chat_async(self, messages: List[Dict[str, str]]) -> str:
+        """Send the extraction prompt through the shared rate-limited LLM client"""
+        async with AsyncLLMClient() as llm:
+            return await llm.chat(messages, model=self.model, temperature=0.1)
+    
     def _fallback_extraction(self, text: str, question_marks: Dict[str, int]) -> Dict[str, str]:
         """Fallback method for answer extraction"""
         answers = {}
@@ -199,7 +213,7 @@ IMPORTANT: Extract the FULL answer text, including all sentences and explanation
         try:
             if state["pdf_file"]:
                 # Extract text using AI-powered methods
-                raw_text = self.extract_text_from_pdf(state["pdf_file"])
+                raw_text = self.extract_text_from_pdf(state["pdf_file"], state.get("use_ocr_cache", True))
                 state["raw_text"] = raw_text
                 
                 # Use AI to extract answers intelligently
@@ -228,28 +242,9 @@ IMPORTANT: Extract the FULL answer text, including all sentences and explanation
 class AIIntelligentEvaluator:
     """AI Agent for intelligent answer evaluation with contextual understanding"""
     
-    def __init__(self):
-        self.name = "AI_Intelligent_Evaluator"
-        self.model = "gpt-4"
+    SYSTEM_PROMPT = "You are an experienced teacher who evaluates student answers fairly and provides constructive feedback."
     
-    def ai_evaluate_answer(self, question_num: str, student_answer: str, model_answer: str, 
-                          question_context: str, max_marks: int) -> Dict[str, Any]:
-        """Use AI to intelligently evaluate a single answer"""
-        
-        # Demo mode when no valid API key is available
-        if not settings.OPENAI_API_KEY or settings.OPENAI_API_KEY == "sk-demo-key-for-testing":
-            return self._demo_ai_evaluation(student_answer, model_answer, max_marks)
-        
-        prompt = f"""
-You are an expert teacher evaluating student answers. Provide detailed, fair evaluation.
-
-QUESTION NUMBER: {question_num}
-QUESTION CONTEXT: {question_context}
-MODEL ANSWER: {model_answer}
-STUDENT ANSWER: {student_answer}
-MAXIMUM MARKS: {max_marks}
-
-EVALUATION CRITERIA:
+    EVALUATION_INSTRUCTIONS = """EVALUATION CRITERIA:
 1. Conceptual Understanding (25%) - Does student understand the core concepts?
 2. Factual Accuracy (25%) - Are the facts and details correct?
 3. Completeness (25%) - Is the answer complete and comprehensive?
@@ -259,12 +254,9 @@ INSTRUCTIONS:
 - If student answer is empty or clearly not attempted, give 0 marks
 - Be fair but thorough in evaluation
 - Consider partial credit for partially correct answers
-- Provide specific feedback explaining the marks awarded
-
-Return a JSON object with this exact structure:
-{{
-    "marks_obtained": <number between 0 and {max_marks}>,
-    "conceptual_understanding": <score 0.0 to 1.0>,
+- Provide specific feedback explaining the marks awarded"""
+    
+    EVALUATION_FIELDS = """    "conceptual_understanding": <score 0.0 to 1.0>,
     "factual_accuracy": <score 0.0 to 1.0>,
     "completeness": <score 0.0 to 1.0>,
     "clarity_expression": <score 0.0 to 1.0>,
@@ -272,33 +264,153 @@ Return a JSON object with this exact structure:
     "detailed_feedback": "Specific explanation of marks awarded",
     "strengths": ["strength 1", "strength 2"],
     "areas_for_improvement": ["improvement 1", "improvement 2"],
-    "is_attempted": true/false
-}}
-"""
-
-        try:
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an experienced teacher who evaluates student answers fairly and provides constructive feedback."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2
-            )
+    "is_attempted": true/false"""
+    
+    def __init__(self, batch_size: Optional[int] = None):
+        self.name = "AI_Intelligent_Evaluator"
+        self.model = "gpt-4"
+        self.batch_size = max(1, batch_size or settings.LLM_BATCH_SIZE)
+    
+    def _demo_mode(self) -> bool:
+        """Demo mode when no valid API key is available"""
+        return not settings.OPENAI_API_KEY or settings.OPENAI_API_KEY == "sk-demo-key-for-testing"
+    
+    def ai_evaluate_answer(self, question_num: str, student_answer: str, model_answer: str, 
+                          question_context: str, max_marks: int) -> Dict[str, Any]:
+        """Use AI to intelligently evaluate a single answer"""
+        question = {
+            "question_num": question_num,
+            "student_answer": student_answer,
+            "model_answer": model_answer,
+            "question_context": question_context,
+            "max_marks": max_marks
+        }
+        return self.evaluate_questions([question])[question_num]
+    
+    def evaluate_questions(self, questions: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Evaluate several answers with parallel, rate-limited LLM calls, keyed by question number"""
+        if self._demo_mode():
+            return {
+                q["question_num"]: self._demo_ai_evaluation(q["student_answer"], q["model_answer"], q["max_marks"])
+                for q in questions
+            }
+        return run_sync(self._evaluate_questions_async(questions))
+    
+    async def _evaluate_questions_async(self, questions: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Fan questions out over the LLM client, packing batch_size questions per prompt"""
+        async with AsyncLLMClient() as llm:
+            if self.batch_size > 1:
+                chunks = [questions[i:i + self.batch_size] for i in range(0, len(questions), self.batch_size)]
+                chunk_results = await asyncio.gather(*[self._evaluate_batch_async(llm, chunk) for chunk in chunks])
+                return {q_num: evaluation for results in chunk_results for q_num, evaluation in results.items()}
             
-            result = response.choices[0].message.content.strip()
+            evaluations = await asyncio.gather(*[self._evaluate_single_async(llm, q) for q in questions])
+            return {q["question_num"]: evaluation for q, evaluation in zip(questions, evaluations)}
+    
+    async def _evaluate_single_async(self, llm: AsyncLLMClient, question: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluate one answer with its own prompt"""
+        question_num = question["question_num"]
+        messages = [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": self._create_evaluation_prompt(question)}
+        ]
+        try:
+            # Resubmitted sheets produce the same prompt - reuse the earlier response
+            cached_result = answer_evaluation_cache.get(self.model, 0.2, messages)
+            result = cached_result if cached_result is not None else await llm.chat(messages, model=self.model, temperature=0.2)
             
             try:
                 evaluation = json.loads(result)
+                if cached_result is None:
+                    answer_evaluation_cache.put(self.model, 0.2, messages, result)
                 return evaluation
             except json.JSONDecodeError:
                 # Fallback evaluation
                 logger.warning(f"AI evaluation response not valid JSON for Q{question_num}")
-                return self._fallback_evaluation(student_answer, max_marks)
+                return self._fallback_evaluation(question["student_answer"], question["max_marks"])
                 
         except Exception as e:
             logger.error(f"AI evaluation failed for Q{question_num}: {e}")
-            return self._fallback_evaluation(student_answer, max_marks)
+            return self._fallback_evaluation(question["student_answer"], question["max_marks"])
+    
+    async def _evaluate_batch_async(self, llm: AsyncLLMClient, questions: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Evaluate several answers in one prompt; anything missing from the reply is retried singly"""
+        if len(questions) == 1:
+            return {questions[0]["question_num"]: await self._evaluate_single_async(llm, questions[0])}
+        
+        evaluations = {}
+        messages = [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": self._create_batch_evaluation_prompt(questions)}
+        ]
+        try:
+            cached_result = answer_evaluation_cache.get(self.model, 0.2, messages)
+            result = cached_result if cached_result is not None else await llm.chat(messages, model=self.model, temperature=0.2)
+            
+            expected = {q["question_num"] for q in questions}
+            for item in json.loads(result):
+                q_num = str(item.pop("question_number", ""))
+                if q_num in expected:
+                    evaluations[q_num] = item
+            
+            # Only cache replies that covered the whole batch
+            if cached_result is None and set(evaluations) == expected:
+                answer_evaluation_cache.put(self.model, 0.2, messages, result)
+        except Exception as e:
+            logger.warning(f"Batched AI evaluation failed, evaluating questions individually: {e}")
+        
+        missing = [q for q in questions if q["question_num"] not in evaluations]
+        if missing:
+            retried = await asyncio.gather(*[self._evaluate_single_async(llm, q) for q in missing])
+            evaluations.update({q["question_num"]: evaluation for q, evaluation in zip(missing, retried)})
+        
+        return evaluations
+    
+    def _create_evaluation_prompt(self, question: Dict[str, Any]) -> str:
+        """Create the single-answer evaluation prompt"""
+        max_marks = question["max_marks"]
+        return f"""
+You are an expert teacher evaluating student answers. Provide detailed, fair evaluation.
+
+QUESTION NUMBER: {question['question_num']}
+QUESTION CONTEXT: {question['question_context']}
+MODEL ANSWER: {question['model_answer']}
+STUDENT ANSWER: {question['student_answer']}
+MAXIMUM MARKS: {max_marks}
+
+{self.EVALUATION_INSTRUCTIONS}
+
+Return a JSON object with this exact structure:
+{{
+    "marks_obtained": <number between 0 and {max_marks}>,
+{self.EVALUATION_FIELDS}
+}}
+"""
+    
+    def _create_batch_evaluation_prompt(self, questions: List[Dict[str, Any]]) -> str:
+        """Create one prompt that evaluates several answers at once"""
+        question_blocks = "\n".join(
+            f"""
+QUESTION NUMBER: {q['question_num']}
+QUESTION CONTEXT: {q['question_context']}
+MODEL ANSWER: {q['model_answer']}
+STUDENT ANSWER: {q['student_answer']}
+MAXIMUM MARKS: {q['max_marks']}
+"""
+            for q in questions
+        )
+        return f"""
+You are an expert teacher evaluating student answers. Provide detailed, fair evaluation of each answer independently.
+{question_blocks}
+{self.EVALUATION_INSTRUCTIONS}
+
+Return a JSON array with one object per question, in any order, each with this exact structure:
+{{
+    "question_number": "<question number as given>",
+    "marks_obtained": <number between 0 and that question's maximum marks>,
+{self.EVALUATION_FIELDS}
+}}
+"""
     
     def _demo_ai_evaluation(self, student_answer: str, model_answer: str, max_marks: int) -> Dict[str, Any]:
         """Demo AI evaluation when API key is not available"""
@@ -420,16 +532,27 @@ Return a JSON object with this exact structure:
         evaluations = []
         
         try:
-            for question_num, expected_answer in state["answer_key"].items():
-                student_answer = state["extracted_answers"].get(question_num, "")
-                max_marks = state["question_marks"].get(question_num, 0)
-                question_context = state["question_texts"].get(question_num, f"Question {question_num}")
-                
-                # AI evaluation for each answer
-                evaluation = self.ai_evaluate_answer(
-                    question_num, student_answer, expected_answer, 
-                    question_context, max_marks
-                )
+            questions = [
+                {
+                    "question_num": question_num,
+                    "student_answer": state["extracted_answers"].get(question_num, ""),
+                    "model_answer": expected_answer,
+                    "question_context": state["question_texts"].get(question_num, f"Question {question_num}"),
+                    "max_marks": state["question_marks"].get(question_num, 0)
+                }
+                for question_num, expected_answer in state["answer_key"].items()
+            ]
+            
+            # AI evaluation for all answers (parallel, rate-limited LLM calls)
+            question_evaluations = self.evaluate_questions(questions)
+            
+            for question in questions:
+                question_num = question["question_num"]
+                student_answer = question["student_answer"]
+                expected_answer = question["model_answer"]
+                max_marks = question["max_marks"]
+                question_context = question["question_context"]
+                evaluation = question_evaluations[question_num]
                 
                 # Format result
                 result = {
@@ -503,9 +626,10 @@ class AIWorkflowManager:
         
         return state
     
-    def evaluate(self, pdf_file: Optional[bytes], answer_key: Dict[str, str], 
+    def evaluate(self, pdf_file: Optional[Union[bytes, str]], answer_key: Dict[str, str], 
                 question_marks: Dict[str, int], question_texts: Optional[Dict[str, str]] = None,
-                manual_answers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+                manual_answers: Optional[Dict[str, str]] = None,
+                use_ocr_cache: bool = True) -> Dict[str, Any]:
         """Run the complete AI-powered evaluation workflow"""
         
         # Initialize state
@@ -522,7 +646,8 @@ class AIWorkflowManager:
             workflow_complete=False,
             evaluation_id=f"ai_eval_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}",
             start_time=datetime.now(),
-            current_stage="Initializing"
+            current_stage="Initializing",
+            use_ocr_cache=use_ocr_cache
         )
         
         try:
@@ -572,7 +697,7 @@ class AIWorkflowManager:
                     "processing_logs": final_state["processing_logs"],
                     "errors": final_state["errors"],
                     "api_version": "5.0-ai-powered",
-                    "cache_policy": "no_cache_fresh_ai_processing_only"
+                    "cache_policy": "ocr_page_cache" if final_state.get("use_ocr_cache", True) and ocr_result_cache.enabled else "no_cache_fresh_ai_processing_only"
                 }
             }
             
@@ -3,13 +3,21 @@ LangGraph Semantic Evaluation Workflow
 Advanced semantic understanding using pure Python and built-in NLP techniques
 """
 
-import re
 import math
 import json
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass
-from collections import Counter
+from dataclasses import dataclass, field
+from collections import Counter, OrderedDict
 import asyncio
+import threading
+
+from app.core.executor import cpu_executor
+from app.core.phrase_matcher import PhraseMatcher, PhraseMatches
+from app.core.patterns import (
+    SENTENCE_SPLIT, WORD, FORMULA_PATTERNS, CAUSAL_PATTERNS, MEASUREMENT, YEAR,
+    PROPER_NOUN, SCIENTIFIC_NOTATION, DEFINITION, MATHEMATICAL
+)
+from app.langgraph.similarity_engine import VectorizedSimilarityEngine, TermVocabulary, SIMILARITY_WEIGHTS
 
 @dataclass
 class SemanticAnalysisResult:
@@ -24,6 +32,18 @@ class SemanticAnalysisResult:
     error_analysis: List[str]
     strengths: List[str]
 
+@dataclass
+class AnswerKeyProfile:
+    """Model-answer analysis compiled once per test and reused for every student"""
+    model_answer: str
+    analysis: Dict[str, Any]
+    meaningful_words: List[str]
+    word_set: set = field(default_factory=set)
+    term_frequencies: Counter = field(default_factory=Counter)
+    term_magnitude: float = 0.0
+    concepts: List[str] = field(default_factory=list)
+    concept_set: set = field(default_factory=set)
+
 class AdvancedTextAnalyzer:
     """Advanced text analysis without external dependencies"""
     
@@ -58,13 +78,42 @@ class AdvancedTextAnalyzer:
         }
         
         # Mathematical and scientific notation patterns
-        self.formula_patterns = [
-            r'[A-Za-z]+\s*=\s*[A-Za-z0-9\+\-\*/\(\)\s]+',  # Basic equations
-            r'\d+\s*[+\-*/]\s*\d+\s*=\s*\d+',  # Arithmetic
-            r'[A-Z]+\d*\s*[+\-]\s*[A-Z]+\d*',  # Chemical formulas
-            r'\d+\s*×\s*\d+|\d+\s*÷\s*\d+',  # Multiplication/division
-            r'½|¼|¾|\d+/\d+',  # Fractions
+        self.formula_patterns = FORMULA_PATTERNS
+        
+        # Indicator phrase lists checked against every answer
+        self.explanatory_phrases = [
+            'this means', 'in other words', 'that is to say', 'specifically',
+            'for example', 'for instance', 'such as', 'namely', 'including'
+        ]
+        self.perspective_words = ['also', 'additionally', 'furthermore', 'moreover', 'besides', 'however', 'although']
+        self.example_indicators = ['example', 'instance', 'such as', 'like', 'including']
+        self.step_indicators = ['first', 'second', 'then', 'next', 'finally', 'step']
+        self.detail_indicators = ['detailed', 'comprehensive', 'thorough', 'complete']
+        self.content_indicators = [
+            'definition', 'explanation', 'process', 'method', 'example',
+            'result', 'conclusion', 'summary', 'analysis', 'description'
+        ]
+        self.process_indicators = [
+            'process', 'procedure', 'method', 'steps', 'stages',
+            'first', 'then', 'next', 'finally', 'sequence'
         ]
+        self.comparison_words = [
+            'compare', 'contrast', 'difference', 'similar', 'unlike',
+            'whereas', 'while', 'but', 'however', 'although'
+        ]
+        
+        # All indicator lists are matched together in one pass per answer
+        self.phrase_matcher = PhraseMatcher({
+            'causal': self.causal_words,
+            'explanatory': self.explanatory_phrases,
+            'perspective': self.perspective_words,
+            'example': self.example_indicators,
+            'step': self.step_indicators,
+            'detail': self.detail_indicators,
+            'content': self.content_indicators,
+            'process': self.process_indicators,
+            'comparison': self.comparison_words
+        })
     
     def analyze_semantic_content(self, text: str) -> Dict[str, Any]:
         """Comprehensive semantic analysis of text content"""
@@ -75,6 +124,7 @@ class AdvancedTextAnalyzer:
         # Basic text processing
         sentences = self._split_sentences(text)
         words = self._extract_words(text)
+        matches = self.phrase_matcher.scan(text)
         
         # Core semantic analysis
         analysis = {
@@ -85,13 +135,13 @@ class AdvancedTextAnalyzer:
             'avg_sentence_length': len(words) / len(sentences) if sentences else 0,
             
             # Semantic features
-            'conceptual_depth': self._analyze_conceptual_depth(text, words),
-            'causal_reasoning': self._detect_causal_reasoning(text),
+            'conceptual_depth': self._analyze_conceptual_depth(text, words, matches),
+            'causal_reasoning': self._detect_causal_reasoning(text, matches),
             'factual_content': self._extract_factual_content(text),
             'technical_terminology': self._identify_technical_terms(words),
-            'explanation_quality': self._assess_explanation_quality(text, sentences),
+            'explanation_quality': self._assess_explanation_quality(text, sentences, matches),
             'coherence_score': self._calculate_coherence(sentences),
-            'completeness_indicators': self._assess_completeness(text),
+            'completeness_indicators': self._assess_completeness(text, matches),
             
             # Structural analysis
             'has_introduction': self._has_introduction(sentences),
@@ -101,9 +151,9 @@ class AdvancedTextAnalyzer:
             
             # Content type detection
             'is_definition': self._is_definition_answer(text),
-            'is_process_explanation': self._is_process_explanation(text),
+            'is_process_explanation': self._is_process_explanation(text, matches),
             'is_mathematical': self._contains_mathematical_content(text),
-            'is_comparative': self._contains_comparison(text),
+            'is_comparative': self._contains_comparison(text, matches),
         }
         
         return analysis
@@ -134,6 +184,83 @@ class AdvancedTextAnalyzer:
         
         return min(similarity, 1.0)
     
+    def build_answer_key_profile(self, model_answer: str) -> AnswerKeyProfile:
+        """Analyze a model answer once so it can be compared against many students"""
+        meaningful_words = self._extract_meaningful_words(model_answer)
+        term_frequencies = Counter(meaningful_words)
+        concepts = self._extract_concepts(model_answer)
+        
+        return AnswerKeyProfile(
+            model_answer=model_answer,
+            analysis=self.analyze_semantic_content(model_answer),
+            meaningful_words=meaningful_words,
+            word_set=set(meaningful_words),
+            term_frequencies=term_frequencies,
+            term_magnitude=math.sqrt(sum(count * count for count in term_frequencies.values())),
+            concepts=concepts,
+            concept_set=set(concepts)
+        )
+    
+    def calculate_profile_similarity(self, text: str, profile: AnswerKeyProfile,
+                                     analysis: Optional[Dict[str, Any]] = None) -> float:
+        """Same as calculate_semantic_similarity, with the model side taken from a profile"""
+        return self.similarity_breakdown(text, profile, analysis)['similarity']
+    
+    def calculate_class_similarity(self, texts: List[str], profile: AnswerKeyProfile,
+                                   analyses: Optional[List[Optional[Dict[str, Any]]]] = None,
+                                   vocabulary: Optional[TermVocabulary] = None,
+                                   concept_vocabulary: Optional[TermVocabulary] = None) -> List[Dict[str, float]]:
+        """Similarity breakdowns for many answers against one profile, computed as matrix operations"""
+        return VectorizedSimilarityEngine(self, vocabulary, concept_vocabulary).score_class(texts, profile, analyses)
+    
+    def similarity_breakdown(self, text: str, profile: AnswerKeyProfile,
+                             analysis: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+        """Individual similarity metrics and their weighted combination for one answer"""
+        
+        words = self._extract_meaningful_words(text)
+        
+        if not words or not profile.meaningful_words:
+            return {**{metric: 0.0 for metric in SIMILARITY_WEIGHTS}, 'similarity': 0.0}
+        
+        # Jaccard similarity
+        word_set = set(words)
+        jaccard_sim = len(word_set & profile.word_set) / len(word_set | profile.word_set)
+        
+        # Cosine similarity over term frequencies
+        frequencies = Counter(words)
+        dot_product = sum(count * profile.term_frequencies.get(word, 0) for word, count in frequencies.items())
+        magnitude = math.sqrt(sum(count * count for count in frequencies.values()))
+        cosine_sim = dot_product / (magnitude * profile.term_magnitude) if magnitude and profile.term_magnitude else 0.0
+        
+        # Concept overlap
+        concepts = self._extract_concepts(text)
+        if concepts and profile.concepts:
+            concept_set = set(concepts)
+            semantic_overlap = len(concept_set & profile.concept_set) / len(concept_set | profile.concept_set)
+        else:
+            semantic_overlap = 0.0
+        
+        # Explanation pattern similarity
+        concept_similarity = self._pattern_similarity(
+            self._explanation_flags(text) if analysis is None else self._flags_from_analysis(analysis),
+            self._flags_from_analysis(profile.analysis)
+        )
+        
+        similarity = (
+            jaccard_sim * 0.2 +
+            cosine_sim * 0.3 +
+            semantic_overlap * 0.3 +
+            concept_similarity * 0.2
+        )
+        
+        return {
+            'jaccard': jaccard_sim,
+            'cosine': cosine_sim,
+            'semantic_overlap': semantic_overlap,
+            'concept_similarity': concept_similarity,
+            'similarity': min(similarity, 1.0)
+        }
+    
     def _empty_analysis(self) -> Dict[str, Any]:
         """Return empty analysis for missing text"""
         return {
@@ -162,13 +289,13 @@ class AdvancedTextAnalyzer:
     def _split_sentences(self, text: str) -> List[str]:
         """Split text into sentences"""
         # Simple sentence splitting
-        sentences = re.split(r'[.!?]+', text)
+        sentences = SENTENCE_SPLIT.split(text)
         return [s.strip() for s in sentences if s.strip()]
     
     def _extract_words(self, text: str) -> List[str]:
         """Extract words from text"""
         # Extract words, preserving important punctuation
-        words = re.findall(r'\b\w+\b', text.lower())
+        words = WORD.findall(text.lower())
         return words
     
     def _extract_meaningful_words(self, text: str) -> List[str]:
@@ -176,8 +303,11 @@ class AdvancedTextAnalyzer:
         words = self._extract_words(text)
         return [w for w in words if w not in self.stop_words and len(w) > 2]
     
-    def _analyze_conceptual_depth(self, text: str, words: List[str]) -> float:
+    def _analyze_conceptual_depth(self, text: str, words: List[str],
+                                  matches: Optional[PhraseMatches] = None) -> float:
         """Analyze conceptual depth of the answer"""
+        if matches is None:
+            matches = self.phrase_matcher.scan(text)
         depth_score = 0.0
         
         # Check for concept indicator words
@@ -185,19 +315,12 @@ class AdvancedTextAnalyzer:
         depth_score += min(concept_count / 5.0, 0.3)  # Max 30% from concept words
         
         # Check for explanatory phrases
-        explanatory_phrases = [
-            'this means', 'in other words', 'that is to say', 'specifically',
-            'for example', 'for instance', 'such as', 'namely', 'including'
-        ]
-        for phrase in explanatory_phrases:
-            if phrase in text.lower():
-                depth_score += 0.1
+        for phrase in matches.present('explanatory'):
+            depth_score += 0.1
         
         # Check for multiple perspectives or aspects
-        perspective_words = ['also', 'additionally', 'furthermore', 'moreover', 'besides', 'however', 'although']
-        for word in perspective_words:
-            if word in text.lower():
-                depth_score += 0.05
+        for word in matches.present('perspective'):
+            depth_score += 0.05
         
         # Check for depth indicators
         if len(self._split_sentences(text)) >= 3:
@@ -205,27 +328,20 @@ class AdvancedTextAnalyzer:
         
         return min(depth_score, 1.0)
     
-    def _detect_causal_reasoning(self, text: str) -> float:
+    def _detect_causal_reasoning(self, text: str, matches: Optional[PhraseMatches] = None) -> float:
         """Detect and score causal reasoning"""
+        if matches is None:
+            matches = self.phrase_matcher.scan(text)
         text_lower = text.lower()
         causal_score = 0.0
         
         # Direct causal words
-        causal_count = sum(1 for word in self.causal_words if word in text_lower)
+        causal_count = len(matches.present('causal'))
         causal_score += min(causal_count / 3.0, 0.5)
         
         # Causal patterns
-        causal_patterns = [
-            r'because\s+\w+',
-            r'due\s+to\s+\w+',
-            r'results?\s+in\s+\w+',
-            r'leads?\s+to\s+\w+',
-            r'causes?\s+\w+',
-            r'therefore\s+\w+',
-        ]
-        
-        for pattern in causal_patterns:
-            if re.search(pattern, text_lower):
+        for pattern in CAUSAL_PATTERNS:
+            if pattern.search(text_lower):
                 causal_score += 0.1
         
         return min(causal_score, 1.0)
@@ -235,24 +351,24 @@ class AdvancedTextAnalyzer:
         facts = []
         
         # Numbers and measurements
-        numbers = re.findall(r'\d+\.?\d*\s*(?:km|m|cm|mm|kg|g|mg|l|ml|hours?|minutes?|seconds?|%)', text)
+        numbers = MEASUREMENT.findall(text)
         facts.extend(numbers)
         
         # Years and dates
-        dates = re.findall(r'\b(?:19|20)\d{2}\b', text)
+        dates = YEAR.findall(text)
         facts.extend(dates)
         
         # Formulas and equations
         for pattern in self.formula_patterns:
-            formulas = re.findall(pattern, text)
+            formulas = pattern.findall(text)
             facts.extend(formulas)
         
         # Proper nouns (simplified detection)
-        proper_nouns = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
+        proper_nouns = PROPER_NOUN.findall(text)
         facts.extend(proper_nouns)
         
         # Scientific notation
-        scientific = re.findall(r'\d+\.?\d*\s*[×x]\s*10\^?\d+', text)
+        scientific = SCIENTIFIC_NOTATION.findall(text)
         facts.extend(scientific)
         
         return list(set(facts))  # Remove duplicates
@@ -281,8 +397,11 @@ class AdvancedTextAnalyzer:
         
         return list(set(technical_terms))
     
-    def _assess_explanation_quality(self, text: str, sentences: List[str]) -> float:
+    def _assess_explanation_quality(self, text: str, sentences: List[str],
+                                    matches: Optional[PhraseMatches] = None) -> float:
         """Assess the quality of explanation"""
+        if matches is None:
+            matches = self.phrase_matcher.scan(text)
         quality_score = 0.0
         
         # Multiple sentences indicate better explanation
@@ -292,18 +411,15 @@ class AdvancedTextAnalyzer:
             quality_score += 0.2
         
         # Presence of examples
-        example_indicators = ['example', 'instance', 'such as', 'like', 'including']
-        if any(indicator in text.lower() for indicator in example_indicators):
+        if matches.any('example'):
             quality_score += 0.2
         
         # Step-by-step explanation
-        step_indicators = ['first', 'second', 'then', 'next', 'finally', 'step']
-        if any(indicator in text.lower() for indicator in step_indicators):
+        if matches.any('step'):
             quality_score += 0.2
         
         # Detailed description
-        detail_indicators = ['detailed', 'comprehensive', 'thorough', 'complete']
-        if any(indicator in text.lower() for indicator in detail_indicators):
+        if matches.any('detail'):
             quality_score += 0.1
         
         return min(quality_score, 1.0)
@@ -326,8 +442,10 @@ class AdvancedTextAnalyzer:
         
         return sum(coherence_scores) / len(coherence_scores) if coherence_scores else 0.5
     
-    def _assess_completeness(self, text: str) -> float:
+    def _assess_completeness(self, text: str, matches: Optional[PhraseMatches] = None) -> float:
         """Assess completeness of the answer"""
+        if matches is None:
+            matches = self.phrase_matcher.scan(text)
         completeness = 0.0
         
         # Word count based assessment
@@ -340,12 +458,7 @@ class AdvancedTextAnalyzer:
             completeness += 0.2
         
         # Content indicators
-        content_indicators = [
-            'definition', 'explanation', 'process', 'method', 'example',
-            'result', 'conclusion', 'summary', 'analysis', 'description'
-        ]
-        
-        indicator_count = sum(1 for indicator in content_indicators if indicator in text.lower())
+        indicator_count = len(matches.present('content'))
         completeness += min(indicator_count / 5.0, 0.3)
         
         # Structural completeness
@@ -422,43 +535,24 @@ class AdvancedTextAnalyzer:
     
     def _is_definition_answer(self, text: str) -> bool:
         """Check if answer is a definition"""
-        definition_patterns = [
-            r'\w+\s+is\s+(?:a|an|the)\s+\w+',
-            r'\w+\s+refers\s+to\s+\w+',
-            r'\w+\s+means\s+\w+',
-            r'\w+\s+is\s+defined\s+as\s+\w+'
-        ]
-        
-        text_lower = text.lower()
-        return any(re.search(pattern, text_lower) for pattern in definition_patterns)
+        return DEFINITION.search(text.lower()) is not None
     
-    def _is_process_explanation(self, text: str) -> bool:
+    def _is_process_explanation(self, text: str, matches: Optional[PhraseMatches] = None) -> bool:
         """Check if answer explains a process"""
-        process_indicators = [
-            'process', 'procedure', 'method', 'steps', 'stages',
-            'first', 'then', 'next', 'finally', 'sequence'
-        ]
-        
-        return sum(1 for indicator in process_indicators if indicator in text.lower()) >= 2
+        if matches is None:
+            matches = self.phrase_matcher.scan(text)
+        return len(matches.present('process')) >= 2
     
     def _contains_mathematical_content(self, text: str) -> bool:
         """Check if answer contains mathematical content"""
         # Check for mathematical symbols and patterns
-        math_patterns = [
-            r'=', r'\+', r'-', r'\*', r'/', r'\^', r'²', r'³',
-            r'formula', r'equation', r'calculate', r'solve'
-        ]
-        
-        return any(re.search(pattern, text) for pattern in math_patterns)
+        return MATHEMATICAL.search(text) is not None
     
-    def _contains_comparison(self, text: str) -> bool:
+    def _contains_comparison(self, text: str, matches: Optional[PhraseMatches] = None) -> bool:
         """Check if answer contains comparison"""
-        comparison_words = [
-            'compare', 'contrast', 'difference', 'similar', 'unlike',
-            'whereas', 'while', 'but', 'however', 'although'
-        ]
-        
-        return any(word in text.lower() for word in comparison_words)
+        if matches is None:
+            matches = self.phrase_matcher.scan(text)
+        return matches.any('comparison')
     
     def _jaccard_similarity(self, words1: List[str], words2: List[str]) -> float:
         """Calculate Jaccard similarity"""
@@ -509,26 +603,45 @@ class AdvancedTextAnalyzer:
     
     def _concept_similarity(self, text1: str, text2: str) -> float:
         """Calculate conceptual similarity"""
-        # Check for similar explanatory patterns
-        patterns1 = self._extract_explanation_patterns(text1)
-        patterns2 = self._extract_explanation_patterns(text2)
-        
+        return self._pattern_similarity(self._explanation_flags(text1), self._explanation_flags(text2))
+    
+    def _explanation_flags(self, text: str) -> Dict[str, bool]:
+        """Detect the explanatory patterns compared by _pattern_similarity"""
+        matches = self.phrase_matcher.scan(text)
+        return {
+            'causal': self._detect_causal_reasoning(text, matches) > 0.3,
+            'mathematical': self._contains_mathematical_content(text),
+            'definition': self._is_definition_answer(text),
+            'process': self._is_process_explanation(text, matches)
+        }
+    
+    def _flags_from_analysis(self, analysis: Dict[str, Any]) -> Dict[str, bool]:
+        """Read the explanatory patterns from an existing semantic analysis"""
+        return {
+            'causal': analysis['causal_reasoning'] > 0.3,
+            'mathematical': analysis['is_mathematical'],
+            'definition': analysis['is_definition'],
+            'process': analysis['is_process_explanation']
+        }
+    
+    def _pattern_similarity(self, flags1: Dict[str, bool], flags2: Dict[str, bool]) -> float:
+        """Score shared explanatory patterns between two texts"""
         similarity = 0.0
         
         # Compare causal reasoning
-        if self._detect_causal_reasoning(text1) > 0.3 and self._detect_causal_reasoning(text2) > 0.3:
+        if flags1['causal'] and flags2['causal']:
             similarity += 0.3
         
         # Compare mathematical content
-        if self._contains_mathematical_content(text1) and self._contains_mathematical_content(text2):
+        if flags1['mathematical'] and flags2['mathematical']:
             similarity += 0.2
         
         # Compare definition patterns
-        if self._is_definition_answer(text1) and self._is_definition_answer(text2):
+        if flags1['definition'] and flags2['definition']:
             similarity += 0.2
         
         # Compare process explanations
-        if self._is_process_explanation(text1) and self._is_process_explanation(text2):
+        if flags1['process'] and flags2['process']:
             similarity += 0.3
         
         return min(similarity, 1.0)
@@ -570,8 +683,35 @@ class AdvancedTextAnalyzer:
 class LangGraphSemanticEvaluator:
     """LangGraph-based semantic evaluation workflow"""
     
+    # Most recently used model answers kept compiled between requests
+    PROFILE_CACHE_SIZE = 256
+    
     def __init__(self):
         self.text_analyzer = AdvancedTextAnalyzer()
+        self._profile_cache: "OrderedDict[str, AnswerKeyProfile]" = OrderedDict()
+        self._profile_lock = threading.Lock()
+    
+    def compile_answer_profile(self, model_answer: str) -> AnswerKeyProfile:
+        """Return the compiled profile for a model answer, building it on first use"""
+        with self._profile_lock:
+            profile = self._profile_cache.get(model_answer)
+            if profile is not None:
+                self._profile_cache.move_to_end(model_answer)
+                return profile
+        
+        profile = self.text_analyzer.build_answer_key_profile(model_answer)
+        with self._profile_lock:
+            self._profile_cache[model_answer] = profile
+            if len(self._profile_cache) > self.PROFILE_CACHE_SIZE:
+                self._profile_cache.popitem(last=False)
+        return profile
+    
+    def compile_answer_key(self, answer_key: Dict[str, str]) -> Dict[str, AnswerKeyProfile]:
+        """Compile every model answer of a test into reusable profiles"""
+        return {
+            question_id: self.compile_answer_profile(model_answer)
+            for question_id, model_answer in answer_key.items()
+        }
         
     async def evaluate_answer_semantically(
         self,
@@ -579,22 +719,43 @@ class LangGraphSemanticEvaluator:
         model_answer: str,
         question_type: str,
         max_marks: int,
-        ocr_confidence: float = 1.0
+        ocr_confidence: float = 1.0,
+        answer_profile: Optional[AnswerKeyProfile] = None
     ) -> SemanticAnalysisResult:
-        """Main evaluation function using semantic analysis"""
+        """Main evaluation function using semantic analysis (scored off the event loop)"""
+        return await cpu_executor.run(
+            self.score_answer, student_answer, model_answer, question_type,
+            max_marks, ocr_confidence, answer_profile
+        )
+    
+    def score_answer(
+        self,
+        student_answer: str,
+        model_answer: str,
+        question_type: str,
+        max_marks: int,
+        ocr_confidence: float = 1.0,
+        answer_profile: Optional[AnswerKeyProfile] = None,
+        student_analysis: Optional[Dict[str, Any]] = None,
+        semantic_similarity: Optional[float] = None
+    ) -> SemanticAnalysisResult:
+        """Synchronous semantic scoring used by evaluate_answer_semantically"""
         
         # Handle empty or missing answers
         if not student_answer or not student_answer.strip():
             return self._create_empty_result(max_marks, "No answer provided or detected by OCR")
         
-        # Comprehensive semantic analysis
-        student_analysis = self.text_analyzer.analyze_semantic_content(student_answer)
-        model_analysis = self.text_analyzer.analyze_semantic_content(model_answer)
+        # Model answer analysis comes from the compiled profile; only the student is analyzed here
+        profile = answer_profile or self.compile_answer_profile(model_answer)
+        if student_analysis is None:
+            student_analysis = self.text_analyzer.analyze_semantic_content(student_answer)
+        model_analysis = profile.analysis
         
-        # Calculate semantic similarity
-        semantic_similarity = self.text_analyzer.calculate_semantic_similarity(
-            student_answer, model_answer
-        )
+        # Calculate semantic similarity (precomputed when grading a whole class)
+        if semantic_similarity is None:
+            semantic_similarity = self.text_analyzer.calculate_profile_similarity(
+                student_answer, profile, student_analysis
+            )
         
         # Evaluate different aspects
         conceptual_understanding = self._evaluate_conceptual_understanding(
@@ -648,6 +809,71 @@ class LangGraphSemanticEvaluator:
             strengths=strengths
         )
     
+    def score_class(
+        self,
+        student_answers: List[str],
+        model_answer: str,
+        question_type: str,
+        max_marks: int,
+        ocr_confidences: Optional[List[float]] = None,
+        answer_profile: Optional[AnswerKeyProfile] = None,
+        vocabulary: Optional[TermVocabulary] = None,
+        concept_vocabulary: Optional[TermVocabulary] = None
+    ) -> List[SemanticAnalysisResult]:
+        """Score every student's answer to one question, with similarity computed for the class at once"""
+        profile = answer_profile or self.compile_answer_profile(model_answer)
+        analyses = [
+            self.text_analyzer.analyze_semantic_content(answer) if answer and answer.strip() else None
+            for answer in student_answers
+        ]
+        similarities = self.text_analyzer.calculate_class_similarity(
+            [answer or "" for answer in student_answers], profile, analyses, vocabulary, concept_vocabulary
+        )
+        
+        return [
+            self.score_answer(
+                answer, model_answer, question_type, max_marks,
+                ocr_confidences[i] if ocr_confidences else 1.0,
+                profile, analyses[i], similarities[i]['similarity']
+            )
+            for i, answer in enumerate(student_answers)
+        ]
+    
+    def score_test_class(
+        self,
+        student_answers: List[Dict[str, str]],
+        answer_key: Dict[str, str],
+        question_marks: Dict[str, int],
+        question_types: Optional[Dict[str, str]] = None,
+        ocr_confidences: Optional[List[Dict[str, float]]] = None
+    ) -> List[Dict[str, SemanticAnalysisResult]]:
+        """
+        Score a whole class on a test, one question at a time across every student
+        
+        student_answers holds each student's {question_id: answer}. All questions
+        share one term vocabulary, so it is built once for the test.
+        """
+        question_types = question_types or {}
+        profiles = self.compile_answer_key(answer_key)
+        vocabulary, concept_vocabulary = TermVocabulary(), TermVocabulary()
+        results: List[Dict[str, SemanticAnalysisResult]] = [{} for _ in student_answers]
+        
+        for question_id, model_answer in answer_key.items():
+            scores = self.score_class(
+                [answers.get(question_id, "") for answers in student_answers],
+                model_answer,
+                question_types.get(question_id, "Short"),
+                question_marks.get(question_id, 0),
+                [confidences.get(question_id, 1.0) for confidences in ocr_confidences] if ocr_confidences else None,
+                profiles[question_id],
+                vocabulary,
+                concept_vocabulary
+            )
+            for student_results, result in zip(results, scores):
+                student_results[question_id] = result
+        
+        return results
+    
     def _create_empty_result(self, max_marks: int, feedback: str) -> SemanticAnalysisResult:
         """Create result for empty/missing answers"""
         return SemanticAnalysisResult(
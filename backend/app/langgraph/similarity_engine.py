@@ -0,0 +1,171 @@
+"""
+Vectorized Similarity Engine
+Scores a whole class against a model answer with sparse term vectors and NumPy
+"""
+
+from typing import Dict, List, Any, Optional, Iterable
+from collections import Counter
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Same weights as AdvancedTextAnalyzer.calculate_semantic_similarity
+SIMILARITY_WEIGHTS = {
+    'jaccard': 0.2,
+    'cosine': 0.3,
+    'semantic_overlap': 0.3,
+    'concept_similarity': 0.2
+}
+
+# Explanation pattern weights used by AdvancedTextAnalyzer._pattern_similarity
+PATTERN_WEIGHTS = {
+    'causal': 0.3,
+    'mathematical': 0.2,
+    'definition': 0.2,
+    'process': 0.3
+}
+
+class TermVocabulary:
+    """Term-to-column mapping shared by every answer of a test"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def ids(self, terms: Iterable[str]) -> List[int]:
+        """Column ids for terms, adding unseen terms to the vocabulary"""
+        index = self.index
+        return [index.setdefault(term, len(index)) for term in terms]
+
+class SparseTermMatrix:
+    """Documents x vocabulary term counts stored as coordinate arrays"""
+
+    def __init__(self, vocabulary: TermVocabulary, documents: List[List[str]]):
+        rows, cols, counts = [], [], []
+        for row, terms in enumerate(documents):
+            frequencies = Counter(terms)
+            rows.extend([row] * len(frequencies))
+            cols.extend(vocabulary.ids(frequencies.keys()))
+            counts.extend(frequencies.values())
+
+        self.shape = (len(documents), len(vocabulary))
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.counts = np.asarray(counts, dtype=np.float64)
+
+    def row_sums(self, values: "np.ndarray") -> "np.ndarray":
+        """Sum per-entry values into one number per document"""
+        return np.bincount(self.rows, weights=values, minlength=self.shape[0])
+
+    def dot(self, vector: "np.ndarray") -> "np.ndarray":
+        """Matrix-vector product with a dense term vector"""
+        return self.row_sums(self.counts * vector[self.cols])
+
+    def presence_dot(self, vector: "np.ndarray") -> "np.ndarray":
+        """Product of the binary (term present) matrix with a dense vector"""
+        return self.row_sums(vector[self.cols])
+
+    def distinct_terms(self) -> "np.ndarray":
+        """Number of distinct terms in each document"""
+        return self.row_sums(np.ones_like(self.counts))
+
+    def magnitudes(self) -> "np.ndarray":
+        """L2 norm of each document's count vector"""
+        return np.sqrt(self.row_sums(self.counts * self.counts))
+
+class VectorizedSimilarityEngine:
+    """Computes the calculate_semantic_similarity breakdown for many answers at once"""
+
+    def __init__(self, analyzer, vocabulary: Optional[TermVocabulary] = None,
+                 concept_vocabulary: Optional[TermVocabulary] = None):
+        self.analyzer = analyzer
+        self.vocabulary = vocabulary or TermVocabulary()
+        self.concept_vocabulary = concept_vocabulary or TermVocabulary()
+
+    def score_class(self, texts: List[str], profile,
+                    analyses: Optional[List[Optional[Dict[str, Any]]]] = None) -> List[Dict[str, float]]:
+        """
+        Similarity breakdown of every text against one compiled model answer
+
+        Each entry has the jaccard, cosine, semantic_overlap and
+        concept_similarity metrics plus their weighted 'similarity', matching
+        AdvancedTextAnalyzer.calculate_profile_similarity for the same text.
+        """
+        if not texts:
+            return []
+        if not HAS_NUMPY:
+            return [
+                self.analyzer.similarity_breakdown(text, profile, analyses[i] if analyses else None)
+                for i, text in enumerate(texts)
+            ]
+
+        analyzer = self.analyzer
+        word_lists = [analyzer._extract_meaningful_words(text) for text in texts]
+        concept_lists = [analyzer._extract_concepts(text) for text in texts]
+
+        # Students and the model answer share one vocabulary, so the model is just another row
+        words = SparseTermMatrix(self.vocabulary, word_lists + [profile.meaningful_words])
+        concepts = SparseTermMatrix(self.concept_vocabulary, concept_lists + [profile.concepts])
+        count = len(texts)
+
+        # Jaccard and cosine over meaningful words
+        model_counts = np.zeros(len(self.vocabulary))
+        model_mask = words.rows == count
+        model_counts[words.cols[model_mask]] = words.counts[model_mask]
+        model_presence = (model_counts > 0).astype(np.float64)
+
+        word_sizes = words.distinct_terms()
+        shared_words = words.presence_dot(model_presence)
+        word_union = word_sizes + word_sizes[count] - shared_words
+        jaccard = np.divide(shared_words, word_union, out=np.zeros_like(shared_words), where=word_union > 0)
+
+        dot_products = words.dot(model_counts)
+        magnitudes = words.magnitudes()
+        norms = magnitudes * magnitudes[count]
+        cosine = np.divide(dot_products, norms, out=np.zeros_like(dot_products), where=norms > 0)
+
+        # Concept overlap (Jaccard over concept sets)
+        concept_presence = np.zeros(len(self.concept_vocabulary))
+        concept_presence[concepts.cols[concepts.rows == count]] = 1.0
+        concept_sizes = concepts.distinct_terms()
+        shared_concepts = concepts.presence_dot(concept_presence)
+        concept_union = concept_sizes + concept_sizes[count] - shared_concepts
+        overlap = np.divide(shared_concepts, concept_union, out=np.zeros_like(shared_concepts),
+                            where=(concept_sizes > 0) & (concept_sizes[count] > 0))
+
+        # Explanation patterns: students x patterns flags against the model's flags
+        pattern_names = list(PATTERN_WEIGHTS)
+        flags = np.array([
+            [
+                flag_set[name] for name in pattern_names
+            ]
+            for flag_set in (
+                analyzer._explanation_flags(text) if not analyses or analyses[i] is None
+                else analyzer._flags_from_analysis(analyses[i])
+                for i, text in enumerate(texts)
+            )
+        ], dtype=np.float64)
+        model_flags = analyzer._flags_from_analysis(profile.analysis)
+        pattern_weights = np.array([PATTERN_WEIGHTS[name] * model_flags[name] for name in pattern_names])
+        pattern = np.minimum(flags @ pattern_weights, 1.0)
+
+        metrics = np.vstack([jaccard[:count], cosine[:count], overlap[:count], pattern])
+        similarity = np.minimum(np.array(list(SIMILARITY_WEIGHTS.values())) @ metrics, 1.0)
+
+        # Empty answers (or an empty model answer) score zero, as in calculate_semantic_similarity
+        has_words = (word_sizes[:count] > 0) & (word_sizes[count] > 0)
+        metrics[:, ~has_words] = 0.0
+        similarity[~has_words] = 0.0
+
+        return [
+            {
+                **dict(zip(SIMILARITY_WEIGHTS, (float(value) for value in metrics[:, i]))),
+                'similarity': float(similarity[i])
+            }
+            for i in range(count)
+        ]
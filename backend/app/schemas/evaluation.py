@@ -22,4 +22,13 @@ class EvaluationResponse(BaseModel):
     evaluated_at: Optional[datetime] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class EvaluationJobResponse(BaseModel):
+    job_id: str
+    evaluation_type: str
+    status: str
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
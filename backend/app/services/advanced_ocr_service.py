@@ -4,7 +4,7 @@ Advanced OCR Service with Semantic Content Extraction
 
 import re
 import json
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Iterable, Iterator
 import asyncio
 from pathlib import Path
 try:
@@ -198,10 +198,12 @@ class AdvancedOCRService:
 
 import re
 import json
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Optional
 import asyncio
 from pathlib import Path
 
+from app.core.phrase_matcher import phrase_matcher_for, PhraseMatches
+
 class AdvancedOCRService:
     """Advanced OCR service for semantic content extraction"""
     
@@ -219,27 +221,23 @@ class AdvancedOCRService:
         Convert PDF to images and extract text using advanced OCR
         """
         try:
-            # Step 1: Convert PDF to high-resolution images
-            images = await self._pdf_to_images(pdf_file_path)
-            
-            # Step 2: Preprocess images for better OCR
-            processed_images = await self._preprocess_images(images)
-            
-            # Step 3: Extract text using multiple OCR engines
-            ocr_results = await self._extract_text_multi_engine(processed_images)
+            # Steps 1-3: Render, preprocess and OCR one page at a time so only one page image is held
+            ocr_results = await self._extract_text_multi_engine(
+                self._preprocess_image(image) for image in self._iter_pdf_images(pdf_file_path)
+            )
             
             # Step 4: Detect question boundaries and numbers
-            question_mapping = await self._detect_questions(ocr_results, processed_images)
+            question_mapping = await self._detect_questions(ocr_results)
             
             # Step 5: Analyze handwriting quality
-            handwriting_analysis = await self._analyze_handwriting_quality(processed_images)
+            handwriting_analysis = await self._analyze_handwriting_quality(ocr_results)
             
             return {
                 "detected_questions": list(question_mapping.keys()),
                 "skipped_questions": await self._identify_skipped_questions(question_mapping),
                 "extracted_answers": question_mapping,
                 "ocr_confidence": np.mean([result.confidence for result in ocr_results]),
-                "total_pages": len(images),
+                "total_pages": len(ocr_results),
                 "processing_time": 12.3,  # Actual processing time would be calculated
                 "handwriting_quality": handwriting_analysis
             }
@@ -247,50 +245,48 @@ class AdvancedOCRService:
             # Fallback to mock data for demo
             return await self._generate_mock_ocr_results()
     
-    async def _pdf_to_images(self, pdf_path: str) -> List[Image.Image]:
-        """Convert PDF pages to high-resolution images"""
+    def _iter_pdf_images(self, pdf_path: str) -> Iterator[Image.Image]:
+        """Render PDF pages one at a time at high resolution"""
         try:
-            # Using pdf2image library
-            images = pdf2image.convert_from_path(
+            page_count = pdf2image.pdfinfo_from_path(pdf_path)["Pages"]
+        except Exception:
+            # Mock pages for demo
+            for _ in range(4):
+                yield Image.new('RGB', (800, 1200), 'white')
+            return
+        
+        for page_num in range(1, page_count + 1):
+            yield pdf2image.convert_from_path(
                 pdf_path,
                 dpi=300,  # High resolution for better OCR
-                fmt='PNG'
-            )
-            return images
-        except Exception:
-            # Return mock images for demo
-            return [Image.new('RGB', (800, 1200), 'white') for _ in range(4)]
+                fmt='PNG',
+                first_page=page_num,
+                last_page=page_num
+            )[0]
     
-    async def _preprocess_images(self, images: List[Image.Image]) -> List[np.ndarray]:
+    def _preprocess_image(self, img: Image.Image) -> np.ndarray:
         """Apply image preprocessing for better OCR accuracy"""
-        processed = []
-        
-        for img in images:
-            # Convert PIL to OpenCV format
-            cv_img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-            
-            # Apply preprocessing techniques
-            # 1. Noise reduction
-            denoised = cv2.fastNlMeansDenoising(cv_img)
-            
-            # 2. Contrast enhancement
-            lab = cv2.cvtColor(denoised, cv2.COLOR_BGR2LAB)
-            l, a, b = cv2.split(lab)
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-            l = clahe.apply(l)
-            enhanced = cv2.merge([l, a, b])
-            enhanced = cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
-            
-            # 3. Sharpening
-            kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-            sharpened = cv2.filter2D(enhanced, -1, kernel)
-            
-            processed.append(sharpened)
-        
-        return processed
+        # Convert PIL to OpenCV format
+        cv_img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
+        
+        # Apply preprocessing techniques
+        # 1. Noise reduction
+        denoised = cv2.fastNlMeansDenoising(cv_img)
+        
+        # 2. Contrast enhancement
+        lab = cv2.cvtColor(denoised, cv2.COLOR_BGR2LAB)
+        l, a, b = cv2.split(lab)
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+        l = clahe.apply(l)
+        enhanced = cv2.merge([l, a, b])
+        enhanced = cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
+        
+        # 3. Sharpening
+        kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
+        return cv2.filter2D(enhanced, -1, kernel)
     
-    async def _extract_text_multi_engine(self, images: List[np.ndarray]) -> List[OCRResult]:
-        """Use multiple OCR engines for better accuracy"""
+    async def _extract_text_multi_engine(self, images: Iterable[np.ndarray]) -> List[OCRResult]:
+        """Use multiple OCR engines for better accuracy (pages are consumed one at a time)"""
         results = []
         
         for i, img in enumerate(images):
@@ -318,7 +314,7 @@ class AdvancedOCRService:
         
         return results
     
-    async def _detect_questions(self, ocr_results: List[OCRResult], images: List[np.ndarray]) -> Dict[int, Dict]:
+    async def _detect_questions(self, ocr_results: List[OCRResult]) -> Dict[int, Dict]:
         """Detect question numbers and boundaries using AI vision"""
         question_mapping = {}
         
@@ -347,7 +343,7 @@ class AdvancedOCRService:
         answered_questions = list(question_mapping.keys())
         return [q for q in all_questions if q not in answered_questions]
     
-    async def _analyze_handwriting_quality(self, images: List[np.ndarray]) -> Dict:
+    async def _analyze_handwriting_quality(self, ocr_results: List[OCRResult]) -> Dict:
         """Analyze handwriting quality using AI vision models"""
         # In production, use AI models trained on handwriting analysis
         return {
@@ -422,6 +418,10 @@ class AdvancedOCRService:
             }
         }
 
+# Phrases looked for in every answer alongside the model-answer keywords
+EXPLANATION_WORDS = ("because", "therefore", "due to", "as a result", "explains", "shows", "proves")
+FORMULA_SYMBOLS = ("=", "+", "-", "×", "÷", "→", "↔")
+
 class AIEvaluationService:
     def __init__(self):
         # Initialize AI model clients
@@ -455,15 +455,18 @@ class AIEvaluationService:
         model_text = model_answer["answer"].lower()
         keywords = [k.lower() for k in model_answer["keywords"]]
         
+        # Keywords, explanation words and formula symbols found in one pass over the answer
+        matches = phrase_matcher_for(tuple(keywords) + EXPLANATION_WORDS + FORMULA_SYMBOLS).scan(student_text)
+        
         # Keyword matching analysis
-        keyword_matches = sum(1 for keyword in keywords if keyword in student_text)
+        keyword_matches = sum(1 for keyword in keywords if keyword in matches)
         keyword_score = keyword_matches / len(keywords) if keywords else 0
         
         # Conceptual understanding analysis (simulated AI evaluation)
-        concept_score = await self._analyze_conceptual_understanding(student_text, model_text, keywords)
+        concept_score = await self._analyze_conceptual_understanding(student_text, model_text, keywords, matches)
         
         # Accuracy analysis
-        accuracy_score = await self._analyze_accuracy(student_text, model_answer)
+        accuracy_score = await self._analyze_accuracy(student_text, model_answer, matches)
         
         # Presentation and completeness analysis
         presentation_score = await self._analyze_presentation(student_answer)
@@ -506,19 +509,21 @@ class AIEvaluationService:
             }
         }
     
-    async def _analyze_conceptual_understanding(self, student_text: str, model_text: str, keywords: List[str]) -> float:
+    async def _analyze_conceptual_understanding(self, student_text: str, model_text: str, keywords: List[str],
+                                                matches: Optional[PhraseMatches] = None) -> float:
         """Analyze conceptual understanding using AI"""
         # Simulate AI analysis of conceptual understanding
+        if matches is None:
+            matches = phrase_matcher_for(tuple(keywords) + EXPLANATION_WORDS + FORMULA_SYMBOLS).scan(student_text)
         
         # Check for key concept words
-        concept_words = ["because", "therefore", "due to", "as a result", "explains", "shows", "proves"]
-        explanation_indicators = sum(1 for word in concept_words if word in student_text)
+        explanation_indicators = sum(1 for word in EXPLANATION_WORDS if word in matches)
         
         # Check for mathematical/scientific notation
-        has_formulas = any(symbol in student_text for symbol in ["=", "+", "-", "×", "÷", "→", "↔"])
+        has_formulas = any(symbol in matches for symbol in FORMULA_SYMBOLS)
         
         # Check for proper terminology usage
-        terminology_score = len([k for k in keywords if k in student_text]) / len(keywords) if keywords else 0
+        terminology_score = len([k for k in keywords if k in matches]) / len(keywords) if keywords else 0
         
         # Simulated AI scoring
         if terminology_score > 0.8 and explanation_indicators > 0:
@@ -532,10 +537,13 @@ class AIEvaluationService:
         else:
             return 0.2   # Limited understanding
     
-    async def _analyze_accuracy(self, student_text: str, model_answer: Dict) -> float:
+    async def _analyze_accuracy(self, student_text: str, model_answer: Dict,
+                                matches: Optional[PhraseMatches] = None) -> float:
         """Analyze factual accuracy"""
         keywords = [k.lower() for k in model_answer["keywords"]]
-        keyword_matches = sum(1 for keyword in keywords if keyword in student_text)
+        if matches is None:
+            matches = phrase_matcher_for(tuple(keywords)).scan(student_text)
+        keyword_matches = sum(1 for keyword in keywords if keyword in matches)
         return keyword_matches / len(keywords) if keywords else 0.5
     
     async def _analyze_presentation(self, student_answer: Dict) -> float:
@@ -3,10 +3,15 @@ Advanced PDF OCR Service
 High-accuracy text extraction from PDF answer sheets with multiple OCR engines
 """
 
-import io
 import re
+import json
+import bisect
+import shlex
+import importlib.util
+import time
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Iterator
+from dataclasses import dataclass, field
 import tempfile
 import os
 from pathlib import Path
@@ -19,7 +24,7 @@ except ImportError:
     HAS_PYMUPDF = False
 
 try:
-    from pdf2image import convert_from_path, convert_from_bytes
+    from pdf2image import convert_from_path, convert_from_bytes, pdfinfo_from_path
     HAS_PDF2IMAGE = True
 except ImportError:
     HAS_PDF2IMAGE = False
@@ -37,90 +42,283 @@ try:
 except ImportError:
     HAS_PIL = False
 
-# OCR Engines
-try:
-    import pytesseract
-    HAS_TESSERACT = True
-except ImportError:
-    HAS_TESSERACT = False
+# OCR Engines (Tesseract through the in-process API or the pytesseract CLI, see tesseract_backend)
+from app.services.tesseract_backend import tesseract_backend
+HAS_TESSERACT = tesseract_backend.available
 
-try:
-    import easyocr
-    HAS_EASYOCR = True
-except ImportError:
-    HAS_EASYOCR = False
+# EasyOCR pulls in torch, so it is only imported when its reader is first needed
+HAS_EASYOCR = importlib.util.find_spec("easyocr") is not None
+
+from app.core.config import settings
+from app.services.ocr_cache_service import ocr_result_cache, page_fingerprint
+from app.core.engines import engine_registry, EngineUnavailable
+from app.core.metrics import record_ocr_pages
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Engine configurations (also part of the OCR cache key)
+TESSERACT_WHITELIST = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,;:!?()[]{}\"'-+= "
+# Quoted so the quote characters and space survive shlex splitting (both Tesseract backends split it that way)
+TESSERACT_CONFIG = '--oem 3 --psm 6 -c ' + shlex.quote(f"tessedit_char_whitelist={TESSERACT_WHITELIST}")
+ENGINE_CACHE_CONFIGS = {
+    'tesseract': TESSERACT_CONFIG,
+    'easyocr': "lang=en"
+}
+OCR_CACHE_FORMAT = "lines-v1"  # Cached pages hold OCRLine JSON (words, boxes, confidences) instead of plain text
+
+# Cheapest first; the cascade escalates low-confidence lines along this order
+ENGINE_COST_ORDER = ('tesseract', 'easyocr')
+CASCADE_LINE_PADDING = 6  # Pixels around a line box when cropping it for a heavier engine
+CASCADE_FULL_PAGE_RATIO = 0.5  # Above this share of low-confidence lines, re-OCR the whole page instead
+
+def engine_cache_config(engine: str, dpi: int, cascade: Tuple[str, ...] = ()) -> str:
+    """Cache config of an engine (or the cascade over `cascade`) run at a given rasterization DPI"""
+    if engine == 'cascade':
+        stages = " > ".join(f"{stage}[{ENGINE_CACHE_CONFIGS[stage]}]" for stage in cascade)
+        return f"{stages} min_conf={settings.OCR_CASCADE_MIN_CONFIDENCE} dpi={dpi} format={OCR_CACHE_FORMAT}"
+    return f"{ENGINE_CACHE_CONFIGS[engine]} dpi={dpi} format={OCR_CACHE_FORMAT}"
+
+# Per-page extraction planning: pages with enough text layer and little image area skip OCR
+PAGE_MIN_TEXT_CHARS = 50
+PAGE_IMAGE_COVERAGE_OCR = 0.5  # Fraction of the page covered by images (scans, photos of handwriting)
+PAGE_BLANK_INK_DENSITY = 0.002  # Dark pixel fraction below which a page has nothing to read
+PAGE_PROFILE_DPI = 72  # Thumbnail resolution for ink density and line height
+
+# OCR resolution from glyph size: aim for text lines about TARGET_LINE_PX pixels tall
+DEFAULT_OCR_DPI = 300
+MIN_OCR_DPI, MAX_OCR_DPI = 200, 400
+TARGET_LINE_PX = 40
+
+# Maps grayscale bytes to 1 (dark) or 0 so dark pixels can be counted with bytes.count
+_DARK_PIXEL_TABLE = bytes(1 if value < 128 else 0 for value in range(256))
+
+def _dpi_for_glyph_height(glyph_height_pt: Optional[float]) -> int:
+    """Rasterization DPI that renders glyphs of the given height (in points) at TARGET_LINE_PX"""
+    if not glyph_height_pt:
+        return DEFAULT_OCR_DPI
+    dpi = TARGET_LINE_PX * 72 / glyph_height_pt
+    return int(min(MAX_OCR_DPI, max(MIN_OCR_DPI, round(dpi / 50) * 50)))
+
+def _probe_tesseract() -> str:
+    """Tesseract version (probed once per process instead of per service)"""
+    return tesseract_backend.version()
+
+def _load_easyocr_reader():
+    import easyocr
+    return easyocr.Reader(['en'])
+
+if HAS_TESSERACT:
+    engine_registry.register("tesseract", _probe_tesseract, "Tesseract OCR binary (version probe)")
+if HAS_EASYOCR:
+    engine_registry.register("easyocr", _load_easyocr_reader, "EasyOCR English reader")
+
+@dataclass
+class OCRWord:
+    """One recognized word with its engine confidence (0-1) and box (left, top, right, bottom)"""
+    text: str
+    confidence: float
+    bbox: Tuple[float, float, float, float]
+
+@dataclass
+class OCRLine:
+    """
+    One recognized text line with its engine confidence (0-1) and box (left, top, right, bottom)
+    
+    Boxes are in pixels of the image that was read until `to_points` moves
+    them to PDF points, which is how pages are cached and reported.
+    """
+    text: str
+    confidence: float
+    bbox: Tuple[float, float, float, float]
+    engine: str
+    words: List[OCRWord] = field(default_factory=list)
+    
+    def to_points(self, dpi: int) -> "OCRLine":
+        scale = 72 / dpi
+        return OCRLine(
+            text=self.text,
+            confidence=self.confidence,
+            bbox=tuple(round(value * scale, 1) for value in self.bbox),
+            engine=self.engine,
+            words=[OCRWord(word.text, word.confidence, tuple(round(value * scale, 1) for value in word.bbox))
+                   for word in self.words]
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "confidence": round(self.confidence, 4),
+            "bbox": list(self.bbox),
+            "engine": self.engine,
+            "words": [[word.text, round(word.confidence, 4), list(word.bbox)] for word in self.words]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OCRLine":
+        return cls(
+            text=data["text"],
+            confidence=data["confidence"],
+            bbox=tuple(data["bbox"]),
+            engine=data["engine"],
+            words=[OCRWord(text, confidence, tuple(bbox)) for text, confidence, bbox in data["words"]]
+        )
+
+@dataclass
+class TextSegment:
+    """Where a stretch of the assembled document text came from: an OCR line, or a page's text layer (line None)"""
+    start: int
+    end: int
+    page_num: int
+    line: Optional[OCRLine] = None
+
+@dataclass
+class PagePlan:
+    """How one page is extracted: from its text layer, by OCR at a chosen DPI, or skipped as blank"""
+    page_num: int
+    path: str = "text"
+    reason: str = ""
+    text_chars: int = 0
+    image_coverage: float = 0.0
+    ink_density: Optional[float] = None
+    glyph_height_pt: Optional[float] = None
+    dpi: Optional[int] = None
+    fingerprint: Optional[str] = None
+    cascade: Optional[Dict[str, Any]] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "page": self.page_num + 1,
+            "path": self.path,
+            "reason": self.reason,
+            "text_chars": self.text_chars,
+            "image_coverage": self.image_coverage,
+            "ink_density": round(self.ink_density, 4) if self.ink_density is not None else None,
+            "glyph_height_pt": round(self.glyph_height_pt, 1) if self.glyph_height_pt else None,
+            "dpi": self.dpi,
+            "cascade": self.cascade
+        }
+
+@dataclass
+class OCRRequest:
+    """State of one extract_content call, kept off the shared service instance"""
+    pdf_path: str
+    use_cache: bool = True
+    engines: List[str] = field(default_factory=list)
+    page_count: int = 0
+    pages: List[PagePlan] = field(default_factory=list)
+    cache_hits: int = 0
+    cache_misses: int = 0
+    
+    def ocr_page_numbers(self) -> Optional[List[int]]:
+        """Pages planned for OCR, or None when pages were not planned (OCR everything)"""
+        if not self.pages:
+            return None
+        return [plan.page_num for plan in self.pages if plan.path == "ocr"]
+    
+    def path_counts(self) -> Dict[str, int]:
+        counts = {"text": 0, "ocr": 0, "blank": 0}
+        for plan in self.pages:
+            counts[plan.path] += 1
+        return counts
+
 class AdvancedPDFOCRService:
-    """Advanced PDF OCR service with multiple extraction methods"""
+    """Advanced PDF OCR service with multiple extraction methods (one shared instance per process)"""
     
     def __init__(self):
         self.available_engines = []
+        self.ocr_cache = ocr_result_cache
         self._initialize_ocr_engines()
         
     def _initialize_ocr_engines(self):
-        """Initialize available OCR engines"""
+        """Detect available OCR engines (heavy models are loaded on first use)"""
         if HAS_TESSERACT:
             try:
-                pytesseract.get_tesseract_version()
+                engine_registry.get("tesseract")
                 self.available_engines.append('tesseract')
                 logger.info("✅ Tesseract OCR available")
-            except Exception as e:
+            except EngineUnavailable as e:
                 logger.warning(f"⚠️ Tesseract not properly configured: {e}")
         
-        if HAS_EASYOCR:
-            try:
-                self.easyocr_reader = easyocr.Reader(['en'])
-                self.available_engines.append('easyocr')
-                logger.info("✅ EasyOCR available")
-            except Exception as e:
-                logger.warning(f"⚠️ EasyOCR initialization failed: {e}")
+        if HAS_EASYOCR and not engine_registry.failed("easyocr"):
+            self.available_engines.append('easyocr')
+            logger.info("✅ EasyOCR available")
         
         if not self.available_engines:
             logger.warning("⚠️ No OCR engines available - using fallback text extraction")
             self.available_engines.append('fallback')
     
-    async def extract_content(self, pdf_path: str) -> Dict[str, Any]:
+    @property
+    def easyocr_reader(self):
+        """Shared EasyOCR reader, loaded the first time a page needs it"""
+        return engine_registry.get("easyocr")
+    
+    async def extract_content(self, pdf_path: str, use_cache: bool = True) -> Dict[str, Any]:
         """
-        Extract content from PDF using multiple methods
+        Extract content from PDF, deciding per page between its text layer and OCR
+        
+        Args:
+            pdf_path: Path to the answer sheet PDF
+            use_cache: Reuse cached OCR text for previously seen pages (False forces fresh OCR)
         
         Returns:
-            Dict with extracted text, question detection, and confidence scores
+            Dict with extracted text, question detection, confidence scores (per answer from
+            its OCR words, with the words themselves, and per line of raw_text) and the
+            path each page took
         """
         try:
             logger.info(f"🔍 Starting PDF content extraction: {pdf_path}")
             
-            # Method 1: Direct text extraction from PDF
-            direct_text = self._extract_direct_text(pdf_path)
+            # Engines that failed to load since the service was built are skipped
+            request = OCRRequest(
+                pdf_path=pdf_path,
+                use_cache=use_cache,
+                engines=[engine for engine in self.available_engines if not engine_registry.failed(engine)]
+            )
             
-            # Method 2: OCR from PDF images if direct extraction is insufficient
-            ocr_text = {}
-            if not direct_text or len(str(direct_text).strip()) < 50:
-                logger.info("📷 Direct text insufficient, using OCR...")
-                ocr_text = await self._extract_ocr_text(pdf_path)
+            # Method 1: Text layer of every page, and which pages need OCR
+            direct_pages = self._scan_pages(request)
+            
+            # Method 2: OCR only for pages without a usable text layer
+            ocr_pages = {}
+            ocr_page_numbers = request.ocr_page_numbers()
+            if ocr_page_numbers is None or ocr_page_numbers:
+                logger.info(f"📷 OCR needed for pages: {[n + 1 for n in ocr_page_numbers] if ocr_page_numbers else 'all'}")
+                ocr_pages = await self._extract_ocr_text(request)
             
             # Combine and process results
-            extracted_text = self._combine_extraction_results(direct_text, ocr_text)
+            extracted_text, segments = self._combine_page_results(request, direct_pages, ocr_pages)
             
             # Detect questions and answers
-            question_answers = self._detect_questions_and_answers(extracted_text)
+            answer_spans = {}
+            question_answers = self._detect_questions_and_answers(extracted_text, answer_spans)
             
-            # Calculate confidence scores
-            confidence_scores = self._calculate_confidence_scores(extracted_text, question_answers)
+            # Confidence of each answer from the OCR words it was read from
+            confidence_scores, question_confidence = self._calculate_confidence_scores(
+                extracted_text, question_answers, answer_spans, segments
+            )
             
             result = {
                 "extraction_method": "advanced_multi_engine",
-                "available_engines": self.available_engines,
+                "available_engines": list(request.engines),
                 "extracted_text": question_answers,
                 "raw_text": extracted_text,
                 "confidence_scores": confidence_scores,
+                "question_confidence": question_confidence,
+                "line_confidences": self._line_confidences(extracted_text, segments),
                 "total_questions_detected": len(question_answers),
                 "processing_info": {
-                    "direct_text_length": len(str(direct_text)),
-                    "ocr_text_available": bool(ocr_text),
-                    "engines_used": self.available_engines
+                    "page_count": request.page_count,
+                    "direct_text_length": sum(len(text) for text in direct_pages.values()),
+                    "ocr_text_available": bool(ocr_pages),
+                    "engines_used": list(request.engines),
+                    "page_paths": request.path_counts(),
+                    "pages": [plan.to_dict() for plan in request.pages],
+                    "ocr_cache": {
+                        "enabled": use_cache and self.ocr_cache.enabled,
+                        "page_hits": request.cache_hits,
+                        "page_misses": request.cache_misses
+                    }
                 }
             }
             
@@ -137,109 +335,365 @@ class AdvancedPDFOCRService:
                 "total_questions_detected": 0
             }
     
-    def _extract_direct_text(self, pdf_path: str) -> str:
-        """Extract text directly from PDF without OCR"""
+    def _scan_pages(self, request: OCRRequest) -> Dict[int, str]:
+        """
+        Read each page's text layer and plan its extraction path (recorded on the request)
+        
+        Returns the text layer of every page. Without PyMuPDF no plan is made
+        and every page goes to OCR, as before.
+        """
+        if not HAS_PYMUPDF:
+            logger.warning("⚠️ PyMuPDF not available for direct extraction")
+            return {}
+        
+        direct_pages = {}
         try:
-            if HAS_PYMUPDF:
-                doc = fitz.open(pdf_path)
-                text = ""
-                for page in doc:
-                    text += page.get_text()
-                doc.close()
-                logger.info(f"📄 Direct text extracted: {len(text)} characters")
-                return text
-            else:
-                logger.warning("⚠️ PyMuPDF not available for direct extraction")
-                return ""
+            doc = fitz.open(request.pdf_path)
+            request.page_count = doc.page_count
+            for page_num in range(doc.page_count):
+                page = doc.load_page(page_num)
+                direct_pages[page_num] = page.get_text()
+                plan = self._classify_page(page, page_num, direct_pages[page_num])
+                if plan.path == "ocr":
+                    plan.fingerprint = page_fingerprint(page)
+                request.pages.append(plan)
+            doc.close()
+            logger.info(f"📄 Direct text extracted: {sum(len(text) for text in direct_pages.values())} characters, "
+                        f"page paths {request.path_counts()}")
         except Exception as e:
             logger.error(f"❌ Direct text extraction failed: {e}")
-            return ""
+            request.pages = []
+        return direct_pages
+    
+    def _classify_page(self, page, page_num: int, text: str) -> PagePlan:
+        """Decide whether a page is read from its text layer, OCRed, or skipped as blank"""
+        page_area = abs(page.rect) or 1.0
+        image_area = 0.0
+        for image in page.get_image_info():
+            image_area += abs(fitz.Rect(image["bbox"]) & page.rect)
+        
+        plan = PagePlan(
+            page_num=page_num,
+            text_chars=len(text.strip()),
+            image_coverage=round(min(1.0, image_area / page_area), 3)
+        )
+        
+        if plan.text_chars >= PAGE_MIN_TEXT_CHARS and plan.image_coverage < PAGE_IMAGE_COVERAGE_OCR:
+            plan.path, plan.reason = "text", "text layer"
+            return plan
+        
+        # Only pages that may need OCR are rendered, once, at a thumbnail resolution
+        plan.ink_density, line_height_pt = self._ink_profile(page)
+        if plan.ink_density < PAGE_BLANK_INK_DENSITY:
+            plan.path = "text" if plan.text_chars else "blank"
+            plan.reason = "no visible ink beyond the text layer" if plan.text_chars else "blank page"
+            return plan
+        
+        plan.path = "ocr"
+        plan.reason = "scanned or handwritten content" if plan.image_coverage >= PAGE_IMAGE_COVERAGE_OCR else "sparse text layer"
+        plan.glyph_height_pt = self._text_layer_glyph_height(page) if plan.text_chars else None
+        plan.glyph_height_pt = plan.glyph_height_pt or line_height_pt
+        plan.dpi = _dpi_for_glyph_height(plan.glyph_height_pt)
+        return plan
     
-    async def _extract_ocr_text(self, pdf_path: str) -> Dict[str, str]:
-        """Extract text using OCR from PDF images"""
+    def _ink_profile(self, page) -> Tuple[float, Optional[float]]:
+        """Dark pixel fraction of a thumbnail render, and the median text line height in points"""
+        pix = page.get_pixmap(dpi=PAGE_PROFILE_DPI, colorspace=fitz.csGRAY, alpha=False)
+        samples, stride = pix.samples, pix.stride
+        
+        dark_per_row = [
+            samples[row * stride:row * stride + pix.width].translate(_DARK_PIXEL_TABLE).count(1)
+            for row in range(pix.height)
+        ]
+        ink_density = sum(dark_per_row) / max(1, pix.width * pix.height)
+        
+        # Runs of rows containing ink are text lines (or handwriting strokes)
+        line_heights, run = [], 0
+        for dark in dark_per_row + [0]:
+            if dark:
+                run += 1
+            elif run:
+                line_heights.append(run)
+                run = 0
+        line_heights = sorted(height for height in line_heights if height > 1)
+        if not line_heights:
+            return ink_density, None
+        return ink_density, line_heights[len(line_heights) // 2] * 72 / PAGE_PROFILE_DPI
+    
+    def _text_layer_glyph_height(self, page) -> Optional[float]:
+        """Median font size of the page's text layer spans, in points"""
+        sizes = sorted(
+            span["size"]
+            for block in page.get_text("dict").get("blocks", [])
+            for line in block.get("lines", [])
+            for span in line.get("spans", [])
+            if span.get("text", "").strip()
+        )
+        return sizes[len(sizes) // 2] if sizes else None
+    
+    async def _extract_ocr_text(self, request: OCRRequest) -> Dict[str, Dict[int, List[OCRLine]]]:
+        """
+        OCR the planned pages ({engine: {page number: lines}}), rasterizing only pages missing from the OCR cache
+        
+        Lines carry their words with boxes (in PDF points) and engine
+        confidences from the same recognition pass that produced the text.
+        """
         try:
-            # Convert PDF to images
-            images = self._pdf_to_images(pdf_path)
-            if not images:
-                return {}
+            pdf_path = request.pdf_path
+            engines = [engine for engine in request.engines if engine != 'fallback']
+            plans = {plan.page_num: plan for plan in request.pages if plan.path == "ocr"}
             
-            ocr_results = {}
+            # Cascade mode runs the engines as one stage chain instead of each over every page
+            cascade = tuple(sorted(engines, key=lambda engine: ENGINE_COST_ORDER.index(engine)
+                                   if engine in ENGINE_COST_ORDER else len(ENGINE_COST_ORDER)))
+            if settings.OCR_ENGINE_MODE == "cascade" and len(cascade) > 1:
+                engines = ['cascade']
+                logger.info(f"🪜 OCR cascade: {' > '.join(cascade)}")
             
-            for engine in self.available_engines:
-                if engine == 'fallback':
-                    continue
+            # Look up every page for every engine before rendering anything
+            use_cache = request.use_cache and self.ocr_cache.enabled and bool(plans)
+            page_lines = {engine: {} for engine in engines}
+            for engine in engines:
+                for page_num, plan in (plans.items() if use_cache else []):
+                    cached_lines = self._load_cached_lines(plan, engine, cascade)
+                    if cached_lines is not None:
+                        page_lines[engine][page_num] = cached_lines
+                        request.cache_hits += 1
+                    else:
+                        request.cache_misses += 1
+            
+            if plans:
+                missing_pages = sorted({
+                    page_num for engine in engines for page_num in plans
+                    if page_num not in page_lines[engine]
+                })
+            else:
+                missing_pages = None  # Pages were not planned - rasterize everything
+            
+            if missing_pages is None or missing_pages:
+                # Render one page at a time and run every engine that still needs it before the next
+                dpi_by_page = {page_num: plans[page_num].dpi for page_num in missing_pages or []}
+                failed_engines = set()
+                
+                for page_num, image in self._iter_page_images(pdf_path, missing_pages, dpi_by_page):
+                    for engine in engines:
+                        if engine in failed_engines or page_num in page_lines[engine]:
+                            continue
+                        
+                        try:
+                            ocr_start = time.perf_counter()
+                            if engine == 'cascade':
+                                lines, cascade_info = await self._ocr_cascade(image, cascade)
+                                if page_num in plans:
+                                    plans[page_num].cascade = cascade_info
+                            else:
+                                lines = self._ocr_lines(self._preprocess_image(image), engine)
+                            record_ocr_pages(engine, 1, time.perf_counter() - ocr_start)
+                        except Exception as e:
+                            logger.warning(f"⚠️ OCR failed with {engine}: {e}")
+                            failed_engines.add(engine)
+                            continue
+                        
+                        dpi = dpi_by_page.get(page_num, DEFAULT_OCR_DPI)
+                        page_lines[engine][page_num] = [line.to_points(dpi) for line in lines]
+                        if page_num in plans and use_cache:
+                            plan = plans[page_num]
+                            self.ocr_cache.put(
+                                plan.fingerprint, engine, engine_cache_config(engine, plan.dpi, cascade),
+                                json.dumps([line.to_dict() for line in page_lines[engine][page_num]])
+                            )
                     
-                try:
-                    engine_result = await self._ocr_with_engine(images, engine)
-                    if engine_result:
-                        ocr_results[engine] = engine_result
-                        logger.info(f"✅ OCR successful with {engine}")
-                except Exception as e:
-                    logger.warning(f"⚠️ OCR failed with {engine}: {e}")
+                    # Release the page before the next one is rendered
+                    del image
+            elif plans:
+                logger.info("♻️ All OCR pages served from OCR cache - skipping rasterization")
             
-            return ocr_results
+            for engine, pages in page_lines.items():
+                if pages:
+                    logger.info(f"✅ OCR successful with {engine}")
+            
+            return {engine: pages for engine, pages in page_lines.items() if pages}
             
         except Exception as e:
             logger.error(f"❌ OCR text extraction failed: {e}")
             return {}
     
-    def _pdf_to_images(self, pdf_path: str) -> List[Any]:
-        """Convert PDF pages to images"""
+    def _load_cached_lines(self, plan: PagePlan, engine: str, cascade: Tuple[str, ...]) -> Optional[List[OCRLine]]:
+        """OCR lines of a page from the OCR cache, or None on a miss (or an unreadable entry)"""
+        cached = self.ocr_cache.get(plan.fingerprint, engine, engine_cache_config(engine, plan.dpi, cascade))
+        if cached is None:
+            return None
+        try:
+            return [OCRLine.from_dict(line) for line in json.loads(cached)]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable OCR cache entry for page {plan.page_num + 1}: {e}")
+            return None
+    
+    def _iter_page_images(self, pdf_path: str, page_numbers: Optional[List[int]] = None,
+                          dpi_by_page: Optional[Dict[int, int]] = None) -> Iterator[Tuple[int, Any]]:
+        """
+        Render PDF pages (all, or the given zero-based page numbers) one at a time at each page's DPI
+        
+        Yields (page number, image). Only one rendered page is held at a time,
+        so peak memory does not grow with the page count; callers should drop
+        each image before asking for the next.
+        """
+        dpi_by_page = dpi_by_page or {}
+        rendered = 0
         try:
             if HAS_PDF2IMAGE:
-                images = convert_from_path(pdf_path, dpi=300)
-                logger.info(f"📷 Converted PDF to {len(images)} images")
-                return images
+                if page_numbers is None:
+                    page_numbers = range(pdfinfo_from_path(pdf_path)["Pages"])
+                for page_num in page_numbers:
+                    image = convert_from_path(
+                        pdf_path, dpi=dpi_by_page.get(page_num, DEFAULT_OCR_DPI),
+                        first_page=page_num + 1, last_page=page_num + 1
+                    )[0]
+                    rendered += 1
+                    yield page_num, image
+                    del image
+                logger.info(f"📷 Rendered {rendered} PDF pages")
             elif HAS_PYMUPDF and HAS_PIL:
                 # Fallback using PyMuPDF
                 doc = fitz.open(pdf_path)
-                images = []
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for better quality
-                    img_data = pix.tobytes("ppm")
-                    img = Image.open(io.BytesIO(img_data))
-                    images.append(img)
-                doc.close()
-                logger.info(f"📷 Converted PDF to {len(images)} images using PyMuPDF")
-                return images
+                try:
+                    for page_num in (page_numbers if page_numbers is not None else range(len(doc))):
+                        pix = doc.load_page(page_num).get_pixmap(dpi=dpi_by_page.get(page_num, DEFAULT_OCR_DPI), alpha=False)
+                        image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+                        del pix
+                        rendered += 1
+                        yield page_num, image
+                        del image
+                finally:
+                    doc.close()
+                logger.info(f"📷 Rendered {rendered} PDF pages using PyMuPDF")
             else:
                 logger.warning("⚠️ No PDF to image conversion library available")
-                return []
         except Exception as e:
-            logger.error(f"❌ PDF to image conversion failed: {e}")
-            return []
+            logger.error(f"❌ PDF to image conversion failed after {rendered} pages: {e}")
     
-    async def _ocr_with_engine(self, images: List[Any], engine: str) -> str:
-        """Perform OCR using specified engine"""
-        try:
-            all_text = ""
-            
-            for i, image in enumerate(images):
-                # Preprocess image for better OCR
-                processed_image = self._preprocess_image(image)
-                
-                if engine == 'tesseract' and HAS_TESSERACT:
-                    # Configure Tesseract for better accuracy
-                    custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,;:!?()[]{}"\'-+= \n'
-                    text = pytesseract.image_to_string(processed_image, config=custom_config)
-                    
-                elif engine == 'easyocr' and HAS_EASYOCR:
-                    # Convert PIL image to numpy array for EasyOCR
-                    img_array = np.array(processed_image)
-                    results = self.easyocr_reader.readtext(img_array)
-                    text = ' '.join([result[1] for result in results])
-                    
-                else:
-                    continue
-                
-                all_text += f"\n--- Page {i+1} ---\n{text}\n"
+    async def _ocr_cascade(self, image: Any, cascade: Tuple[str, ...]) -> Tuple[List[OCRLine], Dict[str, Any]]:
+        """
+        OCR a page with the cheapest engine, escalating only low-confidence lines to heavier engines
+        
+        Each low-confidence line is cropped and re-read by the next engine, and
+        the more confident reading is kept. When most of the page is low
+        confidence (typically handwriting) the heavier engine reads the whole
+        page once instead of line by line. A stage that fails is recorded in
+        the info under failed_stages and the page keeps the lines read so far.
+        """
+        processed_image = self._preprocess_image(image)
+        threshold = settings.OCR_CASCADE_MIN_CONFIDENCE
+        lines = self._ocr_lines(processed_image, cascade[0])
+        info = {"engines": list(cascade), "lines": len(lines), "low_confidence_lines": 0,
+                "escalated_lines": 0, "improved_lines": 0, "full_page_engine": None}
+        
+        for engine in cascade[1:]:
+            low = [index for index, line in enumerate(lines) if line.confidence < threshold]
+            if engine == cascade[1]:
+                info["low_confidence_lines"] = len(low)
+            if not low:
+                break
             
-            return all_text
+            # A failing heavier engine (model that will not load, a crop it chokes on) ends its own
+            # stage only; the lines read so far by cheaper engines are kept
+            try:
+                lines = self._escalate_lines(processed_image, lines, low, engine, info)
+            except Exception as e:
+                logger.warning(f"⚠️ OCR cascade stage {engine} failed, keeping earlier lines: {e}")
+                info.setdefault("failed_stages", {})[engine] = f"{type(e).__name__}: {e}"
+        
+        return lines, info
+    
+    def _escalate_lines(self, processed_image: Any, lines: List[OCRLine], low: List[int],
+                        engine: str, info: Dict[str, Any]) -> List[OCRLine]:
+        """
+        One cascade stage: re-read the low-confidence lines (or the whole page) with a heavier engine
+        
+        Improved lines are replaced in place, so a stage that fails part way
+        through keeps the lines it already improved.
+        """
+        if len(low) > CASCADE_FULL_PAGE_RATIO * len(lines):
+            heavier_lines = self._ocr_lines(processed_image, engine)
+            info["full_page_engine"] = engine
+            return heavier_lines if self._mean_confidence(heavier_lines) > self._mean_confidence(lines) else lines
+        
+        width, height = processed_image.size
+        for index in low:
+            left, top, right, bottom = lines[index].bbox
+            crop_left, crop_top = max(0, left - CASCADE_LINE_PADDING), max(0, top - CASCADE_LINE_PADDING)
+            region = processed_image.crop((
+                crop_left, crop_top,
+                min(width, right + CASCADE_LINE_PADDING), min(height, bottom + CASCADE_LINE_PADDING)
+            ))
+            region_lines = self._ocr_lines(region, engine)
+            info["escalated_lines"] += 1
+            if region_lines and self._mean_confidence(region_lines) > lines[index].confidence:
+                # Word boxes come back relative to the crop
+                lines[index] = OCRLine(
+                    text=" ".join(line.text for line in region_lines),
+                    confidence=self._mean_confidence(region_lines),
+                    bbox=lines[index].bbox,
+                    engine=engine,
+                    words=[
+                        OCRWord(word.text, word.confidence, (word.bbox[0] + crop_left, word.bbox[1] + crop_top,
+                                                             word.bbox[2] + crop_left, word.bbox[3] + crop_top))
+                        for line in region_lines for word in line.words
+                    ]
+                )
+                info["improved_lines"] += 1
+        return lines
+    
+    def _ocr_lines(self, image: Any, engine: str) -> List[OCRLine]:
+        """Text lines with their words, boxes and confidences from one engine, in reading order"""
+        if engine == 'tesseract' and HAS_TESSERACT:
+            data = tesseract_backend.image_to_data(image, config=TESSERACT_CONFIG)
+            grouped: Dict[Tuple[int, int, int], List[int]] = {}
+            for i, word in enumerate(data["text"]):
+                if word.strip() and float(data["conf"][i]) >= 0:
+                    grouped.setdefault((data["block_num"][i], data["par_num"][i], data["line_num"][i]), []).append(i)
             
-        except Exception as e:
-            logger.error(f"❌ OCR with {engine} failed: {e}")
-            return ""
+            lines = []
+            for indices in grouped.values():
+                words = [
+                    OCRWord(
+                        text=data["text"][i],
+                        confidence=float(data["conf"][i]) / 100,
+                        bbox=(data["left"][i], data["top"][i],
+                              data["left"][i] + data["width"][i], data["top"][i] + data["height"][i])
+                    )
+                    for i in indices
+                ]
+                lines.append(OCRLine(
+                    text=" ".join(word.text for word in words),
+                    confidence=sum(word.confidence for word in words) / len(words),
+                    bbox=(
+                        min(word.bbox[0] for word in words),
+                        min(word.bbox[1] for word in words),
+                        max(word.bbox[2] for word in words),
+                        max(word.bbox[3] for word in words)
+                    ),
+                    engine=engine,
+                    words=words
+                ))
+            return lines
+        
+        elif engine == 'easyocr' and HAS_EASYOCR:
+            lines = []
+            for box, text, confidence in self.easyocr_reader.readtext(np.array(image)):
+                xs = [int(point[0]) for point in box]
+                ys = [int(point[1]) for point in box]
+                bbox = (min(xs), min(ys), max(xs), max(ys))
+                # EasyOCR scores whole detections, so each word shares its detection's box and confidence
+                lines.append(OCRLine(text=text, confidence=float(confidence), bbox=bbox, engine=engine,
+                                     words=[OCRWord(word, float(confidence), bbox) for word in text.split()]))
+            return lines
+        
+        raise ValueError(f"OCR engine {engine} is not available")
+    
+    @staticmethod
+    def _mean_confidence(lines: List[OCRLine]) -> float:
+        return sum(line.confidence for line in lines) / len(lines) if lines else 0.0
     
     def _preprocess_image(self, image: Any) -> Any:
         """Preprocess image for better OCR accuracy"""
@@ -274,33 +728,65 @@ class AdvancedPDFOCRService:
             logger.warning(f"⚠️ Image preprocessing failed: {e}")
             return image
     
-    def _combine_extraction_results(self, direct_text: str, ocr_results: Dict[str, str]) -> str:
-        """Combine direct text extraction and OCR results"""
-        combined_text = ""
-        
-        # Use direct text if available and substantial
-        if direct_text and len(direct_text.strip()) > 50:
-            combined_text = direct_text
-            logger.info("📄 Using direct text extraction as primary source")
-        
-        # Otherwise, combine OCR results
-        elif ocr_results:
-            # Prefer EasyOCR if available, then Tesseract
-            if 'easyocr' in ocr_results:
-                combined_text = ocr_results['easyocr']
-                logger.info("🔍 Using EasyOCR as primary source")
-            elif 'tesseract' in ocr_results:
-                combined_text = ocr_results['tesseract']
-                logger.info("🔍 Using Tesseract as primary source")
-            else:
-                # Combine all available OCR results
-                combined_text = "\n".join(ocr_results.values())
-                logger.info("🔍 Using combined OCR results")
+    def _combine_page_results(self, request: OCRRequest, direct_pages: Dict[int, str],
+                              ocr_results: Dict[str, Dict[int, List[OCRLine]]]) -> Tuple[str, List[TextSegment]]:
+        """
+        Assemble the document in page order from each page's text layer or its OCR lines
         
-        return combined_text
+        Also returns where each stretch of the text came from, so word
+        confidences can be looked up for any character range of it.
+        """
+        # Prefer the cascade, then EasyOCR if available, then Tesseract
+        primary = next((engine for engine in ('cascade', 'easyocr', 'tesseract') if engine in ocr_results), None)
+        if primary:
+            logger.info(f"🔍 Using {primary} for OCR pages")
+        
+        parts: List[str] = []
+        segments: List[TextSegment] = []
+        offset = 0
+        
+        def add(text: str, page_num: Optional[int] = None, line: Optional[OCRLine] = None):
+            """Append text, indexing it when it comes from a page (page markers and separators are not indexed)"""
+            nonlocal offset
+            if page_num is not None and text:
+                segments.append(TextSegment(offset, offset + len(text), page_num, line))
+            parts.append(text)
+            offset += len(text)
+        
+        def add_ocr_page(page_num: int) -> bool:
+            for engine in ([primary] if primary else []) + list(ocr_results):
+                if page_num in ocr_results[engine]:
+                    add(f"\n--- Page {page_num + 1} ---\n")
+                    for index, line in enumerate(ocr_results[engine][page_num]):
+                        add("\n" if index else "")
+                        add(line.text, page_num, line)
+                    add("\n")
+                    return True
+            return False
+        
+        if not request.pages:
+            # Unplanned document: OCR pages when there are any, else the raw text layer
+            ocr_pages = sorted({page_num for pages in ocr_results.values() for page_num in pages})
+            for page_num in ocr_pages:
+                add_ocr_page(page_num)
+            if not ocr_pages:
+                for page_num in sorted(direct_pages):
+                    add(direct_pages[page_num], page_num)
+            return "".join(parts), segments
+        
+        for plan in request.pages:
+            if plan.path == "ocr":
+                if not add_ocr_page(plan.page_num):
+                    # OCR unavailable or failed: keep whatever the text layer has
+                    add(direct_pages.get(plan.page_num, ""), plan.page_num)
+                    plan.path, plan.reason = "text", f"{plan.reason}; OCR produced no text"
+            elif plan.path == "text":
+                add(direct_pages.get(plan.page_num, ""), plan.page_num)
+        return "".join(parts), segments
     
-    def _detect_questions_and_answers(self, text: str) -> Dict[str, str]:
-        """Detect questions and extract answers from text"""
+    def _detect_questions_and_answers(self, text: str,
+                                      spans: Optional[Dict[str, Tuple[int, int]]] = None) -> Dict[str, str]:
+        """Detect questions and extract answers from text (recording each answer's character range in `spans`)"""
         if not text:
             return {}
         
@@ -331,6 +817,8 @@ class AdvancedPDFOCRService:
                 # Only add if we have substantial content or it's clearly a question
                 if len(answer_text) > 5 or any(keyword in answer_text.lower() for keyword in ['answer', 'solution', 'explanation']):
                     questions[question_num] = answer_text
+                    if spans is not None:
+                        spans[question_num] = match.span(2)
                     logger.info(f"📝 Detected Question {question_num}: {len(answer_text)} characters")
         
         # If no patterns matched, try to extract any numbered content
@@ -390,29 +878,117 @@ class AdvancedPDFOCRService:
         
         return questions
     
-    def _calculate_confidence_scores(self, text: str, questions: Dict[str, str]) -> Dict[str, float]:
-        """Calculate confidence scores for extraction quality"""
-        confidence = {}
+    def _calculate_confidence_scores(self, text: str, questions: Dict[str, str],
+                                     spans: Dict[str, Tuple[int, int]],
+                                     segments: List[TextSegment]) -> Tuple[Dict[str, float], Dict[str, Dict[str, Any]]]:
+        """
+        Confidence of each answer from the words it was read from, plus the per-question detail
+        
+        Answers found by fallback detection have no character range, and are
+        estimated from their text as before.
+        """
+        confidence, details = {}, {}
+        segment_ends = [segment.end for segment in segments]
         
         for q_num, answer in questions.items():
-            score = 0.8  # Base confidence
-            
-            # Reduce confidence for very short answers
-            if len(answer) < 10:
-                score -= 0.3
-            
-            # Reduce confidence for answers with many special characters (OCR errors)
-            special_char_ratio = len(re.findall(r'[^a-zA-Z0-9\s.,!?;:\-\(\)]', answer)) / max(len(answer), 1)
-            score -= min(special_char_ratio * 0.5, 0.4)
+            span = spans.get(q_num)
+            detail = self._span_confidence(text, segments, segment_ends, *span) if span else None
+            if detail is None:
+                detail = {"confidence": self._estimate_confidence(answer), "source": "estimate"}
+            confidence[q_num] = detail["confidence"]
+            details[q_num] = detail
+        
+        return confidence, details
+    
+    def _line_confidences(self, text: str, segments: List[TextSegment]) -> List[Optional[float]]:
+        """Confidence of every line of `text` (split on newlines); None for page markers and blank lines"""
+        confidences, start = [], 0
+        segment_ends = [segment.end for segment in segments]
+        for line in text.split("\n"):
+            detail = self._span_confidence(text, segments, segment_ends, start, start + len(line), with_words=False)
+            confidences.append(detail["confidence"] if detail else None)
+            start += len(line) + 1
+        return confidences
+    
+    def _span_confidence(self, text: str, segments: List[TextSegment], segment_ends: List[int],
+                         start: int, end: int, with_words: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Character-weighted mean confidence of the words in text[start:end]
+        
+        OCR words count with their engine confidence and text layer characters
+        with 1.0. Returns None when the range holds neither.
+        """
+        weighted, chars, ocr_words, sources, pages = 0.0, 0, [], set(), set()
+        for index in range(bisect.bisect_right(segment_ends, start), len(segments)):
+            segment = segments[index]
+            if segment.start >= end:
+                break
             
-            # Boost confidence for answers with proper words
-            word_count = len(re.findall(r'\b[a-zA-Z]{3,}\b', answer))
-            if word_count > 5:
-                score += 0.1
+            if segment.line is None:
+                count = sum(1 for char in text[max(start, segment.start):min(end, segment.end)] if not char.isspace())
+                if count:
+                    weighted += count
+                    chars += count
+                    sources.add("text_layer")
+                    pages.add(segment.page_num + 1)
+                continue
             
-            confidence[q_num] = max(min(score, 1.0), 0.0)
+            line, search = segment.line, 0
+            for word in line.words or [OCRWord(line.text, line.confidence, line.bbox)]:
+                word_offset = line.text.find(word.text, search)
+                if word_offset < 0:
+                    continue
+                search = word_offset + len(word.text)
+                word_start = segment.start + word_offset
+                if word_start + len(word.text) <= start or word_start >= end:
+                    continue
+                weighted += word.confidence * len(word.text)
+                chars += len(word.text)
+                ocr_words.append((word, segment))
+                sources.add("ocr")
+                pages.add(segment.page_num + 1)
+        
+        if not chars:
+            return None
+        
+        detail = {
+            "confidence": round(weighted / chars, 4),
+            "source": "mixed" if len(sources) > 1 else sources.pop()
+        }
+        if with_words:
+            # Same bar the cascade uses for escalating a line
+            threshold = settings.OCR_CASCADE_MIN_CONFIDENCE
+            detail.update({
+                "pages": sorted(pages),
+                "word_count": len(ocr_words),
+                "low_confidence_words": sum(1 for word, _ in ocr_words if word.confidence < threshold),
+                "min_word_confidence": round(min(word.confidence for word, _ in ocr_words), 4) if ocr_words else None,
+                "words": [
+                    {"text": word.text, "confidence": round(word.confidence, 4), "bbox": list(word.bbox),
+                     "page": segment.page_num + 1, "engine": segment.line.engine}
+                    for word, segment in ocr_words
+                ]
+            })
+        return detail
+    
+    def _estimate_confidence(self, answer: str) -> float:
+        """Confidence guessed from the answer text, for answers that cannot be traced to OCR words"""
+        score = 0.8  # Base confidence
+        
+        # Reduce confidence for very short answers
+        if len(answer) < 10:
+            score -= 0.3
+        
+        # Reduce confidence for answers with many special characters (OCR errors)
+        special_char_ratio = len(re.findall(r'[^a-zA-Z0-9\s.,!?;:\-\(\)]', answer)) / max(len(answer), 1)
+        score -= min(special_char_ratio * 0.5, 0.4)
         
-        return confidence
+        # Boost confidence for answers with proper words
+        word_count = len(re.findall(r'\b[a-zA-Z]{3,}\b', answer))
+        if word_count > 5:
+            score += 0.1
+        
+        return max(min(score, 1.0), 0.0)
 
 # Fallback OCR service when advanced libraries aren't available
 class FallbackOCRService:
@@ -460,11 +1036,22 @@ class FallbackOCRService:
                 "total_questions_detected": 0
             }
 
-# Factory function to get appropriate OCR service
-def get_ocr_service():
-    """Get the best available OCR service"""
+def _build_ocr_service():
+    """The best available OCR service"""
     if any([HAS_PYMUPDF, HAS_PDF2IMAGE, HAS_TESSERACT, HAS_EASYOCR]):
         return AdvancedPDFOCRService()
     else:
         logger.warning("⚠️ Using fallback OCR service - install pytesseract, pdf2image, PyMuPDF, or easyocr for better accuracy")
-        return FallbackOCRService()
\ No newline at end of file
+        return FallbackOCRService()
+
+engine_registry.register("pdf_ocr_service", _build_ocr_service, "Shared PDF OCR service (engine detection)")
+
+# Factory function to get appropriate OCR service
+def get_ocr_service():
+    """
+    Get the shared OCR service
+    
+    Engine detection runs once per process; every extract_content call keeps
+    its own OCRRequest state, so results never leak between requests.
+    """
+    return engine_registry.get("pdf_ocr_service")
\ No newline at end of file
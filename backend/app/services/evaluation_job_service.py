@@ -0,0 +1,213 @@
+"""
+Evaluation Job Queue
+Runs OCR and scoring outside the HTTP request with status persisted in SQLite
+"""
+
+import os
+import json
+import uuid
+import shutil
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Union
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.core.uploads import remove_upload
+from app.db.database import engine, SessionLocal
+from app.db.models import EvaluationJob
+
+logger = logging.getLogger(__name__)
+
+# Job lifecycle (same values as Evaluation.status)
+JOB_PENDING = "pending"
+JOB_PROCESSING = "processing"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+def _run_tesseract_evaluation(pdf_file: Optional[Union[bytes, str]], params: Dict[str, Any]) -> Dict[str, Any]:
+    """Evaluate with Tesseract OCR and the custom parser"""
+    from app.services.tesseract_evaluation_service import tesseract_evaluation_service
+    return tesseract_evaluation_service.evaluate(
+        pdf_file=pdf_file,
+        answer_key=params["answer_key"],
+        question_marks=params["question_marks"],
+        question_texts=params.get("question_texts"),
+        manual_answers=params.get("manual_answers"),
+        use_ocr_cache=params.get("use_ocr_cache", True)
+    )
+
+def _run_semantic_evaluation(pdf_file: Optional[Union[bytes, str]], params: Dict[str, Any]) -> Dict[str, Any]:
+    """Evaluate with the AI-powered LangGraph workflow"""
+    from app.langgraph.ai_powered_evaluation_workflow import ai_workflow_manager
+    return ai_workflow_manager.evaluate(
+        pdf_file=pdf_file,
+        answer_key=params["answer_key"],
+        question_marks=params["question_marks"],
+        question_texts=params.get("question_texts"),
+        manual_answers=params.get("manual_answers"),
+        use_ocr_cache=params.get("use_ocr_cache", True)
+    )
+
+EVALUATION_RUNNERS: Dict[str, Callable[[Optional[Union[bytes, str]], Dict[str, Any]], Dict[str, Any]]] = {
+    "tesseract": _run_tesseract_evaluation,
+    "semantic": _run_semantic_evaluation
+}
+
+class EvaluationJobQueue:
+    """Stores uploads, persists job status and processes jobs on a local worker pool"""
+
+    def __init__(self, session_factory=SessionLocal, bind=engine, upload_dir: Optional[str] = None,
+                 max_workers: Optional[int] = None):
+        self.session_factory = session_factory
+        self.upload_dir = upload_dir or settings.EVALUATION_JOB_UPLOAD_DIR
+        self.max_workers = max(1, max_workers or settings.EVALUATION_JOB_WORKERS)
+        self._executor = None
+
+        os.makedirs(self.upload_dir, exist_ok=True)
+        EvaluationJob.__table__.create(bind=bind, checkfirst=True)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Worker pool, created on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="evaluation-job")
+        return self._executor
+
+    def submit(self, evaluation_type: str, params: Dict[str, Any], pdf_file: Optional[Union[bytes, str]] = None) -> str:
+        """Store the upload (bytes, or a spooled file path that is moved into place), record a pending job and enqueue it"""
+        if evaluation_type not in EVALUATION_RUNNERS:
+            raise ValueError(f"Unknown evaluation type: {evaluation_type}")
+
+        job_id = uuid.uuid4().hex
+        upload_path = None
+        if pdf_file:
+            upload_path = os.path.join(self.upload_dir, f"{job_id}.pdf")
+            if isinstance(pdf_file, str):
+                shutil.move(pdf_file, upload_path)
+            else:
+                with open(upload_path, "wb") as f:
+                    f.write(pdf_file)
+
+        db = self.session_factory()
+        try:
+            db.add(EvaluationJob(
+                id=job_id,
+                evaluation_type=evaluation_type,
+                upload_path=upload_path,
+                parameters=json.dumps(params),
+                status=JOB_PENDING
+            ))
+            db.commit()
+        except Exception:
+            # No job row points at the upload, so nothing would ever remove it
+            remove_upload(upload_path)
+            raise
+        finally:
+            db.close()
+
+        self.executor.submit(self._process, job_id)
+        logger.info(f"Queued {evaluation_type} evaluation job {job_id}")
+        return job_id
+
+    def resume_pending(self) -> int:
+        """Re-enqueue jobs left pending or processing by a previous run"""
+        db = self.session_factory()
+        try:
+            jobs = db.query(EvaluationJob).filter(
+                EvaluationJob.status.in_([JOB_PENDING, JOB_PROCESSING])
+            ).all()
+            job_ids = [job.id for job in jobs]
+            for job in jobs:
+                job.status = JOB_PENDING
+            db.commit()
+        finally:
+            db.close()
+
+        for job_id in job_ids:
+            self.executor.submit(self._process, job_id)
+        if job_ids:
+            logger.info(f"Resumed {len(job_ids)} unfinished evaluation jobs")
+        return len(job_ids)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return job status and, once completed, its result"""
+        db = self.session_factory()
+        try:
+            job = db.query(EvaluationJob).filter(EvaluationJob.id == job_id).first()
+            if not job:
+                return None
+            return {
+                "job_id": job.id,
+                "evaluation_type": job.evaluation_type,
+                "status": job.status,
+                "error": job.error,
+                "result": json.loads(job.result) if job.result else None,
+                "created_at": job.created_at,
+                "started_at": job.started_at,
+                "completed_at": job.completed_at
+            }
+        finally:
+            db.close()
+
+    def depth(self) -> Dict[str, int]:
+        """Number of jobs waiting for a worker and being processed"""
+        db = self.session_factory()
+        try:
+            counts = dict(
+                db.query(EvaluationJob.status, func.count(EvaluationJob.id))
+                .filter(EvaluationJob.status.in_([JOB_PENDING, JOB_PROCESSING]))
+                .group_by(EvaluationJob.status)
+                .all()
+            )
+        finally:
+            db.close()
+        return {JOB_PENDING: counts.get(JOB_PENDING, 0), JOB_PROCESSING: counts.get(JOB_PROCESSING, 0)}
+
+    def _process(self, job_id: str):
+        """Run a single job, persist its outcome and remove its upload"""
+        db = self.session_factory()
+        job = None
+        try:
+            job = db.query(EvaluationJob).filter(EvaluationJob.id == job_id).first()
+            if not job or job.status != JOB_PENDING:
+                return
+
+            job.status = JOB_PROCESSING
+            job.started_at = datetime.utcnow()
+            db.commit()
+
+            try:
+                # OCR opens the stored upload by path rather than loading it into memory
+                result = EVALUATION_RUNNERS[job.evaluation_type](job.upload_path, json.loads(job.parameters))
+
+                if "error" in result:
+                    job.status = JOB_FAILED
+                    job.error = result["error"]
+                else:
+                    job.status = JOB_COMPLETED
+                job.result = json.dumps(result, default=str)
+            except Exception as e:
+                logger.error(f"Evaluation job {job_id} failed: {e}")
+                job.status = JOB_FAILED
+                job.error = str(e)
+
+            job.completed_at = datetime.utcnow()
+            db.commit()
+            logger.info(f"Evaluation job {job_id} {job.status}")
+        finally:
+            try:
+                # Only pending and processing jobs (resume_pending) need their upload
+                if job is not None and job.upload_path and job.status in (JOB_COMPLETED, JOB_FAILED):
+                    remove_upload(job.upload_path)
+                    job.upload_path = None
+                    db.commit()
+            except Exception as e:
+                logger.warning(f"Could not remove upload of evaluation job {job_id}: {e}")
+            finally:
+                db.close()
+
+# Global job queue instance
+evaluation_job_queue = EvaluationJobQueue()
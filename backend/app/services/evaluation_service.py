@@ -1,14 +1,16 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import re
-from difflib import SequenceMatcher
 import openai
 import os
 
+from app.core.similarity import SimilarityKernel, similarity_kernel
+
 class EvaluationService:
     """Service for evaluating student answers against answer keys and reference materials"""
     
-    def __init__(self):
+    def __init__(self, similarity: Optional[SimilarityKernel] = None):
         self.openai_client = None
+        self.similarity_kernel = similarity or similarity_kernel
         self._initialize_ai_services()
     
     def _initialize_ai_services(self):
@@ -189,8 +191,8 @@ class EvaluationService:
         text1_norm = self._normalize_text(text1)
         text2_norm = self._normalize_text(text2)
         
-        # Use sequence matcher for similarity
-        similarity = SequenceMatcher(None, text1_norm, text2_norm).ratio()
+        # Configured similarity kernel (SIMILARITY_KERNEL=token_lcs bounds the cost on long answers)
+        similarity = self.similarity_kernel.similarity(text1_norm, text2_norm)
         
         return similarity
     
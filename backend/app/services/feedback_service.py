@@ -2,6 +2,8 @@ from typing import Dict, List, Any
 import openai
 import os
 
+from app.services.llm_cache_service import feedback_cache
+
 class FeedbackService:
     """Service for generating personalized feedback using AI"""
     
@@ -39,18 +41,26 @@ class FeedbackService:
         try:
             # Prepare prompt for AI
             prompt = self._create_feedback_prompt(evaluation_results, student_answers, answer_key, percentage)
+            messages = [
+                {"role": "system", "content": "You are an expert teacher providing constructive feedback on student answers. Be encouraging, specific, and helpful."},
+                {"role": "user", "content": prompt}
+            ]
+            
+            # Re-grades with the same results produce the same prompt
+            cached_feedback = feedback_cache.get("gpt-4", 0.7, messages)
+            if cached_feedback is not None:
+                return cached_feedback
             
             response = openai.ChatCompletion.create(
                 model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert teacher providing constructive feedback on student answers. Be encouraging, specific, and helpful."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=messages,
                 max_tokens=500,
                 temperature=0.7
             )
             
-            return response.choices[0].message.content.strip()
+            feedback = response.choices[0].message.content.strip()
+            feedback_cache.put("gpt-4", 0.7, messages, feedback)
+            return feedback
             
         except Exception as e:
             print(f"AI feedback generation failed: {e}")
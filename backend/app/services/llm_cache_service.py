@@ -0,0 +1,69 @@
+"""
+LLM Response Cache
+Reuses model responses for prompts that have already been answered
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+from typing import Dict, List, Any, Optional
+
+from app.core.config import settings
+from app.core.sqlite_cache import SQLiteLRUCache
+
+logger = logging.getLogger(__name__)
+
+def normalize_prompt(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry"""
+    return re.sub(r"\s+", " ", text).strip()
+
+class LLMResponseCache:
+    """Persistent prompt-to-response cache keyed by model, temperature and normalized prompt hash"""
+
+    def __init__(self, name: str, enabled: Optional[bool] = None, db_path: Optional[str] = None,
+                 max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.name = name
+        self.enabled = settings.LLM_CACHE_ENABLED if enabled is None else enabled
+        self.store = SQLiteLRUCache(
+            db_path or os.path.join(settings.LLM_CACHE_DIR, f"llm_{name}.db"),
+            max_bytes or settings.LLM_CACHE_MAX_BYTES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds,
+            name=f"llm_{name}_cache"
+        ) if self.enabled else None
+
+    def make_key(self, model: str, temperature: float, messages: List[Dict[str, str]]) -> str:
+        """Hash the model settings together with every normalized message"""
+        normalized = [(m["role"], normalize_prompt(m["content"])) for m in messages]
+        payload = json.dumps([model, round(float(temperature), 3), normalized], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, temperature: float, messages: List[Dict[str, str]]) -> Optional[str]:
+        """Return the cached response, or None on a miss"""
+        if not self.store:
+            return None
+        return self.store.get(self.make_key(model, temperature, messages))
+
+    def put(self, model: str, temperature: float, messages: List[Dict[str, str]], response: str):
+        """Store a model response"""
+        if self.store:
+            self.store.set(self.make_key(model, temperature, messages), response)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters (or the disabled state)"""
+        if not self.store:
+            return {"name": f"llm_{self.name}_cache", "enabled": False}
+        return {"enabled": True, "ttl_seconds": self.store.ttl_seconds, **self.store.stats()}
+
+# Global cache instances, one per prompt family
+answer_evaluation_cache = LLMResponseCache("answer_evaluation")
+answer_extraction_cache = LLMResponseCache("answer_extraction")
+feedback_cache = LLMResponseCache("feedback")
+
+def llm_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters for every LLM response cache"""
+    return {
+        cache.name: cache.stats()
+        for cache in (answer_evaluation_cache, answer_extraction_cache, feedback_cache)
+    }
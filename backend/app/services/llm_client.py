@@ -0,0 +1,171 @@
+"""
+Async LLM Client
+Chat-completions calls with bounded concurrency, token-bucket rate limiting and retry with jitter
+"""
+
+import time
+import random
+import asyncio
+import threading
+import logging
+from collections import deque
+from typing import Dict, List, Any, Optional, Awaitable, TypeVar
+
+from openai import AsyncOpenAI, APIConnectionError, APITimeoutError, APIStatusError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every event loop in the process"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token now or reserve the next one, returning how long to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        if self.rate <= 0:
+            return
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+class ConcurrencyLimiter:
+    """Thread-safe cap on in-flight requests shared by every event loop in the process"""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        self._waiters = deque()  # (loop, future) per waiting request, oldest first
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        """Wait for a free slot"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                waiting = (loop, future) in self._waiters
+                if waiting:
+                    self._waiters.remove((loop, future))
+            # A slot already handed over is given back here, or by _grant if it arrives later
+            if not waiting and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        """Free a slot, handing it straight to the oldest waiter if there is one"""
+        with self._lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self._grant, future)
+                    return
+                except RuntimeError:
+                    continue  # Its event loop has closed
+            self.active -= 1
+
+    def _grant(self, future: asyncio.Future):
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+# Shared across clients so every caller respects the same provider limits
+llm_rate_limiter = TokenBucket(settings.LLM_RATE_LIMIT_RPS, settings.LLM_RATE_LIMIT_BURST)
+llm_concurrency_limiter = ConcurrencyLimiter(settings.LLM_MAX_CONCURRENCY)
+
+class AsyncLLMClient:
+    """Chat-completions client for a single event loop (use as an async context manager)"""
+
+    RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 max_concurrency: Optional[int] = None, max_retries: Optional[int] = None,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 concurrency_limiter: Optional[ConcurrencyLimiter] = None):
+        self.client = AsyncOpenAI(
+            api_key=api_key or settings.OPENAI_API_KEY,
+            base_url=base_url or settings.OPENAI_BASE_URL or None,
+            max_retries=0  # Retries are handled here, with jitter
+        )
+        self.max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.rate_limiter = rate_limiter or llm_rate_limiter
+        # max_concurrency gives this client its own limit instead of the process-wide one
+        self.concurrency_limiter = concurrency_limiter or (
+            ConcurrencyLimiter(max_concurrency) if max_concurrency else llm_concurrency_limiter
+        )
+
+    async def __aenter__(self) -> "AsyncLLMClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.close()
+
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, (APIConnectionError, APITimeoutError)):
+            return True
+        return isinstance(error, APIStatusError) and error.status_code in self.RETRYABLE_STATUS_CODES
+
+    async def chat(self, messages: List[Dict[str, str]], model: str, temperature: float = 0.2,
+                   max_tokens: Optional[int] = None) -> str:
+        """Send one chat-completions request and return the message content"""
+        request = {"model": model, "messages": messages, "temperature": temperature}
+        if max_tokens:
+            request["max_tokens"] = max_tokens
+
+        attempt = 0
+        async with self.concurrency_limiter:
+            while True:
+                await self.rate_limiter.acquire()
+                try:
+                    response = await self.client.chat.completions.create(**request)
+                    return response.choices[0].message.content.strip()
+                except Exception as e:
+                    if attempt >= self.max_retries or not self._is_retryable(e):
+                        raise
+                    # Exponential backoff with full jitter
+                    delay = random.uniform(0, settings.LLM_RETRY_BASE_DELAY * (2 ** attempt))
+                    attempt += 1
+                    logger.warning(f"LLM request failed ({e}), retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+
+def run_sync(coroutine: Awaitable[T]) -> T:
+    """Run a coroutine from synchronous code (worker threads); async callers must await it instead"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    coroutine.close()
+    raise RuntimeError("run_sync would block the running event loop; await the coroutine or call from a worker thread")
@@ -0,0 +1,83 @@
+"""
+Content-addressed OCR Result Cache
+Reuses OCR text for PDF pages that have already been recognized
+"""
+
+import hashlib
+import logging
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+from app.core.sqlite_cache import SQLiteLRUCache
+
+try:
+    import fitz  # PyMuPDF
+    HAS_PYMUPDF = True
+except ImportError:
+    HAS_PYMUPDF = False
+
+logger = logging.getLogger(__name__)
+
+def page_fingerprint(page) -> str:
+    """Hash a PDF page's drawing commands and embedded images (no rasterization)"""
+    digest = hashlib.sha256()
+    digest.update(page.read_contents() or b"")
+    digest.update(repr((tuple(page.rect), page.rotation)).encode())
+
+    document = page.parent
+    for image in page.get_images(full=True):
+        digest.update(document.xref_stream_raw(image[0]) or b"")
+
+    return digest.hexdigest()
+
+class OCRResultCache:
+    """Persistent OCR text cache keyed by page content, OCR engine and engine config"""
+
+    def __init__(self, enabled: Optional[bool] = None, db_path: Optional[str] = None,
+                 max_bytes: Optional[int] = None):
+        self.enabled = settings.OCR_CACHE_ENABLED if enabled is None else enabled
+        self.store = SQLiteLRUCache(
+            db_path or settings.OCR_CACHE_PATH,
+            max_bytes or settings.OCR_CACHE_MAX_BYTES,
+            name="ocr_result_cache"
+        ) if self.enabled else None
+
+    def make_key(self, page_hash: str, engine: str, config: str) -> str:
+        """Combine page content hash with the engine settings that produced the text"""
+        return hashlib.sha256(f"{page_hash}|{engine}|{config}".encode()).hexdigest()
+
+    def fingerprint_pdf(self, pdf_source) -> List[str]:
+        """Fingerprint every page of a PDF given as a path or bytes"""
+        if not HAS_PYMUPDF:
+            return []
+        try:
+            if isinstance(pdf_source, (bytes, bytearray)):
+                document = fitz.open(stream=pdf_source, filetype="pdf")
+            else:
+                document = fitz.open(pdf_source)
+            fingerprints = [page_fingerprint(document.load_page(i)) for i in range(document.page_count)]
+            document.close()
+            return fingerprints
+        except Exception as e:
+            logger.warning(f"PDF fingerprinting failed: {e}")
+            return []
+
+    def get(self, page_hash: str, engine: str, config: str) -> Optional[str]:
+        """Return cached OCR text for a page, or None on a miss"""
+        if not self.store:
+            return None
+        return self.store.get(self.make_key(page_hash, engine, config))
+
+    def put(self, page_hash: str, engine: str, config: str, text: str):
+        """Store OCR text for a page"""
+        if self.store:
+            self.store.set(self.make_key(page_hash, engine, config), text)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters (or the disabled state)"""
+        if not self.store:
+            return {"name": "ocr_result_cache", "enabled": False}
+        return {"enabled": True, **self.store.stats()}
+
+# Global cache instance
+ocr_result_cache = OCRResultCache()
@@ -4,7 +4,7 @@ from google.cloud import vision
 import cv2
 import numpy as np
 from PIL import Image
-import pytesseract
+from app.services.tesseract_backend import tesseract_backend
 import re
 
 class OCRService:
@@ -55,7 +55,7 @@ class OCRService:
         processed_image = self._preprocess_image(image_path)
         
         # Extract text
-        text = pytesseract.image_to_string(processed_image, config='--psm 6')
+        text = tesseract_backend.image_to_string(processed_image, config='--psm 6')
         return text
     
     def _preprocess_image(self, image_path: str) -> np.ndarray:
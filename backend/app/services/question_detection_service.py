@@ -3,11 +3,14 @@ Improved Question Detection Service
 Focuses on accurately detecting and counting questions from question papers
 """
 
-import re
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 import fitz  # PyMuPDF
 
+from app.core.uploads import open_pdf
+from app.core.engines import engine_registry
+from app.core.patterns import scan_question_boundaries, QUESTION_STYLES, ROMAN_NUMERALS, MARKS_PATTERNS
+
 logger = logging.getLogger(__name__)
 
 class QuestionDetectionService:
@@ -16,14 +19,14 @@ class QuestionDetectionService:
     def __init__(self):
         self.name = "Question_Detection_Service"
     
-    def analyze_question_paper(self, pdf_bytes: bytes) -> Dict[str, any]:
+    def analyze_question_paper(self, pdf_source: Union[bytes, str]) -> Dict[str, any]:
         """
-        Analyze a question paper PDF to detect the correct number of questions
+        Analyze a question paper PDF (path or bytes) to detect the correct number of questions
         Returns detailed information about detected questions
         """
         try:
             # Extract text from PDF
-            full_text = self._extract_text_from_pdf(pdf_bytes)
+            full_text = self._extract_text_from_pdf(pdf_source)
             
             # Detect questions using multiple methods
             detected_questions = self._detect_questions_comprehensive(full_text)
@@ -52,10 +55,10 @@ class QuestionDetectionService:
                 "analysis_method": "failed"
             }
     
-    def _extract_text_from_pdf(self, pdf_bytes: bytes) -> str:
+    def _extract_text_from_pdf(self, pdf_source: Union[bytes, str]) -> str:
         """Extract text from PDF with focus on preserving structure"""
         try:
-            pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+            pdf_document = open_pdf(pdf_source)
             full_text = ""
             
             for page_num in range(pdf_document.page_count):
@@ -102,28 +105,11 @@ class QuestionDetectionService:
         """Comprehensive question detection using multiple patterns"""
         detected_questions = []
         
-        # Pattern 1: Standard numbered questions (1., 2., 3., etc.)
-        pattern1_questions = self._detect_pattern1(text)
-        
-        # Pattern 2: Questions with Q prefix (Q1, Q2, Q3, etc.)
-        pattern2_questions = self._detect_pattern2(text)
-        
-        # Pattern 3: Questions with brackets (1), (2), (3), etc.)
-        pattern3_questions = self._detect_pattern3(text)
-        
-        # Pattern 4: Questions with "Question" word (Question 1, Question 2, etc.)
-        pattern4_questions = self._detect_pattern4(text)
-        
-        # Pattern 5: Roman numerals (i., ii., iii., etc.)
-        pattern5_questions = self._detect_pattern5(text)
-        
-        # Combine and deduplicate results
+        # Single pass over the text finds boundaries for every numbering style
+        boundaries = scan_question_boundaries(text)
         all_patterns = [
-            ("numbered_dots", pattern1_questions),
-            ("q_prefix", pattern2_questions),
-            ("brackets", pattern3_questions),
-            ("question_word", pattern4_questions),
-            ("roman_numerals", pattern5_questions)
+            (style, self._questions_from_matches(style, boundaries[style]))
+            for style in QUESTION_STYLES
         ]
         
         # Choose the pattern with most questions detected
@@ -135,112 +121,29 @@ class QuestionDetectionService:
         
         return detected_questions
     
-    def _detect_pattern1(self, text: str) -> List[Dict[str, any]]:
-        """Detect questions like: 1. What is...?, 2. Explain..., etc."""
+    def _questions_from_matches(self, style: str, matches: List) -> List[Dict[str, any]]:
+        """Build question entries for one numbering style from its boundary matches"""
         questions = []
-        pattern = r'(?:^|\n)\s*(\d+)\.\s*([^0-9\n]*?)(?=\n\s*\d+\.|$)'
-        
-        matches = re.finditer(pattern, text, re.MULTILINE | re.DOTALL)
         for match in matches:
-            q_num = match.group(1)
-            q_text = match.group(2).strip()
+            q_text = match.group(f"{style}_text").strip()
             
             if len(q_text) > 5:  # Minimum question length
-                questions.append({
-                    "number": q_num,
+                question = {
+                    "number": match.group(style),
                     "text": q_text[:200] + "..." if len(q_text) > 200 else q_text,
-                    "pattern": "numbered_dots",
+                    "pattern": style,
                     "start_pos": match.start(),
                     "full_text": q_text
-                })
+                }
+                if style == "roman_numerals":
+                    roman = match.group(style).lower()
+                    question["number"] = str(ROMAN_NUMERALS.index(roman) + 1)
+                    question["roman"] = roman
+                questions.append(question)
         
-        return questions
-    
-    def _detect_pattern2(self, text: str) -> List[Dict[str, any]]:
-        """Detect questions like: Q1, Q2, Q3, etc."""
-        questions = []
-        pattern = r'(?:^|\n)\s*Q\s*(\d+)[\.\:\s]*([^Q\n]*?)(?=\n\s*Q\s*\d+|$)'
-        
-        matches = re.finditer(pattern, text, re.MULTILINE | re.DOTALL | re.IGNORECASE)
-        for match in matches:
-            q_num = match.group(1)
-            q_text = match.group(2).strip()
-            
-            if len(q_text) > 5:
-                questions.append({
-                    "number": q_num,
-                    "text": q_text[:200] + "..." if len(q_text) > 200 else q_text,
-                    "pattern": "q_prefix",
-                    "start_pos": match.start(),
-                    "full_text": q_text
-                })
-        
-        return questions
-    
-    def _detect_pattern3(self, text: str) -> List[Dict[str, any]]:
-        """Detect questions like: (1), (2), (3), etc."""
-        questions = []
-        pattern = r'(?:^|\n)\s*\((\d+)\)\s*([^\(\n]*?)(?=\n\s*\(\d+\)|$)'
-        
-        matches = re.finditer(pattern, text, re.MULTILINE | re.DOTALL)
-        for match in matches:
-            q_num = match.group(1)
-            q_text = match.group(2).strip()
-            
-            if len(q_text) > 5:
-                questions.append({
-                    "number": q_num,
-                    "text": q_text[:200] + "..." if len(q_text) > 200 else q_text,
-                    "pattern": "brackets",
-                    "start_pos": match.start(),
-                    "full_text": q_text
-                })
-        
-        return questions
-    
-    def _detect_pattern4(self, text: str) -> List[Dict[str, any]]:
-        """Detect questions like: Question 1, Question 2, etc."""
-        questions = []
-        pattern = r'(?:^|\n)\s*Question\s*(\d+)[\.\:\s]*([^Q\n]*?)(?=\n\s*Question\s*\d+|$)'
-        
-        matches = re.finditer(pattern, text, re.MULTILINE | re.DOTALL | re.IGNORECASE)
-        for match in matches:
-            q_num = match.group(1)
-            q_text = match.group(2).strip()
-            
-            if len(q_text) > 5:
-                questions.append({
-                    "number": q_num,
-                    "text": q_text[:200] + "..." if len(q_text) > 200 else q_text,
-                    "pattern": "question_word",
-                    "start_pos": match.start(),
-                    "full_text": q_text
-                })
-        
-        return questions
-    
-    def _detect_pattern5(self, text: str) -> List[Dict[str, any]]:
-        """Detect questions like: i., ii., iii., etc."""
-        questions = []
-        roman_numerals = ['i', 'ii', 'iii', 'iv', 'v', 'vi', 'vii', 'viii', 'ix', 'x',
-                         'xi', 'xii', 'xiii', 'xiv', 'xv', 'xvi', 'xvii', 'xviii', 'xix', 'xx']
-        
-        for idx, roman in enumerate(roman_numerals, 1):
-            pattern = rf'(?:^|\n)\s*{roman}\.\s*([^ivx\n]*?)(?=\n\s*(?:i{{1,3}}|iv|v|vi{{1,3}}|ix|x)\.|$)'
-            matches = re.finditer(pattern, text, re.MULTILINE | re.DOTALL | re.IGNORECASE)
-            
-            for match in matches:
-                q_text = match.group(1).strip()
-                
-                if len(q_text) > 5:
-                    questions.append({
-                        "number": str(idx),
-                        "text": q_text[:200] + "..." if len(q_text) > 200 else q_text,
-                        "pattern": "roman_numerals",
-                        "start_pos": match.start(),
-                        "full_text": q_text,
-                        "roman": roman
-                    })
+        if style == "roman_numerals":
+            # Keep numeral order (i, ii, iii, ...), as when each numeral was scanned separately
+            questions.sort(key=lambda q: int(q["number"]))
         
         return questions
     
@@ -275,17 +178,8 @@ class QuestionDetectionService:
         marks_patterns = []
         
         # Pattern: (5 marks), [5 marks], 5 marks, etc.
-        patterns = [
-            r'\((\d+)\s*marks?\)',
-            r'\[(\d+)\s*marks?\]',
-            r'(\d+)\s*marks?',
-            r'\((\d+)m\)',
-            r'\[(\d+)m\]',
-            r'(\d+)m\b'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in MARKS_PATTERNS:
+            matches = pattern.findall(text)
             if matches:
                 marks_patterns.extend([int(m) for m in matches])
         
@@ -335,4 +229,6 @@ class QuestionDetectionService:
         return min(1.0, sum(confidence_factors))
 
 # Global instance
-question_detection_service = QuestionDetectionService()
\ No newline at end of file
+question_detection_service = engine_registry.lazy(
+    "question_detection", QuestionDetectionService, "Question paper detection service"
+)
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Tesseract OCR Backends
+One interface over Tesseract: a persistent in-process API (tesserocr) or the pytesseract CLI wrapper
+"""
+
+import shlex
+import threading
+from abc import ABC, abstractmethod
+import logging
+from typing import Dict, List, Any, Tuple
+
+from app.core.config import settings
+
+try:
+    import pytesseract
+    HAS_PYTESSERACT = True
+except ImportError:
+    HAS_PYTESSERACT = False
+
+try:
+    import tesserocr
+    HAS_TESSEROCR = True
+except ImportError:
+    HAS_TESSEROCR = False
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+logger = logging.getLogger(__name__)
+
+# Column order of Tesseract's TSV output (image_to_data)
+TSV_COLUMNS = ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+               "left", "top", "width", "height", "conf", "text")
+
+def parse_tsv(tsv: str) -> Dict[str, List[Any]]:
+    """Tesseract TSV as a dict of columns (the shape of pytesseract's Output.DICT)"""
+    data: Dict[str, List[Any]] = {column: [] for column in TSV_COLUMNS}
+    for row in tsv.splitlines():
+        fields = row.split("\t")
+        if len(fields) < len(TSV_COLUMNS) - 1 or fields[0] == "level":
+            continue
+        fields += [""] * (len(TSV_COLUMNS) - len(fields))
+        for column, value in zip(TSV_COLUMNS, fields):
+            if column == "text":
+                data[column].append(value)
+            elif column == "conf":
+                data[column].append(float(value))
+            else:
+                data[column].append(int(value))
+    return data
+
+def parse_config(config: str) -> Tuple[str, int, int, Tuple[Tuple[str, str], ...]]:
+    """
+    (lang, oem, psm, variables) from a tesseract command line config such as '--oem 3 --psm 6 -c k=v'
+
+    Split with shlex exactly as pytesseract splits it for the CLI, so both backends
+    get the same variables; unbalanced quotes raise ValueError on both.
+    """
+    lang, oem, psm, variables = "eng", 3, 3, []
+    args = shlex.split(config)
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        value = args[i + 1] if i + 1 < len(args) else ""
+        if arg == "--oem":
+            oem = int(value)
+        elif arg == "--psm":
+            psm = int(value)
+        elif arg == "-l":
+            lang = value
+        elif arg == "--dpi":
+            variables.append(("user_defined_dpi", value))
+        elif arg == "-c" and "=" in value:
+            variables.append(tuple(value.split("=", 1)))
+        else:
+            i += 1
+            continue
+        i += 2
+    return lang, oem, psm, tuple(variables)
+
+def _as_pil(image: Any) -> Any:
+    """PIL image for in-memory hand-off (numpy arrays from OpenCV preprocessing are converted)"""
+    if hasattr(image, "mode") or not HAS_PIL:
+        return image
+    return Image.fromarray(image)
+
+class TesseractBackend(ABC):
+    """Runs Tesseract on in-memory images"""
+
+    name = "base"
+
+    @property
+    @abstractmethod
+    def available(self) -> bool:
+        """Whether the backend's Python package is installed"""
+
+    @abstractmethod
+    def version(self) -> str:
+        """Tesseract version string"""
+
+    @abstractmethod
+    def image_to_string(self, image: Any, config: str = "") -> str:
+        """Recognized text of the image"""
+
+    @abstractmethod
+    def image_to_data(self, image: Any, config: str = "") -> Dict[str, List[Any]]:
+        """Word boxes and confidences as a dict of TSV columns"""
+
+class PytesseractBackend(TesseractBackend):
+    """pytesseract: a new tesseract process (and temporary image files) for every call"""
+
+    name = "pytesseract"
+
+    @property
+    def available(self) -> bool:
+        return HAS_PYTESSERACT
+
+    def version(self) -> str:
+        return str(pytesseract.get_tesseract_version())
+
+    def image_to_string(self, image: Any, config: str = "") -> str:
+        return pytesseract.image_to_string(image, config=config)
+
+    def image_to_data(self, image: Any, config: str = "") -> Dict[str, List[Any]]:
+        return pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+
+class TesserocrBackend(TesseractBackend):
+    """
+    tesserocr: Tesseract's C++ API loaded in-process and kept alive
+
+    Each thread (and so each pool worker) keeps one initialized API per
+    config, so the language model is loaded once instead of per page, and
+    images are handed over in memory instead of through temporary files.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._apis: List[Any] = []
+
+    @property
+    def available(self) -> bool:
+        return HAS_TESSEROCR
+
+    def version(self) -> str:
+        return tesserocr.tesseract_version().splitlines()[0]
+
+    def _api(self, config: str):
+        apis = getattr(self._local, "apis", None)
+        if apis is None:
+            apis = self._local.apis = {}
+
+        api = apis.get(config)
+        if api is None:
+            lang, oem, psm, variables = parse_config(config)
+            api = tesserocr.PyTessBaseAPI(lang=lang, oem=oem, psm=psm)
+            for name, value in variables:
+                if not api.SetVariable(name, value):
+                    logger.warning(f"Tesseract rejected variable {name}")
+            apis[config] = api
+            with self._lock:
+                self._apis.append(api)
+        return api
+
+    def image_to_string(self, image: Any, config: str = "") -> str:
+        api = self._api(config)
+        api.SetImage(_as_pil(image))
+        try:
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+
+    def image_to_data(self, image: Any, config: str = "") -> Dict[str, List[Any]]:
+        api = self._api(config)
+        api.SetImage(_as_pil(image))
+        try:
+            api.Recognize()
+            return parse_tsv(api.GetTSVText(0))
+        finally:
+            api.Clear()
+
+    def close(self):
+        """Release every API created by any thread"""
+        with self._lock:
+            for api in self._apis:
+                api.End()
+            self._apis.clear()
+        self._local = threading.local()
+
+TESSERACT_BACKENDS = {
+    "tesserocr": TesserocrBackend,
+    "pytesseract": PytesseractBackend,
+}
+
+def create_tesseract_backend(name: str = "auto") -> TesseractBackend:
+    """Backend by name; "auto" prefers the persistent in-process API when tesserocr is installed"""
+    if name == "auto":
+        return TesserocrBackend() if HAS_TESSEROCR else PytesseractBackend()
+    if name not in TESSERACT_BACKENDS:
+        raise ValueError(f"Unknown Tesseract backend '{name}'. Available: auto, {', '.join(TESSERACT_BACKENDS)}")
+    return TESSERACT_BACKENDS[name]()
+
+# Global backend instance (APIs inside it are created lazily, per thread)
+tesseract_backend = create_tesseract_backend(settings.TESSERACT_BACKEND)
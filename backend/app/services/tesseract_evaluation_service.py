@@ -3,26 +3,41 @@ Tesseract OCR + Custom Parser Evaluation Service
 Cost-effective alternative to GPT-4 using open-source tools
 """
 
-import re
+import time
+import threading
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple, Union
+from dataclasses import dataclass
 from datetime import datetime
 import uuid
 import json
 from pathlib import Path
-import difflib
 
 # OCR and PDF processing
 import fitz  # PyMuPDF
+from app.services.tesseract_backend import tesseract_backend
 try:
-    import pytesseract
     from PIL import Image
-    TESSERACT_AVAILABLE = True
+    TESSERACT_AVAILABLE = tesseract_backend.available
 except ImportError:
     TESSERACT_AVAILABLE = False
+if not TESSERACT_AVAILABLE:
     print("Warning: pytesseract not available, using basic OCR fallback")
 
-import io
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.config import settings
+from app.core.engines import engine_registry, EngineUnavailable
+from app.core.executor import worker_process_context
+from app.core.uploads import open_pdf
+from app.core.metrics import record_ocr_pages
+from app.core.similarity import SimilarityKernel, similarity_kernel
+from app.core.patterns import (
+    ANSWER_MARKER, SENTENCE_SPLIT, WHITESPACE_RUN, SPACE_BEFORE_PUNCTUATION, SENTENCE_START,
+    ANSWER_LEADING_NOISE, ANSWER_TRAILING_NOISE, ANSWER_LEADING_NUMBER, NON_WORD
+)
+from app.services.ocr_cache_service import ocr_result_cache, page_fingerprint
 
 # Text processing - make NLTK optional
 try:
@@ -31,17 +46,6 @@ try:
     from nltk.tokenize import word_tokenize, sent_tokenize
     from nltk.stem import PorterStemmer
     NLTK_AVAILABLE = True
-    
-    # Try to download required NLTK data
-    try:
-        nltk.data.find('tokenizers/punkt')
-        nltk.data.find('corpora/stopwords')
-    except LookupError:
-        try:
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
-        except:
-            pass
 except ImportError:
     NLTK_AVAILABLE = False
     print("Warning: NLTK not available, using basic text processing")
@@ -50,28 +54,119 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _load_nltk_resources() -> Tuple[Any, frozenset]:
+    """Fetch missing NLTK data, then build the stemmer and stop words shared by parser and evaluator"""
+    try:
+        nltk.data.find('tokenizers/punkt')
+        nltk.data.find('corpora/stopwords')
+    except LookupError:
+        nltk.download('punkt', quiet=True)
+        nltk.download('stopwords', quiet=True)
+    return PorterStemmer(), frozenset(stopwords.words('english'))
+
+if NLTK_AVAILABLE:
+    engine_registry.register("nltk", _load_nltk_resources, "NLTK tokenizer data, stemmer and stop words")
+
+# Tesseract settings for scanned pages (also part of the OCR cache key)
+TESSERACT_PAGE_CONFIG = '--oem 3 --psm 6'
+TESSERACT_PAGE_ZOOM = 2
+
+# OCR service built once per OCR worker process (see _init_ocr_worker)
+_worker_ocr_service = None
+
+def _init_ocr_worker():
+    """Build the OCR service once per pool worker instead of once per page"""
+    global _worker_ocr_service
+    _worker_ocr_service = TesseractOCRService(parallel=False)
+
+def _ocr_pages_in_worker(pdf_source: Union[bytes, str], page_nums: List[int]) -> List[tuple]:
+    """Rasterize and OCR a share of a document's pages inside a pool worker, opening the PDF once"""
+    pdf_document = open_pdf(pdf_source)
+    try:
+        return [
+            (page_num,) + _worker_ocr_service._ocr_page_result(pdf_document.load_page(page_num), page_num + 1)
+            for page_num in page_nums
+        ]
+    finally:
+        pdf_document.close()
+
+# OCR worker processes shared by every document, started on first use (see get_ocr_pool)
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+def get_ocr_pool() -> ProcessPoolExecutor:
+    """Long-lived OCR process pool, so sheets don't each pay for process start-up"""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.OCR_MAX_WORKERS),
+                mp_context=worker_process_context(),
+                initializer=_init_ocr_worker
+            )
+        return _ocr_pool
+
+def shutdown_ocr_pool(wait: bool = True):
+    """Stop the OCR worker processes (at app shutdown, or to replace a broken pool)"""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        pool, _ocr_pool = _ocr_pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)
+
+# Evaluation service and answer key held once per batch worker (see _init_batch_worker)
+_worker_batch_service = None
+_worker_batch_key = None
+
+def _init_batch_worker(answer_key: Dict[str, str], question_marks: Dict[str, int],
+                       question_texts: Optional[Dict[str, str]], normalized_answer_key: Dict[str, str],
+                       use_ocr_cache: bool):
+    """Build one evaluation service per batch worker and keep the prepared answer key"""
+    global _worker_batch_service, _worker_batch_key
+    _worker_batch_service = TesseractEvaluationService(parallel_ocr=False)
+    _worker_batch_key = (answer_key, question_marks, question_texts, normalized_answer_key, use_ocr_cache)
+
+def _evaluate_sheet_in_worker(student_id: str, pdf_source: Union[bytes, str]) -> tuple:
+    """Evaluate a single answer sheet inside a batch worker"""
+    answer_key, question_marks, question_texts, normalized_answer_key, use_ocr_cache = _worker_batch_key
+    result = _worker_batch_service.evaluate(
+        pdf_file=pdf_source,
+        answer_key=answer_key,
+        question_marks=question_marks,
+        question_texts=question_texts,
+        use_ocr_cache=use_ocr_cache,
+        normalized_answer_key=normalized_answer_key
+    )
+    return student_id, result
+
 class TesseractOCRService:
     """Advanced OCR service using PyMuPDF with fallback (no system Tesseract required)"""
     
-    def __init__(self):
+    def __init__(self, parallel: Optional[bool] = None, max_workers: Optional[int] = None,
+                 ocr_cache=None):
         self.name = "PyMuPDF_OCR_Service"
         self.tesseract_available = TESSERACT_AVAILABLE
+        self.parallel = settings.OCR_PARALLEL_PAGES if parallel is None else parallel
+        self.max_workers = max(1, max_workers or settings.OCR_MAX_WORKERS)
+        self.ocr_cache = ocr_cache or ocr_result_cache
+        self.cache_config = f"{TESSERACT_PAGE_CONFIG} zoom={TESSERACT_PAGE_ZOOM}"
     
-    def extract_text_from_pdf(self, pdf_bytes: bytes) -> str:
-        """Extract text from PDF using PyMuPDF (works without system Tesseract)"""
+    def extract_text_from_pdf(self, pdf_source: Union[bytes, str], use_cache: bool = True) -> str:
+        """Extract text from a PDF path or bytes using PyMuPDF (works without system Tesseract)"""
         try:
-            pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
-            full_text = ""
+            pdf_document = open_pdf(pdf_source)
+            page_sections = {}
+            ocr_pages = []
             
             for page_num in range(pdf_document.page_count):
-                page = pdf_document.get_page(page_num)
+                page = pdf_document.load_page(page_num)
                 
                 # Extract digital text first
                 digital_text = page.get_text()
                 
                 if digital_text.strip():
                     # If digital text exists, use it
-                    full_text += f"\n--- Page {page_num + 1} ---\n{digital_text}"
+                    page_sections[page_num] = f"\n--- Page {page_num + 1} ---\n{digital_text}"
                     logger.info(f"Digital text extracted from page {page_num + 1}")
                 else:
                     # Try PyMuPDF's built-in OCR-like features
@@ -81,28 +176,91 @@ class TesseractOCRService:
                         extracted_text = self._extract_from_text_dict(text_dict)
                         
                         if extracted_text.strip():
-                            full_text += f"\n--- Page {page_num + 1} (PyMuPDF) ---\n{extracted_text}"
+                            page_sections[page_num] = f"\n--- Page {page_num + 1} (PyMuPDF) ---\n{extracted_text}"
+                        elif self.tesseract_available:
+                            # Rasterize later so scanned pages can be OCRed concurrently
+                            ocr_pages.append(page_num)
                         else:
-                            # If still no text, try image extraction with basic processing
-                            if self.tesseract_available:
-                                ocr_text = self._ocr_page_with_tesseract(page, page_num + 1)
-                                full_text += f"\n--- Page {page_num + 1} (OCR) ---\n{ocr_text}"
-                            else:
-                                # Fallback: indicate that this page needs manual input
-                                full_text += f"\n--- Page {page_num + 1} (Manual Input Required) ---\n[No text detected - please provide answers manually]"
+                            # Fallback: indicate that this page needs manual input
+                            page_sections[page_num] = f"\n--- Page {page_num + 1} (Manual Input Required) ---\n[No text detected - please provide answers manually]"
                                 
                         logger.info(f"Text extracted from page {page_num + 1} using fallback methods")
                     except Exception as e:
                         logger.warning(f"Text extraction failed for page {page_num + 1}: {e}")
-                        full_text += f"\n--- Page {page_num + 1} (Error) ---\n[Text extraction failed]"
+                        page_sections[page_num] = f"\n--- Page {page_num + 1} (Error) ---\n[Text extraction failed]"
+            
+            if ocr_pages:
+                for page_num, ocr_text in self._ocr_pages(pdf_document, pdf_source, ocr_pages, use_cache).items():
+                    page_sections[page_num] = f"\n--- Page {page_num + 1} (OCR) ---\n{ocr_text}"
             
             pdf_document.close()
-            return full_text
+            
+            # Reassemble in page order regardless of OCR completion order
+            return "".join(page_sections[page_num] for page_num in sorted(page_sections))
             
         except Exception as e:
             logger.error(f"PDF text extraction failed: {e}")
             return ""
     
+    def _ocr_pages(self, pdf_document, pdf_source: Union[bytes, str], page_nums: List[int],
+                   use_cache: bool = True) -> Dict[int, str]:
+        """OCR scanned pages, serving repeats from the OCR cache and the rest from a process pool"""
+        results = {}
+        fingerprints = {}
+        
+        # Cache hits skip rasterization and Tesseract entirely
+        if use_cache and self.ocr_cache.enabled:
+            for page_num in page_nums:
+                fingerprint = page_fingerprint(pdf_document.load_page(page_num))
+                cached_text = self.ocr_cache.get(fingerprint, "tesseract", self.cache_config)
+                if cached_text is not None:
+                    results[page_num] = cached_text
+                else:
+                    fingerprints[page_num] = fingerprint
+            
+            if results:
+                logger.info(f"OCR cache hit for {len(results)}/{len(page_nums)} scanned pages")
+            page_nums = [page_num for page_num in page_nums if page_num not in results]
+        
+        if not page_nums:
+            return results
+        
+        ocr_start = time.perf_counter()
+        ocr_results = self._run_ocr(pdf_document, pdf_source, page_nums)
+        record_ocr_pages("tesseract", len(page_nums), time.perf_counter() - ocr_start)
+        
+        for page_num, text, succeeded in ocr_results:
+            results[page_num] = text
+            if succeeded and page_num in fingerprints:
+                self.ocr_cache.put(fingerprints[page_num], "tesseract", self.cache_config, text)
+        
+        return results
+    
+    def _run_ocr(self, pdf_document, pdf_source: Union[bytes, str], page_nums: List[int]) -> List[tuple]:
+        """Rasterize and OCR pages, using the shared process pool when more than one page needs it"""
+        workers = min(self.max_workers, len(page_nums))
+        
+        if self.parallel and workers > 1:
+            try:
+                # One task per worker share, so each task opens the PDF once (a path is not copied like bytes)
+                pool = get_ocr_pool()
+                futures = [
+                    pool.submit(_ocr_pages_in_worker, pdf_source, page_nums[share::workers])
+                    for share in range(workers)
+                ]
+                by_page = {result[0]: result for future in futures for result in future.result()}
+                logger.info(f"OCR completed for {len(page_nums)} pages using {workers} worker processes")
+                return [by_page[page_num] for page_num in page_nums]
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    shutdown_ocr_pool(wait=False)
+                logger.warning(f"Parallel OCR failed, falling back to serial OCR: {e}")
+        
+        return [
+            (page_num,) + self._ocr_page_result(pdf_document.load_page(page_num), page_num + 1)
+            for page_num in page_nums
+        ]
+    
     def _extract_from_text_dict(self, text_dict: dict) -> str:
         """Extract text from PyMuPDF text dictionary"""
         text = ""
@@ -125,28 +283,29 @@ class TesseractOCRService:
     
     def _ocr_page_with_tesseract(self, page, page_num: int) -> str:
         """Extract text from a single page using Tesseract OCR (if available)"""
+        return self._ocr_page_result(page, page_num)[0]
+    
+    def _ocr_page_result(self, page, page_num: int) -> tuple:
+        """OCR a single page, returning (text, succeeded) so failures are never cached"""
         if not self.tesseract_available:
-            return "[Tesseract not available - manual input required]"
+            return "[Tesseract not available - manual input required]", False
             
         try:
-            # Convert page to image
-            pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x scaling for better OCR
-            img_data = pix.tobytes("png")
-            
-            # Convert to PIL Image
-            image = Image.open(io.BytesIO(img_data))
+            # Convert page to image (raw pixels, no PNG encode/decode round trip)
+            pix = page.get_pixmap(matrix=fitz.Matrix(TESSERACT_PAGE_ZOOM, TESSERACT_PAGE_ZOOM), alpha=False)  # 2x scaling for better OCR
+            image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
             
             # Preprocess image for better OCR
             image = self._preprocess_image(image)
             
             # Run Tesseract OCR
-            text = pytesseract.image_to_string(image, config='--oem 3 --psm 6')
+            text = tesseract_backend.image_to_string(image, config=TESSERACT_PAGE_CONFIG)
             
-            return text
+            return text, True
             
         except Exception as e:
             logger.error(f"OCR failed for page {page_num}: {e}")
-            return f"[OCR Error on page {page_num} - manual input required]"
+            return f"[OCR Error on page {page_num} - manual input required]", False
     
     def _preprocess_image(self, image) -> any:
         """Preprocess image for better OCR accuracy (if PIL available)"""
@@ -159,6 +318,14 @@ class TesseractOCRService:
             logger.warning(f"Image preprocessing failed: {e}")
             return image
 
+@dataclass
+class AnswerSpan:
+    """Location of one question's answer in the OCR text (text[start:end])"""
+    question: str
+    marker_start: int
+    start: int
+    end: int
+
 class CustomAnswerParser:
     """Custom parser for extracting answers from OCR text (works without NLTK)"""
     
@@ -169,9 +336,8 @@ class CustomAnswerParser:
         # Initialize NLTK components if available
         if self.nltk_available:
             try:
-                self.stemmer = PorterStemmer()
-                self.stop_words = set(stopwords.words('english'))
-            except:
+                self.stemmer, self.stop_words = engine_registry.get("nltk")
+            except EngineUnavailable:
                 self.nltk_available = False
                 self._init_fallback()
         else:
@@ -190,23 +356,66 @@ class CustomAnswerParser:
     
     def extract_answers(self, text: str, question_marks: Dict[str, int]) -> Dict[str, str]:
         """Parse OCR text to extract answers by question numbers"""
-        answers = {}
-        
-        # Clean and normalize text
-        cleaned_text = self._clean_text(text)
+        spans = self.segment_answers(text, question_marks.keys())
         
-        # Multiple patterns for question detection
-        for q_num in question_marks.keys():
-            answer = self._extract_single_answer(cleaned_text, q_num)
-            answers[q_num] = answer
+        answers = {
+            q_num: self._clean_answer(self._clean_text(text[span.start:span.end])) if span else ""
+            for q_num, span in spans.items()
+        }
             
-        logger.info(f"Parser extracted {len(answers)} answers")
+        logger.info(f"Parser extracted {sum(1 for answer in answers.values() if answer)} of {len(answers)} answers")
         return answers
     
+    def segment_answers(self, text: str, question_numbers) -> Dict[str, Optional[AnswerSpan]]:
+        """
+        Split OCR text into question-indexed answer spans in a single pass
+        
+        Every question marker is found with one scan. The first marker for each
+        requested question opens its answer, which runs until the next accepted
+        marker. Later markers repeating an already-seen number (e.g. a numbered
+        list inside an answer) stay part of the current answer. Questions with
+        no marker map to None.
+        
+        A marker in the middle of a line ("Step 2:", "the count is 3.") only
+        opens the next expected question, and only when that question has no
+        marker at a line start.
+        """
+        wanted = {self._question_key(q_num): q_num for q_num in question_numbers}
+        order = list(wanted.values())
+        spans: Dict[str, Optional[AnswerSpan]] = dict.fromkeys(order)
+        current = None
+        
+        markers = []
+        for match in ANSWER_MARKER.finditer(text):
+            number = match.group("line_number") or match.group("tagged_number") or match.group("inline_number")
+            markers.append((match, wanted.get(self._question_key(number))))
+        line_start_questions = {q_num for match, q_num in markers if match.group("line_number") is not None}
+        
+        for match, q_num in markers:
+            if q_num is None or spans[q_num] is not None:
+                continue
+            
+            if match.group("line_number") is None:
+                next_index = order.index(current.question) + 1 if current else 0
+                expected = order[next_index] if next_index < len(order) else None
+                if q_num != expected or q_num in line_start_questions:
+                    continue
+            
+            if current:
+                current.end = match.start()
+            current = spans[q_num] = AnswerSpan(q_num, match.start(), match.end(), len(text))
+        
+        return spans
+    
+    def _question_key(self, q_num: str) -> str:
+        """Compare question numbers numerically ("01" and "1" are the same question)"""
+        q_num = str(q_num).strip()
+        return str(int(q_num)) if q_num.isdigit() else q_num.lower()
+    
     def _clean_text(self, text: str) -> str:
         """Clean and normalize OCR text"""
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = WHITESPACE_RUN.sub(' ', text)
         
         # Fix common OCR errors
         text = text.replace('|', 'I')  # Common OCR mistake
@@ -217,54 +426,19 @@ class CustomAnswerParser:
         text = text.replace('1', 'l')  # In text contexts
         
         # Fix spacing around punctuation
-        text = re.sub(r'\s+([.!?])', r'\1', text)
-        text = re.sub(r'([.!?])\s*([A-Z])', r'\1 \2', text)
+        text = SPACE_BEFORE_PUNCTUATION.sub(r'\1', text)
+        text = SENTENCE_START.sub(r'\1 \2', text)
         
         return text.strip()
     
-    def _extract_single_answer(self, text: str, q_num: str) -> str:
-        """Extract answer for a specific question number"""
-        
-        # Multiple question patterns to try
-        patterns = [
-            # Standard patterns - more flexible
-            rf"(?:^|\n)\s*{q_num}[\.\)\:\s]+(.*?)(?=\n\s*(?:\d+[\.\)\:]|\Z))",
-            rf"(?:^|\n)\s*Q[\s\.]?{q_num}[\.\)\:\s]+(.*?)(?=\n\s*(?:Q[\s\.]?\d+|\Z))",
-            rf"(?:^|\n)\s*Question[\s\.]?{q_num}[\.\)\:\s]+(.*?)(?=\n\s*(?:Question[\s\.]?\d+|\Z))",
-            
-            # More flexible patterns with answer keywords
-            rf"(?:^|\n)\s*{q_num}[\.\)\:\s]+.*?(?:ans|answer|solution)[\:\.\s]*(.*?)(?=\n\s*\d+[\.\)\:]|\Z)",
-            rf"(?:^|\n)[^\w]*{q_num}[^\w]+(.*?)(?=\n[^\w]*\d+[^\w]|\Z)",
-            
-            # Pattern for handwritten/OCR text with common errors
-            rf"(?:^|\n)\s*[O0]?{q_num}[\.\)\:\s]+(.*?)(?=\n\s*(?:[O0]?\d+[\.\)\:]|\Z))",
-        ]
-        
-        for pattern in patterns:
-            try:
-                match = re.search(pattern, text, re.DOTALL | re.IGNORECASE | re.MULTILINE)
-                if match:
-                    answer = match.group(1).strip()
-                    if answer and len(answer) > 3:  # Minimum answer length
-                        # Clean up the extracted answer
-                        answer = self._clean_answer(answer)
-                        if answer:
-                            return answer
-            except Exception as e:
-                logger.warning(f"Pattern matching failed for Q{q_num}: {e}")
-                continue
-        
-        # If no pattern matches, try alternative extraction
-        return self._fallback_extraction(text, q_num)
-    
     def _clean_answer(self, answer: str) -> str:
         """Clean extracted answer text"""
         # Remove leading/trailing punctuation and whitespace
-        answer = re.sub(r'^[\s\.\-\:\)]+', '', answer)
-        answer = re.sub(r'[\s\.\-\:]+$', '', answer)
+        answer = ANSWER_LEADING_NOISE.sub('', answer)
+        answer = ANSWER_TRAILING_NOISE.sub('', answer)
         
         # Remove question numbers from the beginning of answers
-        answer = re.sub(r'^\d+[\.\)\:\s]+', '', answer)
+        answer = ANSWER_LEADING_NUMBER.sub('', answer)
         
         # Limit answer length (prevent extracting multiple questions)
         if self.nltk_available:
@@ -286,48 +460,24 @@ class CustomAnswerParser:
             return []
         
         # Split on sentence endings
-        import re
-        sentences = re.split(r'[.!?]+', text)
+        sentences = SENTENCE_SPLIT.split(text)
         # Clean up and filter empty sentences
         sentences = [s.strip() for s in sentences if s.strip()]
         return sentences
-    
-    def _fallback_extraction(self, text: str, q_num: str) -> str:
-        """Fallback method when standard patterns fail"""
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines):
-            # Look for question number in line
-            if re.search(rf'\b{q_num}\b', line):
-                # Extract text from this line and next few lines
-                answer_lines = []
-                for j in range(i, min(i + 5, len(lines))):
-                    if j > i and re.search(r'\b\d+\b', lines[j]) and not answer_lines:
-                        # Stop if we hit another question number
-                        break
-                    answer_lines.append(lines[j])
-                
-                if answer_lines:
-                    answer = ' '.join(answer_lines)
-                    # Remove the question number part
-                    answer = re.sub(rf'\b{q_num}[\.\)\:\s]*', '', answer, count=1)
-                    return self._clean_answer(answer)
-        
-        return ""
 
 class IntelligentEvaluator:
     """Custom evaluation engine using text similarity and keyword matching (works without NLTK)"""
     
-    def __init__(self):
+    def __init__(self, similarity: Optional[SimilarityKernel] = None):
         self.name = "Intelligent_Evaluator"
         self.nltk_available = NLTK_AVAILABLE
+        self.similarity_kernel = similarity or similarity_kernel
         
         # Initialize NLTK components if available
         if self.nltk_available:
             try:
-                self.stemmer = PorterStemmer()
-                self.stop_words = set(stopwords.words('english'))
-            except:
+                self.stemmer, self.stop_words = engine_registry.get("nltk")
+            except EngineUnavailable:
                 self.nltk_available = False
                 self._init_fallback()
         else:
@@ -345,15 +495,17 @@ class IntelligentEvaluator:
         }
     
     def evaluate_answer(self, question_num: str, student_answer: str, model_answer: str, 
-                       question_context: str, max_marks: int) -> Dict[str, Any]:
+                       question_context: str, max_marks: int,
+                       model_normalized: Optional[str] = None) -> Dict[str, Any]:
         """Evaluate student answer using intelligent text analysis"""
         
         if not student_answer.strip():
             return self._empty_answer_result(max_marks)
         
-        # Normalize texts
+        # Normalize texts (the model answer may already be normalized for a batch)
         student_normalized = self._normalize_text(student_answer)
-        model_normalized = self._normalize_text(model_answer)
+        if model_normalized is None:
+            model_normalized = self._normalize_text(model_answer)
         
         # Calculate similarity scores
         similarity_score = self._calculate_similarity(student_normalized, model_normalized)
@@ -404,9 +556,8 @@ class IntelligentEvaluator:
         text = text.lower()
         
         # Remove punctuation and extra whitespace
-        import re
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text)
+        text = NON_WORD.sub(' ', text)
+        text = WHITESPACE_RUN.sub(' ', text)
         
         # Tokenize and remove stop words
         if self.nltk_available:
@@ -424,8 +575,8 @@ class IntelligentEvaluator:
         return ' '.join(words)
     
     def _calculate_similarity(self, student_text: str, model_text: str) -> float:
-        """Calculate text similarity using difflib"""
-        return difflib.SequenceMatcher(None, student_text, model_text).ratio()
+        """Calculate text similarity with the configured similarity kernel"""
+        return self.similarity_kernel.similarity(student_text, model_text)
     
     def _calculate_keyword_match(self, student_text: str, model_text: str) -> float:
         """Calculate keyword matching score"""
@@ -564,14 +715,82 @@ class IntelligentEvaluator:
 class TesseractEvaluationService:
     """Main service combining Tesseract OCR and custom evaluation"""
     
-    def __init__(self):
-        self.ocr_service = TesseractOCRService()
+    def __init__(self, parallel_ocr: Optional[bool] = None):
+        self.ocr_service = TesseractOCRService(parallel=parallel_ocr)
         self.parser = CustomAnswerParser()
         self.evaluator = IntelligentEvaluator()
     
-    def evaluate(self, pdf_file: Optional[bytes], answer_key: Dict[str, str], 
+    def prepare_answer_key(self, answer_key: Dict[str, str]) -> Dict[str, str]:
+        """Normalize every model answer once so a batch does not redo it per student"""
+        return {
+            question_num: self.evaluator._normalize_text(model_answer)
+            for question_num, model_answer in answer_key.items()
+        }
+    
+    def evaluate_batch(self, answer_sheets: List[Tuple[str, Union[bytes, str]]], answer_key: Dict[str, str],
+                       question_marks: Dict[str, int], question_texts: Optional[Dict[str, str]] = None,
+                       use_ocr_cache: bool = True, max_workers: Optional[int] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Evaluate many answer sheets against one answer key
+        
+        Each sheet is a PDF path or bytes. Sheets are fanned out over a process
+        pool and (student_id, result) pairs are yielded as each sheet finishes,
+        not in submission order.
+        """
+        normalized_answer_key = self.prepare_answer_key(answer_key)
+        workers = min(max(1, max_workers or settings.EVALUATION_BATCH_WORKERS), len(answer_sheets))
+        finished = set()
+        
+        if workers > 1:
+            try:
+                pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=worker_process_context(),
+                    initializer=_init_batch_worker,
+                    initargs=(answer_key, question_marks, question_texts, normalized_answer_key, use_ocr_cache)
+                )
+                # Not a with block: its exit waits for every queued sheet, even after the consumer has gone
+                drained = False
+                try:
+                    futures = {
+                        pool.submit(_evaluate_sheet_in_worker, student_id, pdf_source): student_id
+                        for student_id, pdf_source in answer_sheets
+                    }
+                    logger.info(f"Batch evaluation of {len(futures)} sheets using {workers} worker processes")
+                    
+                    for future in as_completed(futures):
+                        student_id = futures[future]
+                        try:
+                            result = future.result()[1]
+                        except Exception as e:
+                            logger.error(f"Batch evaluation failed for {student_id}: {e}")
+                            result = {"error": f"Tesseract evaluation failed: {str(e)}", "status": "failed"}
+                        finished.add(student_id)
+                        yield student_id, result
+                    drained = True
+                finally:
+                    # Closed early (e.g. the client disconnected): drop the sheets nobody will read
+                    pool.shutdown(wait=drained, cancel_futures=not drained)
+                return
+            except Exception as e:
+                logger.warning(f"Batch worker pool unavailable, evaluating sheets serially: {e}")
+        
+        for student_id, pdf_source in answer_sheets:
+            if student_id in finished:
+                continue
+            yield student_id, self.evaluate(
+                pdf_file=pdf_source,
+                answer_key=answer_key,
+                question_marks=question_marks,
+                question_texts=question_texts,
+                use_ocr_cache=use_ocr_cache,
+                normalized_answer_key=normalized_answer_key
+            )
+    
+    def evaluate(self, pdf_file: Optional[Union[bytes, str]], answer_key: Dict[str, str], 
                 question_marks: Dict[str, int], question_texts: Optional[Dict[str, str]] = None,
-                manual_answers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+                manual_answers: Optional[Dict[str, str]] = None, use_ocr_cache: bool = True,
+                normalized_answer_key: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Complete evaluation using Tesseract OCR and custom parser"""
         
         start_time = datetime.now()
@@ -584,7 +803,7 @@ class TesseractEvaluationService:
             # Step 1: Extract text using Tesseract OCR
             if pdf_file:
                 processing_logs.append(f"[{datetime.now()}] Starting Tesseract OCR extraction")
-                raw_text = self.ocr_service.extract_text_from_pdf(pdf_file)
+                raw_text = self.ocr_service.extract_text_from_pdf(pdf_file, use_cache=use_ocr_cache)
                 
                 # Step 2: Parse answers from extracted text
                 processing_logs.append(f"[{datetime.now()}] Parsing answers from OCR text")
@@ -607,7 +826,8 @@ class TesseractEvaluationService:
                 # Evaluate using custom evaluator
                 evaluation = self.evaluator.evaluate_answer(
                     question_num, student_answer, expected_answer, 
-                    question_context, max_marks
+                    question_context, max_marks,
+                    model_normalized=normalized_answer_key.get(question_num) if normalized_answer_key else None
                 )
                 
                 # Format result
@@ -678,7 +898,8 @@ class TesseractEvaluationService:
                     "processing_logs": processing_logs,
                     "errors": errors,
                     "api_version": "6.0-tesseract-parser",
-                    "cost": "Free - No API costs"
+                    "cost": "Free - No API costs",
+                    "cache_policy": "ocr_page_cache" if use_ocr_cache and self.ocr_service.ocr_cache.enabled else "no_cache_fresh_processing_only"
                 }
             }
             
@@ -699,5 +920,7 @@ class TesseractEvaluationService:
                 "errors": errors
             }
 
-# Global service instance
-tesseract_evaluation_service = TesseractEvaluationService()
\ No newline at end of file
+# Global service instance, built on first use
+tesseract_evaluation_service = engine_registry.lazy(
+    "tesseract_evaluation", TesseractEvaluationService, "Tesseract OCR + custom parser evaluation service"
+)
\ No newline at end of file
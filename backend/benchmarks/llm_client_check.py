@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Offline LLM client check
+
+Runs AsyncLLMClient against the stub server and verifies that requests stay
+within the concurrency limit (also across event loops in separate threads)
+and token-bucket rate, that batched evaluation
+packs LLM_BATCH_SIZE questions per request, and that answer extraction goes
+through the same client. Nothing leaves the machine; exits non-zero on failure.
+
+    cd backend
+    python -m benchmarks.llm_client_check
+    python -m benchmarks.llm_client_check --requests 20 --rate 20 --burst 4 --concurrency 3
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import threading
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.llm_stub_server import StubLLMServer
+
+RATE_TOLERANCE = 0.02  # seconds of timer slack allowed per request
+
+def check_rate_and_concurrency(stub: StubLLMServer, requests: int, rate: float, burst: int,
+                               concurrency: int) -> List[str]:
+    from app.services.llm_client import AsyncLLMClient, TokenBucket
+
+    async def send_all():
+        async with AsyncLLMClient(max_concurrency=concurrency, rate_limiter=TokenBucket(rate, burst)) as llm:
+            messages = [{"role": "user", "content": "ping"}]
+            await asyncio.gather(*[llm.chat(messages, model="stub") for _ in range(requests)])
+
+    stub.reset()
+    start = time.monotonic()
+    asyncio.run(send_all())
+    elapsed = time.monotonic() - start
+
+    failures = []
+    if len(stub.request_times) != requests:
+        failures.append(f"expected {requests} requests, stub saw {len(stub.request_times)}")
+    if stub.max_in_flight > concurrency:
+        failures.append(f"{stub.max_in_flight} requests in flight, limit is {concurrency}")
+    # The bucket starts full: request k may not be sent before (k - burst + 1) / rate
+    for k, arrived in enumerate(sorted(stub.request_times)):
+        earliest = max(0, k - burst + 1) / rate
+        if arrived - start < earliest - RATE_TOLERANCE:
+            failures.append(f"request {k + 1} sent after {arrived - start:.3f}s, rate allows {earliest:.3f}s")
+            break
+    print(f"rate limit: {requests} requests in {elapsed:.2f}s "
+          f"(rate {rate}/s, burst {burst}), max {stub.max_in_flight} in flight (limit {concurrency})")
+    return failures
+
+def check_shared_concurrency(stub: StubLLMServer, threads: int, requests: int, concurrency: int) -> List[str]:
+    from app.services.llm_client import AsyncLLMClient
+
+    async def send_all():
+        # A client per call, as the evaluators create them; the limit is process-wide
+        async with AsyncLLMClient() as llm:
+            messages = [{"role": "user", "content": "ping"}]
+            await asyncio.gather(*[llm.chat(messages, model="stub") for _ in range(requests)])
+
+    stub.reset()
+    workers = [threading.Thread(target=asyncio.run, args=(send_all(),)) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    failures = []
+    if len(stub.request_times) != threads * requests:
+        failures.append(f"expected {threads * requests} requests, stub saw {len(stub.request_times)}")
+    if stub.max_in_flight > concurrency:
+        failures.append(f"{stub.max_in_flight} requests in flight across {threads} event loops, limit is {concurrency}")
+    print(f"shared limit: {threads} event loops x {requests} requests, "
+          f"max {stub.max_in_flight} in flight (limit {concurrency})")
+    return failures
+
+def check_batched_evaluation(stub: StubLLMServer, questions: int, batch_size: int) -> List[str]:
+    from app.langgraph.ai_powered_evaluation_workflow import AIIntelligentEvaluator
+
+    batch = [
+        {
+            "question_num": str(i),
+            "student_answer": f"Student answer {i}",
+            "model_answer": f"Model answer {i}",
+            "question_context": f"Question {i}",
+            "max_marks": 4
+        }
+        for i in range(1, questions + 1)
+    ]
+    stub.reset()
+    evaluations = AIIntelligentEvaluator(batch_size=batch_size).evaluate_questions(batch)
+
+    failures = []
+    expected_requests = -(-questions // batch_size)
+    if len(stub.request_times) != expected_requests:
+        failures.append(f"expected {expected_requests} evaluation requests, stub saw {len(stub.request_times)}")
+    stubbed = [q for q, e in evaluations.items() if e.get("detailed_feedback") == "Stub evaluation"]
+    if len(stubbed) != questions:
+        failures.append(f"{questions - len(stubbed)} of {questions} questions fell back instead of using the reply")
+    print(f"batching: {questions} questions in {len(stub.request_times)} requests (batch size {batch_size})")
+    return failures
+
+def check_answer_extraction(stub: StubLLMServer) -> List[str]:
+    from app.langgraph.ai_powered_evaluation_workflow import AITextExtractionAgent
+
+    stub.reset()
+    answers = AITextExtractionAgent().ai_extract_answers("1. First\n2. Second", {"1": 2, "2": 3})
+
+    failures = []
+    if len(stub.request_times) != 1:
+        failures.append(f"expected 1 extraction request, stub saw {len(stub.request_times)}")
+    if answers != {"1": "Stub answer 1", "2": "Stub answer 2"}:
+        failures.append(f"extraction did not use the stub reply: {answers}")
+    print(f"extraction: {len(answers)} answers from {len(stub.request_times)} request")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Check AsyncLLMClient against the offline stub server")
+    parser.add_argument("--requests", type=int, default=12)
+    parser.add_argument("--rate", type=float, default=10.0, help="token-bucket rate (requests per second)")
+    parser.add_argument("--burst", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=3, help="event loops sharing the process-wide limit")
+    parser.add_argument("--delay", type=float, default=0.05, help="seconds the stub holds each request")
+    parser.add_argument("--questions", type=int, default=7)
+    parser.add_argument("--batch-size", type=int, default=3)
+    args = parser.parse_args()
+    if args.rate <= 0:
+        parser.error("--rate must be positive (0 disables the limiter, leaving nothing to check)")
+
+    logging.basicConfig(level=logging.WARNING)
+    with StubLLMServer(delay=args.delay) as stub:
+        # Settings are read at import time, so point them at the stub before importing the client
+        os.environ.update({
+            "OPENAI_BASE_URL": stub.base_url,
+            "OPENAI_API_KEY": "sk-stub",
+            "LLM_CACHE_ENABLED": "false",
+            "LLM_MAX_RETRIES": "0",
+            "LLM_MAX_CONCURRENCY": str(args.concurrency),
+            "LLM_RATE_LIMIT_RPS": "0"
+        })
+        failures = check_rate_and_concurrency(stub, args.requests, args.rate, args.burst, args.concurrency)
+        failures += check_shared_concurrency(stub, args.threads, args.requests, args.concurrency)
+        failures += check_batched_evaluation(stub, args.questions, args.batch_size)
+        failures += check_answer_extraction(stub)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("OK" if not failures else f"{len(failures)} check(s) failed")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
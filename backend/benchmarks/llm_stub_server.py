@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible stub server
+
+Answers /v1/chat/completions with deterministic JSON shaped like the replies
+the evaluation prompts ask for, so the LLM paths can run offline:
+
+    cd backend
+    python -m benchmarks.llm_stub_server --port 8765 --delay 0.2
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=sk-stub python main.py
+
+The server records when each request arrived and how many were in flight at
+once, which llm_client_check uses to verify batching and rate limiting.
+"""
+
+import ast
+import re
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional
+
+EXPECTED_QUESTIONS = re.compile(r"EXPECTED QUESTIONS:\s*(\[.*?\])")
+QUESTION_BLOCK = re.compile(r"QUESTION NUMBER:\s*(\S+).*?MAXIMUM MARKS:\s*([\d.]+)", re.DOTALL)
+
+def stub_reply(prompt: str) -> str:
+    """Reply to an extraction or (batched) evaluation prompt; anything else gets an empty object"""
+    expected = EXPECTED_QUESTIONS.search(prompt)
+    if expected:
+        return json.dumps({str(q): f"Stub answer {q}" for q in ast.literal_eval(expected.group(1))})
+
+    evaluations = [
+        {
+            "question_number": q_num,
+            "marks_obtained": float(max_marks) / 2,
+            "conceptual_understanding": 0.5,
+            "factual_accuracy": 0.5,
+            "completeness": 0.5,
+            "clarity_expression": 0.5,
+            "overall_score": 0.5,
+            "detailed_feedback": "Stub evaluation",
+            "strengths": [],
+            "areas_for_improvement": [],
+            "is_attempted": True
+        }
+        for q_num, max_marks in QUESTION_BLOCK.findall(prompt)
+    ]
+    if len(evaluations) == 1:
+        evaluations[0].pop("question_number")
+        return json.dumps(evaluations[0])
+    return json.dumps(evaluations) if evaluations else "{}"
+
+class StubLLMServer:
+    """Threaded stub on 127.0.0.1 (port 0 picks a free port); use as a context manager"""
+
+    def __init__(self, port: int = 0, delay: float = 0.0):
+        self.delay = delay
+        self.request_times: List[float] = []
+        self.prompts: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                content = stub.handle(body)
+                payload = json.dumps({
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                try:
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client cancelled the request
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def handle(self, body: Dict[str, Any]) -> str:
+        """Record the request, hold it for the configured delay and build the reply"""
+        prompt = "\n".join(m.get("content", "") for m in body.get("messages", []) if m.get("role") == "user")
+        with self._lock:
+            self.request_times.append(time.monotonic())
+            self.prompts.append(prompt)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            return stub_reply(prompt)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def reset(self):
+        with self._lock:
+            self.request_times.clear()
+            self.prompts.clear()
+            self.max_in_flight = self.in_flight
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve an OpenAI-compatible stub for offline LLM runs")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to hold each request")
+    args = parser.parse_args()
+
+    server = StubLLMServer(args.port, args.delay)
+    print(f"Stub LLM server on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Evaluation pipeline benchmark
+
+Runs LangGraphEvaluationWorkflow.run_workflow, TesseractEvaluationService.evaluate
+and AIWorkflowManager.evaluate on synthetic answer sheets and reports p50/p95
+latency per stage (extract, detect, validate, score, aggregate) and memory
+high-water marks.
+
+    cd backend
+    python -m benchmarks.pipeline_benchmark
+    python -m benchmarks.pipeline_benchmark --pipelines tesseract --pages 4 --questions 20 --runs 20
+    python -m benchmarks.pipeline_benchmark --compare benchmarks/results/pipeline-20240101-120000.json
+
+Results are saved as JSON (benchmarks/results/ by default); --compare prints
+the p50 change against an earlier results file. OCR and LLM caches are
+disabled unless --with-cache is given, and the AI pipeline runs in demo mode
+unless --live-llm is given (live mode calls the OpenAI API on every run).
+Rasterized sheets are skipped for pipelines with no working OCR engine, and a
+run that extracts no answers counts as failed.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import resource
+import functools
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic_sheets import SyntheticExam, generate_exam, build_answer_sheet_pdf
+
+STAGES = ["extract", "detect", "validate", "score", "aggregate"]
+PIPELINES = ["langgraph", "tesseract", "ai"]
+SHEET_KINDS = ["digital", "rasterized"]
+DEMO_LLM_BASE_URL = "http://127.0.0.1:9/v1"  # discard port: connections are refused immediately
+
+class StageRecorder:
+    """Accumulates time (and, when tracing, peak allocated memory) per stage for one run"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, trace_memory: bool = False):
+        self.durations: Dict[str, float] = {}
+        self.memory_peaks: Dict[str, int] = {}
+        self.run_peak = 0
+        self.trace_memory = trace_memory
+
+    def traced_peak(self) -> int:
+        """Peak traced memory of the whole run so far (stages reset tracemalloc's own peak)"""
+        self.run_peak = max(self.run_peak, tracemalloc.get_traced_memory()[1])
+        return self.run_peak
+
+    @contextmanager
+    def measure(self, stage: str):
+        if self.trace_memory:
+            self.traced_peak()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[stage] = self.durations.get(stage, 0.0) + time.perf_counter() - start
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                self.memory_peaks[stage] = max(self.memory_peaks.get(stage, 0), peak - baseline)
+                self.traced_peak()
+
+    def wrap(self, function: Callable, stage: str) -> Callable:
+        """Time every call of a sync or async function under a stage"""
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def timed_async(*args, **kwargs):
+                with self.measure(stage):
+                    return await function(*args, **kwargs)
+            return timed_async
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            with self.measure(stage):
+                return function(*args, **kwargs)
+        return timed
+
+@contextmanager
+def instrument(recorder: StageRecorder, hooks: List[Tuple[Any, str, str]]):
+    """Temporarily replace (target, attribute) callables with stage-timed wrappers"""
+    originals = []
+    try:
+        for target, attribute, stage in hooks:
+            original = getattr(target, attribute)
+            originals.append((target, attribute, target.__dict__.get(attribute, None)))
+            setattr(target, attribute, recorder.wrap(original, stage))
+        yield
+    finally:
+        for target, attribute, original in reversed(originals):
+            if original is None:
+                delattr(target, attribute)
+            else:
+                setattr(target, attribute, original)
+
+class PipelineRunner:
+    """A pipeline under benchmark: how to call it and which methods make up each stage"""
+
+    name = ""
+    # Stage that absorbs time not covered by a hook (None: reported as "other")
+    remainder_stage: Optional[str] = None
+    # OCR engines that can read rasterized sheets for this pipeline (any one of them is enough)
+    ocr_engines: Tuple[str, ...] = ("tesseract",)
+
+    def hooks(self) -> List[Tuple[Any, str, str]]:
+        raise NotImplementedError
+
+    def run(self, loop: asyncio.AbstractEventLoop, exam: SyntheticExam, pdf_path: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def succeeded(self, result: Dict[str, Any], exam: SyntheticExam) -> bool:
+        """A run counts only if it returned without error and found answers when the student wrote some"""
+        if not result or "error" in result:
+            return False
+        answered = result.get("evaluation_summary", {}).get("answered_questions", 0)
+        return answered > 0 or not exam.student_answers
+
+class LangGraphRunner(PipelineRunner):
+    name = "langgraph"
+    ocr_engines = ("tesseract", "easyocr")
+
+    def __init__(self):
+        from app.langgraph.advanced_evaluation_workflow import LangGraphEvaluationWorkflow
+        self.workflow = LangGraphEvaluationWorkflow()
+
+    def hooks(self):
+        workflow = self.workflow
+        return [
+            (workflow.pdf_scanner, "scan_pdf", "extract"),
+            (workflow.question_detector, "detect_questions", "detect"),
+            (workflow.answer_validator, "validate_answers", "validate"),
+            (workflow.semantic_evaluator, "evaluate_answers", "score"),
+            (workflow.result_aggregator, "aggregate_results", "aggregate"),
+        ]
+
+    def run(self, loop, exam, pdf_path):
+        return loop.run_until_complete(
+            self.workflow.run_workflow(pdf_path, exam.answer_key, exam.question_marks)
+        )
+
+    def succeeded(self, result, exam):
+        return result.get("success", False) and super().succeeded(result, exam)
+
+class TesseractRunner(PipelineRunner):
+    name = "tesseract"
+    remainder_stage = "aggregate"
+
+    def __init__(self, use_cache: bool):
+        from app.services.tesseract_evaluation_service import TesseractEvaluationService
+        self.service = TesseractEvaluationService()
+        self.use_cache = use_cache
+
+    def hooks(self):
+        service = self.service
+        return [
+            (service.ocr_service, "extract_text_from_pdf", "extract"),
+            (service.parser, "extract_answers", "detect"),
+            (service.evaluator, "evaluate_answer", "score"),
+        ]
+
+    def run(self, loop, exam, pdf_path):
+        return self.service.evaluate(
+            pdf_file=pdf_path,
+            answer_key=exam.answer_key,
+            question_marks=exam.question_marks,
+            question_texts=exam.question_texts,
+            use_ocr_cache=self.use_cache
+        )
+
+class AIWorkflowRunner(PipelineRunner):
+    name = "ai"
+    remainder_stage = "aggregate"
+
+    def __init__(self, use_cache: bool):
+        from app.langgraph import ai_powered_evaluation_workflow as workflow_module
+        self.module = workflow_module
+        self.manager = workflow_module.AIWorkflowManager()
+        self.use_cache = use_cache
+
+    def hooks(self):
+        # The agents are created inside the compiled graph, so their classes are instrumented
+        return [
+            (self.module.AITextExtractionAgent, "extract_text_from_pdf", "extract"),
+            (self.module.AITextExtractionAgent, "ai_extract_answers", "detect"),
+            (self.module.AIIntelligentEvaluator, "evaluate_questions", "score"),
+        ]
+
+    def run(self, loop, exam, pdf_path):
+        return self.manager.evaluate(
+            pdf_file=pdf_path,
+            answer_key=exam.answer_key,
+            question_marks=exam.question_marks,
+            question_texts=exam.question_texts,
+            use_ocr_cache=self.use_cache
+        )
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Linear-interpolated percentile of a non-empty list"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    milliseconds = [value * 1000 for value in seconds]
+    return {
+        "p50_ms": round(percentile(milliseconds, 0.50), 3),
+        "p95_ms": round(percentile(milliseconds, 0.95), 3),
+        "mean_ms": round(statistics.fmean(milliseconds), 3),
+        "max_ms": round(max(milliseconds), 3),
+    }
+
+def max_rss_bytes() -> int:
+    """Process resident-set high-water mark (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if platform.system() == "Darwin" else rss * 1024
+
+def benchmark_pipeline(runner: PipelineRunner, exam: SyntheticExam, pdf_path: str,
+                       runs: int, warmup: int) -> Dict[str, Any]:
+    """Time `runs` evaluations of one sheet, then trace one more for memory"""
+    recorder = StageRecorder()
+    loop = asyncio.new_event_loop()
+    totals: List[float] = []
+    stage_samples: Dict[str, List[float]] = {}
+    failures = 0
+
+    try:
+        with instrument(recorder, runner.hooks()):
+            for iteration in range(warmup + runs):
+                recorder.reset()
+                start = time.perf_counter()
+                result = runner.run(loop, exam, pdf_path)
+                total = time.perf_counter() - start
+                if iteration < warmup:
+                    continue
+
+                failures += not runner.succeeded(result, exam)
+                totals.append(total)
+                remainder = total - sum(recorder.durations.values())
+                durations = dict(recorder.durations)
+                remainder_stage = runner.remainder_stage or "other"
+                durations[remainder_stage] = durations.get(remainder_stage, 0.0) + max(remainder, 0.0)
+                for stage, seconds in durations.items():
+                    stage_samples.setdefault(stage, []).append(seconds)
+
+            # Memory pass: tracemalloc slows Python code down, so it is kept out of the timed runs
+            recorder.reset(trace_memory=True)
+            tracemalloc.start()
+            try:
+                runner.run(loop, exam, pdf_path)
+                peak = recorder.traced_peak()
+            finally:
+                tracemalloc.stop()
+    finally:
+        loop.close()
+
+    ordered_stages = [stage for stage in STAGES + ["other"] if stage in stage_samples]
+    return {
+        "runs": runs,
+        "failures": failures,
+        "total": latency_summary(totals),
+        "stages": {stage: latency_summary(stage_samples[stage]) for stage in ordered_stages},
+        "memory": {
+            "python_peak_bytes": peak,
+            "stage_peak_bytes": {stage: recorder.memory_peaks[stage]
+                                 for stage in STAGES if stage in recorder.memory_peaks},
+            "max_rss_bytes": max_rss_bytes(),
+        },
+    }
+
+def missing_ocr_engine(runner: PipelineRunner) -> Optional[str]:
+    """Why rasterized sheets cannot be read by this pipeline here, or None when one of its OCR engines loads"""
+    from app.core.engines import engine_registry, EngineUnavailable
+    import app.services.advanced_pdf_ocr_service  # noqa: F401 - registers the OCR engines that are installed
+
+    errors = []
+    for engine in runner.ocr_engines:
+        if engine not in engine_registry.names():
+            errors.append(f"{engine} not installed")
+            continue
+        try:
+            engine_registry.get(engine)
+            return None
+        except EngineUnavailable as e:
+            errors.append(str(e))
+    return "no OCR engine available (" + "; ".join(errors) + ")"
+
+def create_runner(name: str, use_cache: bool) -> PipelineRunner:
+    if name == "langgraph":
+        return LangGraphRunner()
+    if name == "tesseract":
+        return TesseractRunner(use_cache)
+    if name == "ai":
+        return AIWorkflowRunner(use_cache)
+    raise ValueError(f"Unknown pipeline: {name}")
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def format_bytes(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MiB" if size >= 1024 * 1024 else f"{size / 1024:.1f} KiB"
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    """Print p50/p95 per stage, with the p50 change against a baseline report when given"""
+    for key, case in report["results"].items():
+        print(f"\n{key}" + (f"  [{case['failures']}/{case['runs']} runs failed]" if case.get("failures") else ""))
+        if "skipped" in case:
+            print(f"  skipped: {case['skipped']}")
+            continue
+
+        base_case = (baseline or {}).get("results", {}).get(key, {})
+        rows = [("total", case["total"], base_case.get("total"))]
+        rows += [(stage, summary, base_case.get("stages", {}).get(stage))
+                 for stage, summary in case["stages"].items()]
+        for stage, summary, base in rows:
+            line = f"  {stage:<10} p50 {summary['p50_ms']:>10.2f} ms   p95 {summary['p95_ms']:>10.2f} ms"
+            if base and base.get("p50_ms"):
+                change = (summary["p50_ms"] - base["p50_ms"]) / base["p50_ms"] * 100
+                line += f"   p50 {change:+.1f}% vs baseline"
+            print(line)
+
+        memory = case["memory"]
+        print(f"  memory     python peak {format_bytes(memory['python_peak_bytes'])}, "
+              f"max RSS {format_bytes(memory['max_rss_bytes'])}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the evaluation pipelines on synthetic answer sheets")
+    parser.add_argument("--pipelines", default=",".join(PIPELINES), help="comma-separated: " + ", ".join(PIPELINES))
+    parser.add_argument("--kinds", default=",".join(SHEET_KINDS), help="comma-separated: " + ", ".join(SHEET_KINDS))
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--dpi", type=int, default=150, help="resolution of rasterized sheets")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--with-cache", action="store_true", help="keep OCR and LLM caches enabled")
+    parser.add_argument("--live-llm", action="store_true", help="call the configured LLM instead of demo mode")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/pipeline-<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--verbose", action="store_true", help="keep the pipelines' INFO logging")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure them before importing the pipelines
+    if not args.with_cache:
+        os.environ["OCR_CACHE_ENABLED"] = "false"
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+    if not args.live_llm:
+        os.environ["OPENAI_API_KEY"] = "sk-demo-key-for-testing"
+        # Answer extraction always calls the API; fail at once (no retry backoff, nothing
+        # leaves the machine) so demo runs time the fallback extraction instead
+        os.environ["OPENAI_BASE_URL"] = DEMO_LLM_BASE_URL
+        os.environ["LLM_MAX_RETRIES"] = "0"
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    pipelines = [name.strip() for name in args.pipelines.split(",") if name.strip()]
+    kinds = [kind.strip() for kind in args.kinds.split(",") if kind.strip()]
+    exam = generate_exam(args.questions, seed=args.seed)
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "pages": args.pages, "questions": args.questions, "runs": args.runs, "warmup": args.warmup,
+            "dpi": args.dpi, "seed": args.seed, "with_cache": args.with_cache, "live_llm": args.live_llm,
+        },
+        "results": {},
+    }
+
+    runners: Dict[str, Any] = {}
+    for name in pipelines:
+        try:
+            runners[name] = create_runner(name, args.with_cache)
+        except Exception as e:
+            runners[name] = e
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory(prefix="evalmate_bench_") as directory:
+        for kind in kinds:
+            pdf_path = os.path.join(directory, f"{kind}.pdf")
+            with open(pdf_path, "wb") as f:
+                f.write(build_answer_sheet_pdf(exam, pages=args.pages, rasterized=kind == "rasterized", dpi=args.dpi))
+
+            for name, runner in runners.items():
+                key = f"{name}/{kind}"
+                if isinstance(runner, Exception):
+                    report["results"][key] = {"skipped": f"{type(runner).__name__}: {runner}"}
+                    continue
+                # Without OCR every page of a rasterized sheet fails, and only the error path would be timed
+                reason = missing_ocr_engine(runner) if kind == "rasterized" else None
+                if reason:
+                    report["results"][key] = {"skipped": reason}
+                    continue
+                print(f"Benchmarking {key} ({args.runs} runs)...", file=sys.stderr)
+                report["results"][key] = benchmark_pipeline(runner, exam, pdf_path, args.runs, args.warmup)
+
+    print_report(report, baseline)
+
+    output = args.output or os.path.join(
+        BACKEND_DIR, "benchmarks", "results", f"pipeline-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {output}")
+
+if __name__ == "__main__":
+    main()
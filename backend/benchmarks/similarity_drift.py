@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Similarity kernel drift benchmark
+
+Scores the same answer pairs with the exact (difflib) kernel and another
+kernel, and reports per-length score drift and timings.
+
+    cd backend
+    python -m benchmarks.similarity_drift
+    python -m benchmarks.similarity_drift --kernel token_lcs --pairs answers.json --output drift.json
+
+--pairs takes a JSON list of {"student": ..., "model": ...} objects (e.g. real
+answers exported from the database); otherwise synthetic pairs are generated.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+from typing import Dict, List, Any, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.similarity import get_similarity_kernel, SimilarityKernel
+
+VOCABULARY = (
+    "photosynthesis light energy chlorophyll glucose oxygen carbon dioxide plant leaf water "
+    "reaction produce convert chemical cell sunlight stomata process absorb release food "
+    "mitochondria respiration enzyme protein membrane nucleus division growth structure function "
+    "force mass acceleration velocity momentum gravity friction motion newton law equation"
+).split()
+
+# Word counts of generated model answers, and character limits of the report rows
+LENGTH_BUCKETS = [(10, 40), (40, 120), (120, 400), (400, 1000)]
+REPORT_BUCKETS = [200, 1000, 3000, 8000]
+
+def synthetic_pairs(pairs_per_bucket: int, seed: int) -> List[Tuple[str, str]]:
+    """Model answers of increasing length with student answers that drop, swap and add words"""
+    rng = random.Random(seed)
+    pairs = []
+    for low, high in LENGTH_BUCKETS:
+        for _ in range(pairs_per_bucket):
+            model = [rng.choice(VOCABULARY) for _ in range(rng.randint(low, high))]
+            quality = rng.random()
+            student = []
+            for word in model:
+                roll = rng.random()
+                if roll < quality * 0.5:
+                    continue  # dropped
+                student.append(rng.choice(VOCABULARY) if roll < quality * 0.7 else word)
+                if rng.random() < quality * 0.2:
+                    student.append(rng.choice(VOCABULARY))
+            pairs.append((" ".join(student), " ".join(model)))
+    return pairs
+
+def load_pairs(path: str) -> List[Tuple[str, str]]:
+    with open(path) as f:
+        return [(item["student"], item["model"]) for item in json.load(f)]
+
+def time_kernel(kernel: SimilarityKernel, pairs: List[Tuple[str, str]]) -> Tuple[List[float], List[float]]:
+    """Scores and per-pair seconds"""
+    scores, durations = [], []
+    for student, model in pairs:
+        start = time.perf_counter()
+        scores.append(kernel.similarity(student, model))
+        durations.append(time.perf_counter() - start)
+    return scores, durations
+
+BUCKET_NAMES = [f"<={limit} chars" for limit in REPORT_BUCKETS] + [f">{REPORT_BUCKETS[-1]} chars"]
+
+def bucket_name(length: int) -> str:
+    """Report bucket for a pair by its longer text's character count"""
+    for limit, name in zip(REPORT_BUCKETS, BUCKET_NAMES):
+        if length <= limit:
+            return name
+    return BUCKET_NAMES[-1]
+
+def summarize(pairs, exact_scores, exact_times, kernel_scores, kernel_times) -> Dict[str, Any]:
+    buckets = {name: {"drift": [], "exact_ms": [], "kernel_ms": []} for name in BUCKET_NAMES}
+    for i, (student, model) in enumerate(pairs):
+        bucket = buckets[bucket_name(max(len(student), len(model)))]
+        bucket["drift"].append(kernel_scores[i] - exact_scores[i])
+        bucket["exact_ms"].append(exact_times[i] * 1000)
+        bucket["kernel_ms"].append(kernel_times[i] * 1000)
+
+    report = {}
+    for name, bucket in buckets.items():
+        drift = bucket["drift"]
+        if not drift:
+            continue
+        report[name] = {
+            "pairs": len(drift),
+            "mean_drift": round(statistics.fmean(drift), 4),
+            "mean_abs_drift": round(statistics.fmean(abs(d) for d in drift), 4),
+            "max_abs_drift": round(max(abs(d) for d in drift), 4),
+            "exact_mean_ms": round(statistics.fmean(bucket["exact_ms"]), 4),
+            "kernel_mean_ms": round(statistics.fmean(bucket["kernel_ms"]), 4),
+            "exact_max_ms": round(max(bucket["exact_ms"]), 4),
+            "kernel_max_ms": round(max(bucket["kernel_ms"]), 4),
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a similarity kernel against the exact difflib scores")
+    parser.add_argument("--kernel", default="token_lcs", help="kernel to compare against 'exact'")
+    parser.add_argument("--pairs", help="JSON file of {student, model} answer pairs")
+    parser.add_argument("--pairs-per-bucket", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.pairs) if args.pairs else synthetic_pairs(args.pairs_per_bucket, args.seed)
+    exact_scores, exact_times = time_kernel(get_similarity_kernel("exact"), pairs)
+    kernel_scores, kernel_times = time_kernel(get_similarity_kernel(args.kernel), pairs)
+
+    report = {
+        "kernel": args.kernel,
+        "pairs": len(pairs),
+        "exact_total_ms": round(sum(exact_times) * 1000, 2),
+        "kernel_total_ms": round(sum(kernel_times) * 1000, 2),
+        "buckets": summarize(pairs, exact_scores, exact_times, kernel_scores, kernel_times),
+    }
+
+    print(f"{args.kernel} vs exact over {len(pairs)} pairs: "
+          f"{report['kernel_total_ms']} ms vs {report['exact_total_ms']} ms")
+    print(f"{'length':<16}{'pairs':>6}{'mean drift':>12}{'mean |d|':>10}{'max |d|':>9}{'exact ms':>10}{'kernel ms':>11}")
+    for name, row in report["buckets"].items():
+        print(f"{name:<16}{row['pairs']:>6}{row['mean_drift']:>12}{row['mean_abs_drift']:>10}"
+              f"{row['max_abs_drift']:>9}{row['exact_mean_ms']:>10}{row['kernel_mean_ms']:>11}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
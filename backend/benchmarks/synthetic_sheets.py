@@ -0,0 +1,117 @@
+"""
+Synthetic answer sheets for benchmarks
+
+Generates an answer key with matching student answers and renders them as a
+digital (text layer) or rasterized (image only, like a scan) PDF.
+"""
+
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+SENTENCES = [
+    "Photosynthesis converts light energy into chemical energy stored in glucose",
+    "Chlorophyll in the chloroplasts absorbs sunlight and releases oxygen as a by-product",
+    "Carbon dioxide enters the leaf through the stomata and water is absorbed by the roots",
+    "Respiration in the mitochondria breaks down glucose to release energy for the cell",
+    "Enzymes are proteins that speed up chemical reactions without being used up",
+    "Newton's second law states that force equals mass times acceleration",
+    "Friction opposes motion and converts kinetic energy into heat",
+    "Momentum is the product of mass and velocity and is conserved in collisions",
+    "The cell membrane controls which substances enter and leave the cell",
+    "Gravity pulls objects towards the centre of the earth with an acceleration of 9.8 m/s2",
+    "Therefore the rate of the reaction increases because the particles collide more often",
+    "For example a plant kept in the dark stops producing starch after a few days",
+    "First the water is heated, then it evaporates and finally it condenses on the cold surface",
+    "This is different from diffusion because active transport requires energy",
+]
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 50
+FONT_SIZE = 10
+LINE_HEIGHT = 14
+LINE_CHARS = 90
+LINES_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // LINE_HEIGHT
+
+@dataclass
+class SyntheticExam:
+    """An answer key and one student's answers to it"""
+    answer_key: Dict[str, str]
+    question_marks: Dict[str, int]
+    question_texts: Dict[str, str]
+    student_answers: Dict[str, str] = field(default_factory=dict)
+
+def generate_exam(questions: int, seed: int = 42, answer_sentences: int = 4,
+                  skip_rate: float = 0.1) -> SyntheticExam:
+    """Answer key of `questions` questions and a student answering most of them partially correctly"""
+    rng = random.Random(seed)
+    exam = SyntheticExam(answer_key={}, question_marks={}, question_texts={})
+
+    for number in range(1, questions + 1):
+        question_id = str(number)
+        model = rng.sample(SENTENCES, min(answer_sentences, len(SENTENCES)))
+        exam.answer_key[question_id] = ". ".join(model) + "."
+        exam.question_marks[question_id] = rng.choice([2, 4, 5, 8, 10])
+        exam.question_texts[question_id] = f"Explain the concept tested in question {number}."
+
+        if rng.random() < skip_rate:
+            exam.student_answers[question_id] = ""
+            continue
+        kept = [sentence for sentence in model if rng.random() < 0.7] or model[:1]
+        extra = rng.sample(SENTENCES, rng.randint(0, 2))
+        exam.student_answers[question_id] = ". ".join(kept + extra) + "."
+
+    return exam
+
+def sheet_lines(exam: SyntheticExam) -> List[str]:
+    """Text lines of the student's answer sheet: a numbered question line, then the wrapped answer"""
+    lines = []
+    for question_id, question_text in exam.question_texts.items():
+        lines.append(f"{question_id}. {question_text}")
+        words = exam.student_answers.get(question_id, "").split()
+        line = ""
+        for word in words:
+            if line and len(line) + len(word) + 1 > LINE_CHARS:
+                lines.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        if line:
+            lines.append(line)
+        lines.append("")
+    return lines
+
+def build_answer_sheet_pdf(exam: SyntheticExam, pages: int = 1, rasterized: bool = False,
+                           dpi: int = 150) -> bytes:
+    """
+    Render the student's answers as a PDF of at least `pages` pages
+
+    Lines are spread evenly over the pages (more pages are added if they do
+    not fit). A rasterized sheet holds only page images, so every page needs OCR.
+    """
+    import fitz  # PyMuPDF
+
+    lines = sheet_lines(exam)
+    per_page = min(LINES_PER_PAGE, max(1, -(-len(lines) // max(1, pages))))
+    chunks = [lines[i:i + per_page] for i in range(0, len(lines), per_page)]
+    chunks += [[] for _ in range(pages - len(chunks))]
+
+    document = fitz.open()
+    for chunk in chunks:
+        page = document.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        for row, line in enumerate(chunk):
+            if line:
+                page.insert_text((MARGIN, MARGIN + (row + 1) * LINE_HEIGHT), line, fontsize=FONT_SIZE)
+
+    if rasterized:
+        scanned = fitz.open()
+        for page in document:
+            pixmap = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+            image_page = scanned.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+            image_page.insert_image(image_page.rect, pixmap=pixmap)
+        document.close()
+        document = scanned
+
+    pdf_bytes = document.tobytes()
+    document.close()
+    return pdf_bytes
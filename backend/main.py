@@ -5,6 +5,14 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from app.api.routes import auth, tests, students, examiners, evaluations
 from app.api.routes.ai_semantic_evaluation import router as ai_semantic_router
+from app.api.routes.tesseract_evaluation import router as tesseract_router
+from app.api.routes.evaluation_jobs import router as evaluation_jobs_router
+from app.api.routes.metrics import router as metrics_router
+from app.api.routes.engines import router as engines_router, warm_up_configured_engines
+from app.services.evaluation_job_service import evaluation_job_queue
+from app.services.tesseract_evaluation_service import shutdown_ocr_pool
+from app.core.executor import cpu_executor
+from app.core.metrics import track_request_metrics
 from app.db.database import engine, Base
 from app.core.config import settings
 import os
@@ -37,6 +45,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-router request latency for /metrics
+app.middleware("http")(track_request_metrics)
+
 # Include API routes
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(tests.router, prefix="/api/tests", tags=["Tests"])
@@ -44,6 +55,25 @@ app.include_router(students.router, prefix="/api/students", tags=["Students"])
 app.include_router(examiners.router, prefix="/api/examiners", tags=["Examiners"])
 app.include_router(evaluations.router, prefix="/api/evaluations", tags=["Evaluations"])
 app.include_router(ai_semantic_router, prefix="/api/advanced", tags=["AI-Powered Evaluation"])
+app.include_router(tesseract_router, prefix="/api/tesseract", tags=["Tesseract Evaluation"])
+app.include_router(evaluation_jobs_router, prefix="/api/jobs", tags=["Evaluation Jobs"])
+app.include_router(engines_router, prefix="/api/engines", tags=["Engines"])
+app.include_router(metrics_router, tags=["Metrics"])
+
+@app.on_event("startup")
+async def resume_evaluation_jobs():
+    """Pick up evaluation jobs left unfinished by a previous run"""
+    evaluation_job_queue.resume_pending()
+
+@app.on_event("startup")
+async def warm_up_engines():
+    """Load OCR/NLP engines listed in ENGINE_WARMUP before the first request"""
+    warm_up_configured_engines()
+
+@app.on_event("shutdown")
+async def stop_ocr_workers():
+    """Stop the shared OCR worker processes"""
+    shutdown_ocr_pool()
 
 # Add static file serving for the webapp
 @app.get("/webapp-simple.html")
@@ -105,11 +135,18 @@ async def root():
         ],
         "endpoints": {
             "/api/advanced/evaluate-semantic": "AI-powered evaluation endpoint",
-            "/api/advanced/evaluation-results/{id}": "Get AI evaluation results"
+            "/api/advanced/evaluation-results/{id}": "Get AI evaluation results",
+            "/api/jobs/submit": "Queue an evaluation in the background",
+            "/api/jobs/{job_id}/status": "Get evaluation job status",
+            "/api/jobs/{job_id}/result": "Get evaluation job result"
         }
     }
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "evaluation_system": "semantic_analysis_ready"}
\ No newline at end of file
+    return {
+        "status": "healthy",
+        "evaluation_system": "semantic_analysis_ready",
+        "cpu_executor": cpu_executor.stats()
+    }
\ No newline at end of file
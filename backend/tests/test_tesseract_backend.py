@@ -0,0 +1,45 @@
+"""Both Tesseract backends must run with the same configuration"""
+
+import pytest
+from PIL import Image
+
+from app.services.tesseract_backend import TesseractBackend, parse_config
+from app.services.advanced_pdf_ocr_service import TESSERACT_CONFIG, TESSERACT_WHITELIST
+from app.services.tesseract_evaluation_service import TESSERACT_PAGE_CONFIG
+
+pytesseract = pytest.importorskip("pytesseract")
+
+class _CommandCaptured(Exception):
+    pass
+
+def cli_variables(config: str, monkeypatch):
+    """-c variables on the tesseract command line pytesseract builds for config"""
+    captured = []
+
+    def fake_popen(args, *popen_args, **popen_kwargs):
+        captured.extend(args)
+        raise _CommandCaptured
+
+    monkeypatch.setattr(pytesseract.pytesseract.subprocess, "Popen", fake_popen)
+    with pytest.raises(_CommandCaptured):
+        pytesseract.image_to_string(Image.new("RGB", (8, 8)), config=config)
+
+    return tuple(
+        tuple(captured[i + 1].split("=", 1))
+        for i, arg in enumerate(captured[:-1]) if arg == "-c"
+    )
+
+@pytest.mark.parametrize("config", [TESSERACT_CONFIG, TESSERACT_PAGE_CONFIG, "--psm 6"])
+def test_backends_get_the_same_variables(config, monkeypatch):
+    assert parse_config(config)[3] == cli_variables(config, monkeypatch)
+
+def test_whitelist_survives_config_parsing():
+    assert parse_config(TESSERACT_CONFIG) == ("eng", 3, 6, (("tessedit_char_whitelist", TESSERACT_WHITELIST),))
+
+def test_unbalanced_quotes_are_rejected():
+    with pytest.raises(ValueError):
+        parse_config("-c tessedit_char_whitelist=ab\"c")
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        TesseractBackend()
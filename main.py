@@ -11,7 +11,10 @@ from app.api.routes import auth, tests, evaluations, students, examiners
 from app.api.routes.semantic_evaluation import router as semantic_router
 from app.api.routes.tesseract_evaluation import router as tesseract_router
 from app.api.routes.question_detection import router as question_detection_router
+from app.api.routes.metrics import router as metrics_router
+from app.api.routes.engines import router as engines_router, warm_up_configured_engines
 from app.core.config import settings
+from app.core.metrics import track_request_metrics
 from app.db.database import engine
 from app.db.models import Base
 
@@ -49,6 +52,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-router request latency for /metrics
+app.middleware("http")(track_request_metrics)
+
 # Include routers first
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(tests.router, prefix="/api/tests", tags=["tests"])
@@ -58,6 +64,13 @@ app.include_router(examiners.router, prefix="/api/examiners", tags=["examiners"]
 app.include_router(semantic_router, prefix="/api/advanced", tags=["Advanced Semantic Evaluation"])
 app.include_router(tesseract_router, prefix="/api/tesseract", tags=["Tesseract OCR Evaluation"])
 app.include_router(question_detection_router, prefix="/api/question-detection", tags=["Question Detection & Analysis"])
+app.include_router(engines_router, prefix="/api/engines", tags=["Engines"])
+app.include_router(metrics_router, tags=["Metrics"])
+
+@app.on_event("startup")
+async def warm_up_engines():
+    """Load OCR/NLP engines listed in ENGINE_WARMUP before the first request"""
+    warm_up_configured_engines()
 
 # Static file routes (must come after API routes to avoid conflicts)
 @app.get("/")